@@ -1,14 +1,27 @@
+import asyncio
 from app.chat.processor import process_message
 from fastapi import APIRouter, Depends, HTTPException
 from app.core.models import User, Conversation
 from app.services.auth_service import  get_current_user
-from app.services.conversation_service import get_user_conversations, create_conversation, delete_conversation_service
+from app.services.conversation_service import get_user_conversations, create_conversation, delete_conversation_service, update_conversation_title
 from app.services.messages_service import get_conversation_messages, send_message_to_conversation
 from typing import List, Dict, Any
 from app.core.database import get_db
-from app.schemas.chat_schema import SendMessageRequest, CreateConversationRequest
+from app.schemas.chat_schema import SendMessageRequest, CreateConversationRequest, DEFAULT_CONVERSATION_TITLE
 from app.services.credit_service import deduct_credits
-from app.chat.graph_workflow import agent
+from app.chat import graph_workflow
+from app.chat.checkpoints import checkpoint_store
+from app.chat.tool_cache import conversation_scope
+from app.chat.tool_executor import tool_turn
+from app.chat.speculative import (
+    start_collection_routing,
+    start_speculative_search,
+    turn_context,
+    retrieved_context_note,
+    turn_note,
+)
+from app.chat.titles import generate_title
+from app.config.load import CONVERSATION_AUTO_TITLE
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.utils.logging_utils import get_secure_logger
@@ -83,6 +96,12 @@ async def send_message(
         logger.warning("Invalid conversation ID format", conversation_id=conversation_id, user_id=user.id)
         raise HTTPException(status_code=400, detail="Invalid conversation ID format")
 
+    # Route the message to its likely collections and search the default one while the message is saved
+    # and the history loads
+    with conversation_scope(conversation_uuid):
+        routing = start_collection_routing(request.content)
+        speculation = await start_speculative_search(request.content, routing=routing)
+
     try:
         # Save user message first
         user_message = await send_message_to_conversation(
@@ -95,21 +114,47 @@ async def send_message(
 
     except Exception as e:
         logger.error("Error saving user message", conversation_id=conversation_id, user_id=user.id, error=str(e))
+        for task in (routing, speculation):
+            if task:
+                task.cancel()
         raise HTTPException(status_code=500, detail="Error al guardar el mensaje del usuario")
 
+    titling = None
+    agent_started = False
     try:
-        # Process message and get conversation history
+        # Resume from the agent's checkpoint when there is one; otherwise rebuild the history from the database
+        agent = graph_workflow.agent
+        resume = await checkpoint_store.has_state(agent, conversation_uuid)
         messages = await process_message(
             conversation_id=conversation_uuid,
             user_id=user.id,
             new_input=request.content,
-            db=db
+            db=db,
+            include_history=not resume
         )
         
-        logger.debug("Message processed, invoking agent", conversation_id=conversation_id, user_id=user.id)
+        # Title the conversation from its first message on the fast tier while the agent answers
+        if CONVERSATION_AUTO_TITLE and not resume and sum(message["role"] != "system" for message in messages) == 1:
+            titling = asyncio.create_task(generate_title(request.content))
+
+        # Shown to this turn's model calls only, never stored in the agent's checkpoint
+        routed, context = await turn_context(routing, speculation)
+        note = retrieved_context_note(context, routed)
+        if note:
+            logger.debug(
+                "Routing and speculative search results added to context",
+                conversation_id=conversation_id,
+                routed=[item.name for item in routed],
+                retrieved=bool(context)
+            )
+
+        logger.debug("Message processed, invoking agent", conversation_id=conversation_id, user_id=user.id, resumed=resume)
         
-        # Invoke agent with the message history
-        result = await agent.ainvoke({"messages": messages})
+        # Invoke agent with the message history; its tool calls share this conversation's cache
+        # and a bounded number of concurrent slots
+        agent_started = True
+        with conversation_scope(conversation_uuid), tool_turn(), turn_note(note):
+            result = await agent.ainvoke({"messages": messages}, config=checkpoint_store.thread_config(conversation_uuid))
 
         # Extract the last message content
         full_state = result.get("messages", [])
@@ -122,6 +167,12 @@ async def send_message(
 
     except Exception as e:
         logger.error("Error processing message with agent", conversation_id=conversation_id, user_id=user.id, error=str(e))
+        for task in (routing, speculation, titling):
+            if task:
+                task.cancel()
+        # A failed turn may leave unanswered tool calls in the checkpoint; start over from the database next time
+        if agent_started:
+            await checkpoint_store.delete(conversation_uuid)
         raise HTTPException(status_code=500, detail="Error al procesar el mensaje con el agente")
 
     try:
@@ -134,6 +185,13 @@ async def send_message(
 
         credits_deducted = await deduct_credits(user.id, amount=1, db=db)
 
+        title = await titling if titling else None
+        if title:
+            try:
+                await update_conversation_title(conversation_uuid, user.id, title, db, only_if_title=DEFAULT_CONVERSATION_TITLE)
+            except Exception as e:
+                logger.warning("Conversation title not updated", conversation_id=conversation_id, error=str(e))
+
         logger.info("Message processed successfully", conversation_id=conversation_id, user_id=user.id, credits_deducted=credits_deducted)
         return {"message": assistant_message, "credits_remaining": credits_deducted}
 
@@ -153,6 +211,7 @@ async def delete_conversation(
     try:
         conversation_uuid = UUID(conversation_id)
         await delete_conversation_service(conversation_uuid, user.id, db)
+        await checkpoint_store.delete(conversation_uuid)
         logger.info("Conversation deleted successfully", conversation_id=conversation_id, user_id=user.id)
         return {"message": True}
     except ValueError:
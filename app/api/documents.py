@@ -0,0 +1,113 @@
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.config.load import RAG_UPLOAD_DIR, RAG_UPLOAD_MAX_MB
+from app.core.models import User
+from app.services.auth_service import get_current_user
+from app.services.ingestion_job_service import SUPPORTED_EXTENSIONS, ingestion_jobs, run_ingestion_job
+from app.tools.rag.catalog import collection_catalog
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+router = APIRouter()
+
+# Bytes copied per read while spooling an upload to disk
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+def _spool_upload(source: BinaryIO, extension: str) -> Optional[str]:
+    """
+    Copy an upload to a temporary file on disk.
+
+    Returns:
+        Path of the spooled file, or None if the upload exceeds RAG_UPLOAD_MAX_MB
+    """
+    max_bytes = RAG_UPLOAD_MAX_MB * 1024 * 1024
+    written = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=extension, dir=RAG_UPLOAD_DIR) as target:
+        while True:
+            data = source.read(SPOOL_CHUNK_BYTES)
+            if not data:
+                return target.name
+            written += len(data)
+            if written > max_bytes:
+                break
+            target.write(data)
+    os.remove(target.name)
+    return None
+
+@router.post("/collections/{collection_name}/documents", status_code=202)
+async def upload_document(
+    collection_name: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    section: Optional[str] = Form(None),
+    doc_version: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None, description="Comma-separated tags"),
+    document_id: Optional[str] = Form(None, description="Stable document id; replaces the previously uploaded version"),
+    user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Upload a document and ingest it into a collection in the background.
+
+    The file is spooled to disk and extracted, chunked, embedded and upserted
+    by a background job; poll `/ingestion-jobs/{job_id}` for progress. With
+    a `document_id`, the previously ingested version of the document is
+    replaced and only changed chunks are embedded.
+    """
+    filename = os.path.basename(file.filename or "upload")
+    extension = os.path.splitext(filename)[1].lower()
+    logger.info("Document upload received", user_id=user.id, collection_name=collection_name, filename=filename)
+
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type. Supported: {', '.join(sorted(SUPPORTED_EXTENSIONS))}")
+    try:
+        collection = await collection_catalog.get(collection_name)
+    except Exception as e:
+        logger.error("Error looking up collection", user_id=user.id, collection_name=collection_name, error=str(e))
+        raise HTTPException(status_code=503, detail="Vector store unavailable")
+    if collection is None:
+        raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found")
+
+    try:
+        file_path = await run_in_threadpool(_spool_upload, file.file, extension)
+    except Exception as e:
+        logger.error("Error spooling upload", user_id=user.id, filename=filename, error=str(e))
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+    finally:
+        await file.close()
+    if file_path is None:
+        raise HTTPException(status_code=413, detail=f"File exceeds {RAG_UPLOAD_MAX_MB} MB")
+
+    metadata: Dict[str, Any] = {
+        "tags": [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else [],
+    }
+    if section:
+        metadata["section"] = section
+    if doc_version:
+        metadata["doc_version"] = doc_version
+    try:
+        job = await run_in_threadpool(ingestion_jobs.create, user.id, collection_name, filename, document_id)
+    except Exception as e:
+        logger.error("Error creating ingestion job", user_id=user.id, collection_name=collection_name, error=str(e))
+        os.remove(file_path)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+    background_tasks.add_task(run_ingestion_job, job, file_path, extension, metadata)
+
+    logger.info("Ingestion job queued", user_id=user.id, job_id=job.id, collection_name=collection_name)
+    return job.to_dict()
+
+@router.get("/ingestion-jobs")
+async def list_ingestion_jobs(user: User = Depends(get_current_user)) -> List[Dict[str, Any]]:
+    """List the current user's ingestion jobs, newest first."""
+    jobs = await run_in_threadpool(ingestion_jobs.list_for_user, user.id)
+    return [job.to_dict() for job in jobs]
+
+@router.get("/ingestion-jobs/{job_id}")
+async def get_ingestion_job(job_id: str, user: User = Depends(get_current_user)) -> Dict[str, Any]:
+    """Progress of one of the current user's ingestion jobs."""
+    job = await run_in_threadpool(ingestion_jobs.get, job_id, user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
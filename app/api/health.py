@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.config.qdrant import qdrant_client
+from app.tools.rag.catalog import collection_catalog
+from app.chat.tool_cache import tool_cache
+from app.config.llm import usage_stats
 from typing import Dict, Any
 from app.utils.logging_utils import get_secure_logger
 
@@ -33,15 +35,21 @@ async def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
         health_status["status"] = "unhealthy"
         logger.error("Database health check failed", error=str(e))
     
-    # Check Qdrant connection
+    # Check Qdrant through the cached collection catalog (refreshed in the background)
     try:
-        qdrant_client.get_collections()
+        collections = await collection_catalog.entries()
+        if not collection_catalog.healthy:
+            raise RuntimeError(collection_catalog.last_error or "collection catalog not loaded")
         health_status["components"]["qdrant"] = "healthy"
+        health_status["components"]["collections"] = len(collections)
         logger.debug("Qdrant health check passed")
     except Exception as e:
         health_status["components"]["qdrant"] = f"unhealthy: {str(e)}"
         health_status["status"] = "unhealthy"
         logger.error("Qdrant health check failed", error=str(e))
     
+    health_status["components"]["tool_cache"] = tool_cache.stats()
+    health_status["components"]["llm_tiers"] = usage_stats()
+
     logger.info("Health check completed", status=health_status["status"])
     return health_status
@@ -0,0 +1,233 @@
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from app.config.load import (
+    AGENT_CHECKPOINT_URL,
+    AGENT_CHECKPOINT_POOL_SIZE,
+    AGENT_CHECKPOINTS_PER_CONVERSATION,
+    AGENT_CHECKPOINT_RETENTION_DAYS,
+    AGENT_CHECKPOINT_PRUNE_INTERVAL_SECONDS,
+)
+from app.core.database import DATABASE_URL
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Conversations are only pruned once their latest checkpoint is this old, so a sweep never
+# races with a turn that is still writing
+SETTLE_MINUTES = 10
+
+# Threads whose latest checkpoint is older than a cutoff (tables of langgraph-checkpoint-postgres)
+IDLE_THREADS_SQL = """
+SELECT thread_id FROM checkpoints
+WHERE checkpoint_ns = ''
+GROUP BY thread_id
+HAVING max(checkpoint ->> 'ts') < %(before)s
+"""
+
+# Keep the newest checkpoints of settled threads, then drop the writes and channel blobs no
+# remaining checkpoint refers to
+PRUNE_SQL = [
+    """
+    DELETE FROM checkpoints c
+    USING (
+        SELECT thread_id, checkpoint_ns, checkpoint_id,
+               row_number() OVER (PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position
+        FROM checkpoints
+        WHERE thread_id = ANY(%(threads)s)
+    ) ranked
+    WHERE c.thread_id = ranked.thread_id
+      AND c.checkpoint_ns = ranked.checkpoint_ns
+      AND c.checkpoint_id = ranked.checkpoint_id
+      AND ranked.position > %(keep)s
+    """,
+    """
+    DELETE FROM checkpoint_writes w
+    WHERE w.thread_id = ANY(%(threads)s)
+      AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id
+      )
+    """,
+    """
+    DELETE FROM checkpoint_blobs b
+    WHERE b.thread_id = ANY(%(threads)s)
+      AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+          AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+      )
+    """,
+]
+
+def _default_url() -> str:
+    """The app database when it is Postgres, otherwise in-process memory."""
+    return DATABASE_URL if DATABASE_URL.startswith("postgresql") else "memory"
+
+class CheckpointStore:
+    """
+    Durable LangGraph agent state, one thread per conversation.
+
+    The agent resumes a conversation from its latest checkpoint (with the
+    tool calls, tool results and summary of earlier turns) instead of
+    rebuilding plain messages from the database. Conversations without a
+    checkpoint (new, older than the retention, or reset after a failed turn)
+    fall back to the messages table.
+
+    Postgres is the durable backend; "memory" and SQLite URLs are meant for
+    tests and single-process runs and are not pruned.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = AGENT_CHECKPOINT_URL,
+        keep: int = AGENT_CHECKPOINTS_PER_CONVERSATION,
+        retention_days: float = AGENT_CHECKPOINT_RETENTION_DAYS,
+        prune_interval: float = AGENT_CHECKPOINT_PRUNE_INTERVAL_SECONDS
+    ):
+        self.url = url or _default_url()
+        self.keep = max(1, keep)
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+        self.saver: Optional[BaseCheckpointSaver] = None
+        self._pool: Any = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.saver is not None
+
+    @staticmethod
+    def thread_config(conversation_id: UUID) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": str(conversation_id)}}
+
+    async def open(self) -> Optional[BaseCheckpointSaver]:
+        """Connect the configured backend and create its tables (called from the application lifespan)."""
+        if self.saver is not None or self.url == "off":
+            return self.saver
+
+        self._stack = AsyncExitStack()
+        if self.url == "memory":
+            self.saver = MemorySaver()
+        elif self.url.startswith("sqlite"):
+            try:
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            except ImportError as e:
+                raise RuntimeError("SQLite checkpoints need the langgraph-checkpoint-sqlite package") from e
+            path = self.url.split("://", 1)[1].lstrip("/") or ":memory:"
+            self.saver = await self._stack.enter_async_context(AsyncSqliteSaver.from_conn_string(path))
+            await self.saver.setup()
+        else:
+            try:
+                from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+                from psycopg.rows import dict_row
+                from psycopg_pool import AsyncConnectionPool
+            except ImportError as e:
+                raise RuntimeError("Postgres checkpoints need the langgraph-checkpoint-postgres package") from e
+            # psycopg 3 takes plain libpq URLs, without SQLAlchemy's driver suffix
+            conninfo = self.url.replace("postgresql+psycopg2://", "postgresql://", 1)
+            self._pool = AsyncConnectionPool(
+                conninfo,
+                max_size=AGENT_CHECKPOINT_POOL_SIZE,
+                open=False,
+                kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row}
+            )
+            await self._pool.open()
+            self._stack.push_async_callback(self._pool.close)
+            self.saver = AsyncPostgresSaver(self._pool)
+            await self.saver.setup()
+
+        logger.info("Agent checkpoints enabled", backend=self.url.split(":", 1)[0])
+        return self.saver
+
+    async def close(self) -> None:
+        if self._stack is not None:
+            await self._stack.aclose()
+        self._stack = None
+        self._pool = None
+        self.saver = None
+
+    async def has_state(self, agent: Any, conversation_id: UUID) -> bool:
+        """Whether the agent can resume a conversation from a checkpoint; never raises."""
+        if not self.enabled:
+            return False
+        try:
+            snapshot = await agent.aget_state(self.thread_config(conversation_id))
+        except Exception as e:
+            logger.warning("Checkpoint lookup failed", conversation_id=conversation_id, error=str(e))
+            return False
+        return bool(snapshot.values.get("messages"))
+
+    async def delete(self, conversation_id: UUID) -> None:
+        """Drop a conversation's agent state; never raises."""
+        if not self.enabled:
+            return
+        try:
+            await self.saver.adelete_thread(str(conversation_id))
+        except Exception as e:
+            logger.warning("Checkpoint deletion failed", conversation_id=conversation_id, error=str(e))
+
+    async def prune(self) -> Dict[str, int]:
+        """
+        Bound checkpoint storage (Postgres only).
+
+        Drops the state of conversations idle for longer than the retention and
+        keeps the newest `keep` checkpoints of every other settled conversation.
+
+        Returns:
+            Number of threads dropped and pruned
+        """
+        if self._pool is None:
+            return {"expired_threads": 0, "pruned_threads": 0}
+
+        now = datetime.now(timezone.utc)
+        expired = []
+        if self.retention_days > 0:
+            expired = await self._idle_threads(now - timedelta(days=self.retention_days))
+            for thread_id in expired:
+                await self.saver.adelete_thread(thread_id)
+
+        settled = await self._idle_threads(now - timedelta(minutes=SETTLE_MINUTES))
+        if settled:
+            async with self._pool.connection() as conn:
+                async with conn.transaction():
+                    for statement in PRUNE_SQL:
+                        await conn.execute(statement, {"threads": settled, "keep": self.keep})
+
+        logger.info("Agent checkpoints pruned", expired_threads=len(expired), pruned_threads=len(settled))
+        return {"expired_threads": len(expired), "pruned_threads": len(settled)}
+
+    async def _idle_threads(self, before: datetime) -> list:
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(IDLE_THREADS_SQL, {"before": before.isoformat()})
+            return [row["thread_id"] for row in await cursor.fetchall()]
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                await self.prune()
+            except Exception as e:
+                logger.error("Agent checkpoint pruning failed", error=str(e))
+
+    def start(self) -> None:
+        """Start the background pruning task (called from the application lifespan)."""
+        if self._task is None and self._pool is not None:
+            self._task = asyncio.create_task(self._prune_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background pruning task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+checkpoint_store = CheckpointStore()
@@ -1,10 +1,14 @@
 from langgraph.graph import StateGraph, END, START
 from app.schemas.chat_schema import AgentState
-from app.config.llm import llm_model
+from app.config.llm import llm_for
 from app.chat.tools import tools_list
+from app.chat.speculative import current_turn_note
 from langgraph.prebuilt import ToolNode
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, SystemMessage, RemoveMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from typing import Optional
 from langchain.chains import LLMChain
 from langchain_core.prompts import PromptTemplate
 from app.utils.logging_utils import get_secure_logger
@@ -17,13 +21,35 @@ summary_prompt = PromptTemplate(
     template="Conversation summary:\n{chat_history}\n\nSummary:"
 )
 
-# Chain for generating conversation summaries
+# Chain for generating conversation summaries (auxiliary, so on the summary task's tier)
 summary_chain = LLMChain(
-    llm=llm_model,
+    llm=llm_for("summary"),
     prompt=summary_prompt
 )
 
-def summary_hook(state: AgentState):
+def recent_turns(msgs: list, keep: int = 5) -> list:
+    """
+    Messages kept verbatim when the conversation is summarized.
+
+    The window starts at a user message: the earliest one within the last
+    ``keep`` messages or, when the current turn is longer than that, the
+    latest one. An AI message with tool calls is therefore always kept
+    together with its tool results, and the user's question is never lost.
+
+    Args:
+        msgs: Conversation messages, oldest first
+        keep: Preferred number of trailing messages to keep
+
+    Returns:
+        The kept messages, oldest first (empty if there is no user message)
+    """
+    turn_starts = [index for index, message in enumerate(msgs) if isinstance(message, HumanMessage)]
+    if not turn_starts:
+        return []
+    within = [index for index in turn_starts if index >= len(msgs) - keep]
+    return msgs[within[0] if within else turn_starts[-1]:]
+
+async def summary_hook(state: AgentState):
     """
     Hook to summarize conversation when it gets too long.
     
@@ -37,25 +63,59 @@ def summary_hook(state: AgentState):
     
     # Summarize if conversation has more than 10 messages
     if len(msgs) > 10:  
+        recent = recent_turns(msgs)
+        if not recent:
+            return {}
         logger.debug("Summarizing conversation", message_count=len(msgs))
         
         # Get text from last 10 messages for summary
         chat_str = "\n".join(m.content for m in msgs[-10:])
-        summary = summary_chain.run(chat_history=chat_str)
+        summary = (await summary_chain.ainvoke({"chat_history": chat_str}))["text"]
         
-        # Keep summary as system message + last 5 messages
-        new_messages = [SystemMessage(content=f"Summary so far: {summary}")] + msgs[-5:]
+        # Keep summary as system message + the most recent turns
+        new_messages = [SystemMessage(content=f"Summary so far: {summary}")] + recent
         
         logger.debug("Conversation summarized", original_count=len(msgs), new_count=len(new_messages))
-        return {"messages": new_messages, "summary": summary}
+        # Replace (not append to) the message state, which is persisted between turns with a checkpointer
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + new_messages, "summary": summary}
     
     return {}  # No changes needed
 
-# Create the main agent with tools and summarization
-agent = create_react_agent(
-    model=llm_model.bind_tools(tools_list),
-    tools=tools_list,
-    pre_model_hook=summary_hook,
-    state_schema=AgentState
-)
+def turn_prompt(state: AgentState) -> list:
+    """
+    Messages sent to the model: the agent state's, plus the current turn's note.
+
+    The note (routed collections, speculatively retrieved documentation) goes
+    just before the latest user message and is never added to the state.
+    """
+    messages = list(state["messages"])
+    note = current_turn_note()
+    if not note:
+        return messages
+    latest = max((index for index, message in enumerate(messages) if isinstance(message, HumanMessage)), default=0)
+    return messages[:latest] + [SystemMessage(content=note)] + messages[latest:]
+
+def build_agent(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """
+    Create the main agent with tools and summarization.
+
+    Args:
+        checkpointer: Saver persisting agent state per thread (conversation); None keeps no state between calls
+    """
+    return create_react_agent(
+        model=llm_for("agent").bind_tools(tools_list),
+        tools=tools_list,
+        prompt=turn_prompt,
+        pre_model_hook=summary_hook,
+        state_schema=AgentState,
+        checkpointer=checkpointer
+    )
+
+# Stateless until the application lifespan attaches the configured checkpointer
+agent = build_agent()
+
+def use_checkpointer(checkpointer: Optional[BaseCheckpointSaver]) -> None:
+    """Rebuild the agent with a checkpointer; request handlers read `graph_workflow.agent` on every call."""
+    global agent
+    agent = build_agent(checkpointer)
 
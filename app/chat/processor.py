@@ -38,8 +38,12 @@ async def build_conversation_history(conversation: Conversation, user_id: UUID,
         logger.error("Error building conversation history", conversation_id=conversation.id, user_id=user_id, error=str(e))
         raise
 
-async def process_message(user_id: UUID, conversation_id: UUID, new_input: str, db: Session) -> tuple:
-    """Process a user message and return the response from the agent."""
+async def process_message(user_id: UUID, conversation_id: UUID, new_input: str, db: Session, include_history: bool = True) -> list:
+    """
+    Check the conversation and build the agent's input messages.
+
+    With include_history=False (the agent resumes from its checkpoint) only the new message is returned.
+    """
     logger.info("Processing message", user_id=user_id, conversation_id=conversation_id, content=new_input)
 
     try:
@@ -49,6 +53,9 @@ async def process_message(user_id: UUID, conversation_id: UUID, new_input: str,
             logger.warning("Conversation not found", conversation_id=conversation_id, user_id=user_id)
             raise HTTPException(status_code=404, detail="Conversation not found")
 
+        if not include_history:
+            return [{"role": "user", "content": new_input}]
+
         messages = await build_conversation_history(
             conversation=conversation,
             user_id=user_id,
@@ -0,0 +1,159 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.chat.tool_cache import SEARCH_CACHE_POLICY, tool_cache
+from app.config.load import RAG_DEFAULT_COLLECTION, RAG_ROUTER_TOP_K, RAG_SPECULATIVE_TIMEOUT_SECONDS
+from app.tools.rag.router import RoutedCollection, collection_router
+from app.tools.rag.search import NO_COLLECTIONS_MESSAGE, NO_RESULTS_MESSAGE, rag_qdrant_search
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Messages shorter than this ("hi", "thanks!") are not worth a search
+MIN_QUERY_WORDS = 3
+# RAG_DEFAULT_COLLECTION value that searches the collections picked by the router
+ROUTED_COLLECTIONS = "auto"
+
+# Routing and retrieval note for the model calls of the current agent turn; set by `turn_note`
+_turn_note: ContextVar[Optional[str]] = ContextVar("turn_note", default=None)
+
+@contextmanager
+def turn_note(note: Optional[str]) -> Iterator[None]:
+    """
+    Show a note to the model calls made inside the block.
+
+    The agent's prompt adds it before the latest user message on every model
+    call of the turn, without writing it to the agent state, so it is never
+    checkpointed or replayed in later turns.
+    """
+    token = _turn_note.set(note)
+    try:
+        yield
+    finally:
+        _turn_note.reset(token)
+
+def current_turn_note() -> Optional[str]:
+    return _turn_note.get()
+
+def start_collection_routing(message: str, top_k: int = RAG_ROUTER_TOP_K) -> Optional[asyncio.Task]:
+    """
+    Start ranking the collections for a new message.
+
+    Returns:
+        The running routing, or None when routing is disabled or the message is too short to route
+    """
+    if top_k <= 0 or len(message.split()) < MIN_QUERY_WORDS:
+        return None
+    return asyncio.create_task(collection_router.route(message, top_k))
+
+async def routed_collections(task: Optional[asyncio.Task], timeout: float = RAG_SPECULATIVE_TIMEOUT_SECONDS) -> List[RoutedCollection]:
+    """Result of a collection routing if it finishes within `timeout`; never raises."""
+    if task is None:
+        return []
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        logger.debug("Collection routing timed out", timeout_seconds=timeout)
+    except Exception as e:
+        logger.warning("Collection routing failed", error=str(e))
+    return []
+
+async def _search(message: str, collection: str, routing: Optional[asyncio.Task]) -> Any:
+    arguments: Dict[str, Any] = {"query": message, "collection": collection}
+    if collection == ROUTED_COLLECTIONS:
+        routed = await routed_collections(routing)
+        if not routed:
+            return NO_COLLECTIONS_MESSAGE
+        arguments = {"query": message, "collection": routed[0].name, "collections": [item.name for item in routed]}
+    return await tool_cache.call(rag_qdrant_search, SEARCH_CACHE_POLICY, arguments)
+
+async def start_speculative_search(
+    message: str,
+    collection: Optional[str] = RAG_DEFAULT_COLLECTION,
+    routing: Optional[asyncio.Task] = None
+) -> Optional[asyncio.Task]:
+    """
+    Start searching for a new message before the agent decides to.
+
+    The search goes through the tool cache, so when the model's first
+    rag_search repeats the user's question it is answered from the cache.
+    Call inside the conversation's cache scope.
+
+    Args:
+        message: The user's new message
+        collection: Collection to search; "auto" searches the ones picked by `routing`
+        routing: Task from `start_collection_routing`
+
+    Returns:
+        The running search, or None when speculation is disabled or pointless
+    """
+    if not collection or len(message.split()) < MIN_QUERY_WORDS:
+        return None
+    if collection == ROUTED_COLLECTIONS and routing is None:
+        return None
+
+    task = asyncio.create_task(_search(message, collection, routing))
+    # Let it send its embedding request before the caller's synchronous database work
+    await asyncio.sleep(0)
+    return task
+
+async def speculative_context(task: Optional[asyncio.Task], timeout: float = RAG_SPECULATIVE_TIMEOUT_SECONDS) -> Optional[str]:
+    """
+    Result of a speculative search if it finds documents within `timeout`; never raises.
+
+    A search that misses the deadline is not cancelled: it finishes into the
+    tool cache, where the model's own rag_search for the question picks it up.
+    """
+    if task is None:
+        return None
+    try:
+        result = await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        logger.debug("Speculative search timed out", timeout_seconds=timeout)
+        return None
+    except Exception as e:
+        logger.warning("Speculative search failed", error=str(e))
+        return None
+
+    if not isinstance(result, str) or result in (NO_RESULTS_MESSAGE, NO_COLLECTIONS_MESSAGE) or result.startswith("Search error:"):
+        return None
+    return result
+
+async def turn_context(
+    routing: Optional[asyncio.Task],
+    speculation: Optional[asyncio.Task],
+    timeout: float = RAG_SPECULATIVE_TIMEOUT_SECONDS
+) -> Tuple[List[RoutedCollection], Optional[str]]:
+    """
+    Routed collections and speculatively retrieved documentation, waiting at most `timeout` for both together.
+
+    Whatever has not finished by the shared deadline is left running (see
+    `speculative_context`) and counts as missing; never raises.
+    """
+    pending = {task for task in (routing, speculation) if task is not None}
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
+    return await routed_collections(routing, timeout=0), await speculative_context(speculation, timeout=0)
+
+def retrieved_context_note(
+    context: Optional[str],
+    routed: Optional[List[RoutedCollection]] = None,
+    collection: Optional[str] = RAG_DEFAULT_COLLECTION
+) -> Optional[str]:
+    """Note for the model (see `turn_note`) naming the routed collections and carrying the retrieved documentation."""
+    parts = []
+    if routed:
+        names = ", ".join(item.name for item in routed)
+        parts.append(
+            f"Collections most likely to hold the answer to the user's latest message: {names}. "
+            "Search these with rag_search instead of listing the collections first."
+        )
+    if context:
+        searched = ", ".join(item.name for item in routed or []) if collection == ROUTED_COLLECTIONS else collection
+        parts.append(
+            f"Documentation retrieved for the user's latest message (collection: {searched}). "
+            "Answer from it when it is relevant; use rag_search for anything it does not cover.\n\n"
+            f"{context}"
+        )
+    return "\n\n".join(parts) if parts else None
@@ -0,0 +1,28 @@
+from typing import Optional
+from langchain_core.prompts import PromptTemplate
+from app.config.llm import llm_for
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Longest title stored, whatever the model answers
+TITLE_MAX_LENGTH = 80
+
+title_prompt = PromptTemplate(
+    input_variables=["message"],
+    template=(
+        "Write a short title (at most 6 words) for a conversation that starts with the message below. "
+        "Use the language of the message and reply with the title only.\n\nMessage: {message}\n\nTitle:"
+    )
+)
+
+async def generate_title(message: str) -> Optional[str]:
+    """Title for a new conversation from its first message, on the title task's model tier; never raises."""
+    try:
+        response = await llm_for("title").ainvoke(title_prompt.format(message=message))
+    except Exception as e:
+        logger.warning("Title generation failed", error=str(e))
+        return None
+
+    title = str(response.content).strip().strip("\"'*#").strip()
+    return title[:TITLE_MAX_LENGTH] or None
@@ -0,0 +1,218 @@
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from langchain_core.tools import BaseTool, StructuredTool
+from app.config.load import RAG_TOOL_CACHE_SCOPE, RAG_TOOL_CACHE_TTL_SECONDS, RAG_TOOL_CACHE_MAX_ENTRIES
+from app.tools.rag.catalog import collection_catalog
+from app.tools.rag.search import ALL_COLLECTIONS
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Conversation whose agent run is executing; tool tasks inherit it from the request
+_current_conversation: ContextVar[Optional[str]] = ContextVar("tool_cache_conversation", default=None)
+
+# Trailing punctuation ignored when comparing free-text arguments ("reset password?" == "Reset password")
+TEXT_PUNCTUATION = "?!.;:, "
+
+@contextmanager
+def conversation_scope(conversation_id: Any) -> Iterator[None]:
+    """Attribute tool calls made inside the block to a conversation."""
+    token = _current_conversation.set(str(conversation_id))
+    try:
+        yield
+    finally:
+        _current_conversation.reset(token)
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How a read-only tool's arguments map to a cache key.
+
+    Attributes:
+        collections_of: Collections a call reads, from its normalized arguments; None means all of them
+        text_args: Free-text arguments compared case- and whitespace-insensitively
+        unordered_args: List arguments whose order does not change the result
+    """
+    collections_of: Callable[[Dict[str, Any]], Optional[List[str]]]
+    text_args: Tuple[str, ...] = ()
+    unordered_args: Tuple[str, ...] = ()
+
+@dataclass
+class _Entry:
+    result: Any
+    expires_at: float
+    collections: Optional[Tuple[str, ...]]
+    stamp: Tuple[Tuple[str, Optional[int]], ...]
+
+@dataclass
+class _ToolStats:
+    hits: int = 0
+    misses: int = 0
+
+class ToolResultCache:
+    """
+    LRU cache of read-only tool results with a TTL.
+
+    Entries are keyed on the conversation (unless the scope is "global"),
+    the tool and its normalized arguments. Writes to a collection drop the
+    entries that read it, via the collection catalog's invalidation hook.
+    Results that report an error are never cached.
+
+    The invalidation hook only sees writes made by this process. To notice
+    writes from other workers, each entry is stamped with the points count of
+    the collections it read, and a hit whose collections' counts have since
+    changed in the catalog (refreshed in the background every
+    RAG_CATALOG_TTL_SECONDS) is treated as a miss. A write that leaves a count
+    unchanged (e.g. re-indexing a document without adding chunks) is only
+    picked up by other workers once the entry's TTL expires.
+    """
+
+    def __init__(
+        self,
+        scope: str = RAG_TOOL_CACHE_SCOPE,
+        ttl: float = RAG_TOOL_CACHE_TTL_SECONDS,
+        max_entries: int = RAG_TOOL_CACHE_MAX_ENTRIES
+    ):
+        self.scope = scope
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.invalidations = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], _Entry]" = OrderedDict()
+        self._stats: Dict[str, _ToolStats] = {}
+        # Bumped on every invalidation; a result computed across one is not stored
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.scope in ("conversation", "global") and self.ttl > 0
+
+    def _scope_key(self) -> Optional[str]:
+        if self.scope == "global":
+            return "*"
+        return _current_conversation.get()
+
+    @staticmethod
+    def _normalize(arguments: Dict[str, Any], policy: CachePolicy) -> Dict[str, Any]:
+        normalized = {}
+        for name, value in arguments.items():
+            if isinstance(value, str):
+                value = " ".join(value.split())
+                if name in policy.text_args:
+                    value = value.casefold().rstrip(TEXT_PUNCTUATION)
+            elif isinstance(value, list) and name in policy.text_args:
+                value = [" ".join(item.split()).casefold().rstrip(TEXT_PUNCTUATION) for item in value]
+            if isinstance(value, list) and name in policy.unordered_args:
+                value = sorted(set(value))
+            normalized[name] = value
+        return normalized
+
+    @staticmethod
+    async def _stamp(collections: Optional[List[str]]) -> Optional[Tuple[Tuple[str, Optional[int]], ...]]:
+        """Points count of each collection a result reads, per the catalog; None if the catalog is unavailable."""
+        try:
+            entries = await collection_catalog.entries()
+        except Exception:
+            return None
+        counts = {entry.name: entry.points_count for entry in entries}
+        return tuple((name, counts.get(name)) for name in (sorted(counts) if collections is None else collections))
+
+    @staticmethod
+    def _is_error(result: Any) -> bool:
+        """Tools report failures as {"error": ...} or a "Search error: ..." string."""
+        if isinstance(result, dict):
+            return "error" in result
+        return isinstance(result, str) and result.startswith("Search error:")
+
+    async def call(self, tool: BaseTool, policy: CachePolicy, arguments: Dict[str, Any]) -> Any:
+        """Run a tool through the cache."""
+        scope = self._scope_key()
+        if not self.enabled or scope is None:
+            return await tool.coroutine(**arguments)
+
+        normalized = self._normalize(tool.args_schema(**arguments).model_dump(), policy)
+        key = (scope, tool.name, json.dumps(normalized, sort_keys=True, default=str))
+        stats = self._stats.setdefault(tool.name, _ToolStats())
+        collections = policy.collections_of(normalized)
+        stamp = await self._stamp(collections)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic() and stamp is not None and entry.stamp == stamp:
+            self._entries.move_to_end(key)
+            stats.hits += 1
+            logger.debug("Tool result served from cache", tool=tool.name, conversation_id=scope)
+            return entry.result
+
+        stats.misses += 1
+        writes = self._writes
+        result = await tool.coroutine(**arguments)
+        if self._is_error(result) or writes != self._writes or stamp is None:
+            return result
+
+        self._entries[key] = _Entry(
+            result=result,
+            expires_at=time.monotonic() + self.ttl,
+            collections=tuple(collections) if collections is not None else None,
+            stamp=stamp
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, collection_name: Optional[str] = None) -> None:
+        """Drop results that read a collection (or, with no name, every result)."""
+        self._writes += 1
+        stale = [
+            key for key, entry in self._entries.items()
+            if collection_name is None or entry.collections is None or collection_name in entry.collections
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self.invalidations += len(stale)
+            logger.debug("Tool cache entries invalidated", collection_name=collection_name, count=len(stale))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counts per tool and overall, for monitoring."""
+        hits = sum(tool.hits for tool in self._stats.values())
+        misses = sum(tool.misses for tool in self._stats.values())
+        return {
+            "scope": self.scope if self.enabled else "off",
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "invalidated": self.invalidations,
+            "tools": {name: {"hits": tool.hits, "misses": tool.misses} for name, tool in self._stats.items()},
+        }
+
+    def wrap(self, tool: BaseTool, policy: CachePolicy) -> StructuredTool:
+        """A copy of a tool whose calls go through this cache (same name, description and schema)."""
+        async def run(**arguments: Any) -> Any:
+            return await self.call(tool, policy, arguments)
+
+        return StructuredTool.from_function(
+            coroutine=run,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema
+        )
+
+def search_collections(arguments: Dict[str, Any]) -> Optional[List[str]]:
+    """Collections read by rag_qdrant_search / rag_batch_search; None when searching all of them."""
+    names = arguments.get("collections") or [arguments["collection"]]
+    return None if ALL_COLLECTIONS in names else names
+
+# Cache key policy of rag_qdrant_search (shared with the speculative search, so the model's call can reuse it)
+SEARCH_CACHE_POLICY = CachePolicy(search_collections, text_args=("query",), unordered_args=("collections", "tags"))
+
+tool_cache = ToolResultCache()
+collection_catalog.add_invalidation_listener(tool_cache.invalidate)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Set
+from langchain_core.tools import BaseTool, StructuredTool
+from app.config.load import TOOL_MAX_CONCURRENCY, TOOL_TIMEOUT_SECONDS, TOOL_TIMEOUTS
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Tools that legitimately run long (PDF extraction, embedding a whole document)
+DEFAULT_TOOL_TIMEOUTS = {
+    "pdf_to_chunks": 600.0,
+    "add_documents_tool": 600.0,
+}
+
+# Tools that write to Qdrant: cancelling one half-way leaves a partial write, so a call that
+# misses its deadline keeps running in the background instead
+BACKGROUND_ON_TIMEOUT = {"add_documents_tool", "create_collection_tool"}
+
+# Limits the tool calls of the current agent turn; set by `tool_turn`
+_turn_slots: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("tool_turn_slots", default=None)
+
+@contextmanager
+def tool_turn(max_concurrency: int = TOOL_MAX_CONCURRENCY) -> Iterator[None]:
+    """
+    Bound the tool calls running at once during one agent turn.
+
+    The model may emit several tool calls in one step; the agent's tool node
+    starts them all concurrently and each waits here for a slot.
+    """
+    token = _turn_slots.set(asyncio.Semaphore(max_concurrency))
+    try:
+        yield
+    finally:
+        _turn_slots.reset(token)
+
+class ToolExecutor:
+    """
+    Runs agent tools under a per-turn concurrency limit and per-tool deadlines.
+
+    When a call misses its deadline, the model receives a structured timeout
+    result instead, so the turn can continue (answer with what it has, retry
+    narrower, or tell the user). Async read-only tools are cancelled. Write
+    tools (BACKGROUND_ON_TIMEOUT) and sync tools, whose worker thread cannot be
+    interrupted, keep running in the background, and the result says so.
+    """
+
+    def __init__(self, default_timeout: float = TOOL_TIMEOUT_SECONDS, timeouts: Optional[Dict[str, float]] = None):
+        self.default_timeout = default_timeout
+        self.timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(timeouts if timeouts is not None else TOOL_TIMEOUTS)}
+        # Calls left running past their deadline (referenced so they are not garbage collected)
+        self._background: Set[asyncio.Task] = set()
+
+    def timeout_for(self, tool_name: str) -> float:
+        return self.timeouts.get(tool_name, self.default_timeout)
+
+    async def _invoke(self, tool: BaseTool, arguments: Dict[str, Any]) -> Any:
+        if tool.coroutine is not None:
+            return await tool.coroutine(**arguments)
+        return await asyncio.to_thread(tool.func, **arguments)
+
+    @staticmethod
+    def runs_past_deadline(tool: BaseTool) -> bool:
+        """Whether a late call is left running rather than cancelled."""
+        return tool.name in BACKGROUND_ON_TIMEOUT or tool.coroutine is None
+
+    def _finished_in_background(self, tool_name: str, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("Background tool call failed", tool=tool_name, error=str(task.exception()))
+        else:
+            logger.info("Background tool call finished", tool=tool_name)
+
+    async def _run_with_deadline(self, tool: BaseTool, arguments: Dict[str, Any], timeout: float) -> Any:
+        task = asyncio.ensure_future(self._invoke(tool, arguments))
+        if not self.runs_past_deadline(tool):
+            return await asyncio.wait_for(task, timeout)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if not task.done():
+                self._background.add(task)
+                task.add_done_callback(lambda done: self._finished_in_background(tool.name, done))
+            raise
+
+    async def call(self, tool: BaseTool, arguments: Dict[str, Any]) -> Any:
+        """Run one tool call, waiting for a slot of the current turn."""
+        timeout = self.timeout_for(tool.name)
+        slots = _turn_slots.get()
+        started = time.perf_counter()
+        try:
+            if slots is None:
+                return await self._run_with_deadline(tool, arguments, timeout)
+            # The deadline covers the call itself, not the wait for a slot
+            async with slots:
+                return await self._run_with_deadline(tool, arguments, timeout)
+        except asyncio.TimeoutError:
+            still_running = self.runs_past_deadline(tool)
+            logger.warning("Tool call timed out", tool=tool.name, timeout_seconds=timeout, still_running=still_running)
+            if still_running:
+                error = (
+                    f"{tool.name} did not finish within {timeout:g} seconds and is still running in the background; "
+                    "its result will not be reported here, so check its effect before retrying"
+                )
+            else:
+                error = f"{tool.name} did not finish within {timeout:g} seconds and was cancelled"
+            return {
+                "error": error,
+                "timed_out": True,
+                "still_running": still_running,
+                "tool": tool.name,
+                "timeout_seconds": timeout,
+            }
+        finally:
+            logger.debug("Tool call finished", tool=tool.name, duration_ms=round((time.perf_counter() - started) * 1000))
+
+    def wrap(self, tool: BaseTool) -> StructuredTool:
+        """A copy of a tool whose calls go through this executor (same name, description and schema)."""
+        async def run(**arguments: Any) -> Any:
+            return await self.call(tool, arguments)
+
+        return StructuredTool.from_function(
+            coroutine=run,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema
+        )
+
+tool_executor = ToolExecutor()
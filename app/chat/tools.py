@@ -1,15 +1,23 @@
 # List of available tools for the chat agent
 from app.tools.rag.search import rag_qdrant_search
+from app.tools.rag.batch_search import rag_batch_search
 from app.tools.rag.add_documents import add_documents_tool
 from app.tools.rag.create_collection import create_collection_tool
 from app.tools.rag.pdf_chunker import pdf_to_chunks
 from app.tools.rag.get_collections import get_collections_tool
+from app.chat.tool_cache import SEARCH_CACHE_POLICY, CachePolicy, search_collections, tool_cache
+from app.chat.tool_executor import tool_executor
 
-# Available tools for the LangChain agent
+# Available tools for the LangChain agent; searches repeated within a conversation are served from the tool cache,
+# and every call runs under the executor's per-turn concurrency limit and per-tool deadline
 tools_list = [
-    rag_qdrant_search,
-    add_documents_tool,
-    create_collection_tool,
-    pdf_to_chunks,
-    get_collections_tool
+    tool_executor.wrap(tool)
+    for tool in [
+        tool_cache.wrap(rag_qdrant_search, SEARCH_CACHE_POLICY),
+        tool_cache.wrap(rag_batch_search, CachePolicy(search_collections, text_args=("queries",), unordered_args=("tags",))),
+        add_documents_tool,
+        create_collection_tool,
+        pdf_to_chunks,
+        get_collections_tool
+    ]
 ]
\ No newline at end of file
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from qdrant_client import models
+from app.config.qdrant import DENSE_VECTOR_NAME, SPARSE_VECTOR_NAME
+
+DEFAULT_PROFILE = "default"
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """
+    Named storage/index settings for a collection.
+
+    Profiles trade RAM for recall: quantized profiles keep compressed vectors
+    in RAM and the originals on disk, and rescore an oversampled candidate
+    set against the originals at query time. Profiles with `dimensions`
+    store shortened embeddings (text-embedding-3 models), and queries on
+    their collections are embedded at the same size.
+    """
+    name: str
+    description: str
+    dimensions: Optional[int] = None  # None: the deployment's native size
+    distance: models.Distance = models.Distance.COSINE
+    quantization: Optional[str] = None  # "scalar" (int8) or "binary"
+    oversampling: float = 1.0
+    rescore: bool = True
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_hnsw_ef: Optional[int] = None
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+
+    def collection_config(self, vector_size: int) -> Dict[str, Any]:
+        """Keyword arguments for `create_collection` implementing this profile."""
+        quantization_config = None
+        if self.quantization == "scalar":
+            quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        elif self.quantization == "binary":
+            quantization_config = models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+
+        return {
+            "vectors_config": {
+                DENSE_VECTOR_NAME: models.VectorParams(
+                    size=vector_size,
+                    distance=self.distance,
+                    on_disk=self.on_disk_vectors
+                )
+            },
+            "sparse_vectors_config": {
+                # IDF is applied server-side, so stored BM25 weights stay valid as the corpus grows
+                SPARSE_VECTOR_NAME: models.SparseVectorParams(
+                    index=models.SparseIndexParams(on_disk=self.on_disk_vectors),
+                    modifier=models.Modifier.IDF
+                )
+            },
+            "hnsw_config": models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct),
+            "quantization_config": quantization_config,
+            "on_disk_payload": self.on_disk_payload,
+        }
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        """Query-time parameters for dense search on collections using this profile."""
+        if not self.quantization and self.search_hnsw_ef is None:
+            return None
+        quantization = None
+        if self.quantization:
+            quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        return models.SearchParams(hnsw_ef=self.search_hnsw_ef, quantization=quantization)
+
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    profile.name: profile for profile in (
+        CollectionProfile(
+            name="default",
+            description="Full-precision vectors and payloads in RAM. Best for small and medium collections."
+        ),
+        CollectionProfile(
+            name="high_recall",
+            description="Denser HNSW graph and wider search beam, full precision in RAM. More RAM and slower indexing.",
+            hnsw_m=32,
+            hnsw_ef_construct=256,
+            search_hnsw_ef=128
+        ),
+        CollectionProfile(
+            name="compact",
+            description="int8 scalar quantization in RAM (~4x smaller), originals and payloads on disk, rescored at query time.",
+            quantization="scalar",
+            oversampling=2.0,
+            on_disk_vectors=True,
+            on_disk_payload=True
+        ),
+        CollectionProfile(
+            name="reduced",
+            description="Shortened 1024-dim embeddings (text-embedding-3 models) with int8 quantization, originals and payloads on disk. Measure recall with benchmarks.eval_dimensions first.",
+            dimensions=1024,
+            quantization="scalar",
+            oversampling=2.0,
+            on_disk_vectors=True,
+            on_disk_payload=True
+        ),
+        CollectionProfile(
+            name="large",
+            description="Binary quantization in RAM (~32x smaller), originals and payloads on disk, oversampled and rescored.",
+            quantization="binary",
+            oversampling=3.0,
+            hnsw_ef_construct=200,
+            on_disk_vectors=True,
+            on_disk_payload=True
+        ),
+    )
+}
+
+def get_profile(name: Optional[str]) -> CollectionProfile:
+    """
+    Look up a collection profile by name.
+
+    Raises:
+        ValueError: If the profile does not exist
+    """
+    profile = COLLECTION_PROFILES.get(name or DEFAULT_PROFILE)
+    if profile is None:
+        raise ValueError(f"Unknown collection profile '{name}'. Available: {', '.join(COLLECTION_PROFILES)}")
+    return profile
+
+def match_profile(
+    quantization: Optional[str],
+    hnsw_m: Optional[int],
+    vector_size: Optional[int] = None
+) -> Optional[CollectionProfile]:
+    """Identify which profile an existing collection was created with, if any."""
+    candidates = [
+        profile for profile in COLLECTION_PROFILES.values()
+        if profile.quantization == quantization and profile.hnsw_m == hnsw_m
+    ]
+    for profile in candidates:
+        if profile.dimensions is not None and profile.dimensions == vector_size:
+            return profile
+    return next((profile for profile in candidates if profile.dimensions is None), None)
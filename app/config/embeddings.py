@@ -1,14 +1,122 @@
+import asyncio
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from langchain_openai import AzureOpenAIEmbeddings
 from app.config.load import (
     AZURE_OPENAI_EMBEDDINGS_API_KEY,
     AZURE_OPENAI_EMBEDDINGS_ENDPOINT,
     AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME,
     AZURE_OPENAI_API_VERSION,
+    EMBEDDING_VECTOR_SIZE,
 )
 
-embedding_model = AzureOpenAIEmbeddings(
-    openai_api_key=AZURE_OPENAI_EMBEDDINGS_API_KEY,
-    azure_endpoint=AZURE_OPENAI_EMBEDDINGS_ENDPOINT,
-    deployment=AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME,
-    openai_api_version=AZURE_OPENAI_API_VERSION,
-)
+@lru_cache(maxsize=None)
+def get_embedding_model(dimensions: Optional[int] = None) -> AzureOpenAIEmbeddings:
+    """
+    Embedding client for the configured deployment.
+
+    Args:
+        dimensions: Shortened output size (text-embedding-3 models only); None for the native size
+    """
+    return AzureOpenAIEmbeddings(
+        openai_api_key=AZURE_OPENAI_EMBEDDINGS_API_KEY,
+        azure_endpoint=AZURE_OPENAI_EMBEDDINGS_ENDPOINT,
+        deployment=AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME,
+        openai_api_version=AZURE_OPENAI_API_VERSION,
+        dimensions=dimensions,
+    )
+
+embedding_model = get_embedding_model()
+
+# Output size of known embedding models; deployments are usually named after the model
+EMBEDDING_MODEL_DIMENSIONS = {
+    "text-embedding-3-large": 3072,
+    "text-embedding-3-small": 1536,
+    "text-embedding-ada-002": 1536,
+}
+
+# Models that accept a `dimensions` parameter (shortened embeddings)
+SHORTENING_MODELS = ("text-embedding-3-",)
+
+# Recent query embeddings kept per process, so the routing, speculative and agent searches of one message share them
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
+_vector_size: Optional[int] = None
+_shortening_supported: Dict[int, bool] = {}
+_query_embeddings: "OrderedDict[Tuple[int, str], asyncio.Future]" = OrderedDict()
+
+async def get_embedding_vector_size() -> int:
+    """
+    Get the vector size produced by the configured embedding deployment.
+
+    Uses EMBEDDING_VECTOR_SIZE when set, then the known size of the model the
+    deployment is named after, and otherwise embeds a probe string once.
+    """
+    global _vector_size
+    if _vector_size is None:
+        if EMBEDDING_VECTOR_SIZE:
+            _vector_size = EMBEDDING_VECTOR_SIZE
+        else:
+            deployment = (AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME or "").lower()
+            _vector_size = next(
+                (size for model, size in EMBEDDING_MODEL_DIMENSIONS.items() if model in deployment),
+                None
+            ) or len(await embedding_model.aembed_query("dimension probe"))
+    return _vector_size
+
+async def get_embeddings_for(vector_size: Optional[int]) -> AzureOpenAIEmbeddings:
+    """
+    Embedding client producing vectors of a collection's dense size.
+
+    Documents and queries of a collection must be embedded at the same size,
+    so both ingestion and search pick their client through this.
+    """
+    if vector_size is None or vector_size == await get_embedding_vector_size():
+        return embedding_model
+    return get_embedding_model(vector_size)
+
+async def supports_dimensions(vector_size: int) -> bool:
+    """
+    Whether the embedding deployment can produce shortened `vector_size` embeddings.
+
+    Deployments named after a text-embedding-3 model are trusted; any other
+    deployment is probed once per size with the `dimensions` parameter.
+    A failed probe is not cached, so a transient error can be retried.
+    """
+    deployment = (AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME or "").lower()
+    if any(model in deployment for model in SHORTENING_MODELS):
+        return True
+    if vector_size not in _shortening_supported:
+        probe = await get_embedding_model(vector_size).aembed_query("dimension probe")
+        _shortening_supported[vector_size] = len(probe) == vector_size
+    return _shortening_supported[vector_size]
+
+async def embed_query(query: str, vector_size: Optional[int] = None) -> List[float]:
+    """
+    Embed a search query at a collection's dense size.
+
+    Requests for a query already embedded (or being embedded) by the same
+    client share its result instead of calling the API again.
+    """
+    embeddings = await get_embeddings_for(vector_size)
+    key = (id(embeddings), query)
+    future = _query_embeddings.get(key)
+    if future is None:
+        future = asyncio.ensure_future(embeddings.aembed_query(query))
+        _query_embeddings[key] = future
+        while len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+            _query_embeddings.popitem(last=False)
+    else:
+        _query_embeddings.move_to_end(key)
+
+    if future.done() and not future.cancelled() and future.exception() is None:
+        return future.result()
+    try:
+        return await asyncio.shield(future)
+    except BaseException:
+        # Don't keep failures; the next request retries (a caller being cancelled is not a failure)
+        failed = future.done() and (future.cancelled() or future.exception() is not None)
+        if failed and _query_embeddings.get(key) is future:
+            del _query_embeddings[key]
+        raise
@@ -1,16 +1,44 @@
+from functools import lru_cache
+from typing import Any, Dict
 from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
 from app.config.load import (
     AZURE_OPENAI_API_KEY,
     AZURE_OPENAI_ENDPOINT,
-    AZURE_OPENAI_DEPLOYMENT_NAME,
     AZURE_OPENAI_API_VERSION,
+    LLM_TIERS,
+    LLM_TASK_TIERS,
 )
+from app.utils.llm_usage import LLMUsageTracker
 
-llm_model = init_chat_model(
-    model="azure_openai:gpt-4o-mini",
-    azure_deployment=AZURE_OPENAI_DEPLOYMENT_NAME,
-    openai_api_key=AZURE_OPENAI_API_KEY,
-    azure_endpoint=AZURE_OPENAI_ENDPOINT,
-    openai_api_version=AZURE_OPENAI_API_VERSION,
-    temperature=0,
-)
+# Latency and token usage per tier, fed by callbacks on the tier's model
+usage_trackers: Dict[str, LLMUsageTracker] = {tier: LLMUsageTracker(tier) for tier in LLM_TIERS}
+
+@lru_cache(maxsize=None)
+def get_chat_model(tier: str = "primary") -> BaseChatModel:
+    """
+    Chat model of a configured tier (a deployment).
+
+    Args:
+        tier: Tier name from LLM_TIERS ("primary", "fast", ...)
+    """
+    if tier not in LLM_TIERS:
+        raise ValueError(f"Unknown model tier '{tier}'; configured tiers: {', '.join(LLM_TIERS)}")
+    return init_chat_model(
+        model="azure_openai:gpt-4o-mini",
+        azure_deployment=LLM_TIERS[tier],
+        openai_api_key=AZURE_OPENAI_API_KEY,
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        openai_api_version=AZURE_OPENAI_API_VERSION,
+        temperature=0,
+        callbacks=[usage_trackers[tier]],
+    )
+
+def llm_for(task: str) -> BaseChatModel:
+    """Chat model of the tier assigned to a task ("agent", "summary", "title"); the primary one for unknown tasks."""
+    return get_chat_model(LLM_TASK_TIERS.get(task, "primary"))
+
+def usage_stats() -> Dict[str, Any]:
+    return {tier: tracker.stats() for tier, tracker in usage_trackers.items()}
+
+llm_model = get_chat_model("primary")
@@ -3,6 +3,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _pairs(name: str) -> dict:
+    """Parse a "key=value,key=value" variable."""
+    return {
+        key.strip(): value.strip()
+        for key, value in (item.split("=", 1) for item in os.getenv(name, "").split(",") if "=" in item)
+    }
+
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
@@ -16,4 +23,63 @@ QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 GOOGLE_CLOUD_CLIENT_ID = os.getenv("GOOGLE_CLOUD_CLIENT_ID")
 GOOGLE_CLOUD_CLIENT_SECRET = os.getenv("GOOGLE_CLOUD_CLIENT_SECRET")
 SECRET_KEY = os.getenv("SECRET_KEY")
-FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
\ No newline at end of file
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
+
+# Dense vector size of the embedding deployment (inferred from the deployment when unset)
+EMBEDDING_VECTOR_SIZE = int(os.getenv("EMBEDDING_VECTOR_SIZE", "0")) or None
+
+# RAG ingestion tuning
+RAG_EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+RAG_EMBED_CONCURRENCY = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))
+RAG_UPSERT_BATCH_SIZE = int(os.getenv("RAG_UPSERT_BATCH_SIZE", "256"))
+RAG_INGEST_MAX_RETRIES = int(os.getenv("RAG_INGEST_MAX_RETRIES", "3"))
+# Jaccard similarity above which a chunk is skipped as a near duplicate (0 disables)
+RAG_NEAR_DUPLICATE_THRESHOLD = float(os.getenv("RAG_NEAR_DUPLICATE_THRESHOLD", "0.9"))
+
+# Seconds between background refreshes of the cached collection catalog
+RAG_CATALOG_TTL_SECONDS = float(os.getenv("RAG_CATALOG_TTL_SECONDS", "60"))
+
+# Token budget for retrieved context returned by the search tools
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "2000"))
+
+# Search results reused within a conversation ("conversation"), across conversations ("global") or never ("off")
+RAG_TOOL_CACHE_SCOPE = os.getenv("RAG_TOOL_CACHE_SCOPE", "conversation")
+RAG_TOOL_CACHE_TTL_SECONDS = float(os.getenv("RAG_TOOL_CACHE_TTL_SECONDS", "120"))
+RAG_TOOL_CACHE_MAX_ENTRIES = int(os.getenv("RAG_TOOL_CACHE_MAX_ENTRIES", "1000"))
+
+# Collection ("all" for every one, "auto" for the routed ones) searched for each new message while its history loads;
+# the results are given to the model up front so it can answer without a first search round trip (unset disables)
+RAG_DEFAULT_COLLECTION = os.getenv("RAG_DEFAULT_COLLECTION") or None
+# Longest wait for that search once the history is ready
+RAG_SPECULATIVE_TIMEOUT_SECONDS = float(os.getenv("RAG_SPECULATIVE_TIMEOUT_SECONDS", "1.5"))
+# Collections named to the model for each new message, ranked by how close their documents are to it (0 disables)
+RAG_ROUTER_TOP_K = int(os.getenv("RAG_ROUTER_TOP_K", "2"))
+
+# Processes used to extract PDF pages (defaults to the CPU count)
+RAG_PDF_WORKERS = int(os.getenv("RAG_PDF_WORKERS", "0")) or None
+
+# Uploaded documents are spooled here until their ingestion job finishes
+RAG_UPLOAD_DIR = os.getenv("RAG_UPLOAD_DIR") or None
+RAG_UPLOAD_MAX_MB = int(os.getenv("RAG_UPLOAD_MAX_MB", "200"))
+# Agent tool execution: concurrent calls per turn, default deadline, and per-tool deadlines ("pdf_to_chunks=900,rag_qdrant_search=20")
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+TOOL_TIMEOUTS = {name: float(seconds) for name, seconds in _pairs("TOOL_TIMEOUTS").items()}
+
+# Chat model tiers: "primary" answers the user, "fast" (a smaller deployment; the primary one when unset) runs
+# auxiliary calls. More tiers can be added as "name=deployment,..." and tasks reassigned as "task=tier,..."
+AZURE_OPENAI_FAST_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_FAST_DEPLOYMENT_NAME") or AZURE_OPENAI_DEPLOYMENT_NAME
+LLM_TIERS = {"primary": AZURE_OPENAI_DEPLOYMENT_NAME, "fast": AZURE_OPENAI_FAST_DEPLOYMENT_NAME, **_pairs("LLM_TIERS")}
+LLM_TASK_TIERS = {"agent": "primary", "summary": "fast", "title": "fast", **_pairs("LLM_TASK_TIERS")}
+# Title new conversations from their first message (only those still named "New Conversation")
+CONVERSATION_AUTO_TITLE = os.getenv("CONVERSATION_AUTO_TITLE", "true").lower() in ("1", "true", "yes")
+
+# Durable agent state per conversation: a Postgres URL (the app database when unset and it is Postgres), a SQLite
+# URL, "memory" (tests) or "off" (rebuild each turn from the messages table)
+AGENT_CHECKPOINT_URL = os.getenv("AGENT_CHECKPOINT_URL") or None
+AGENT_CHECKPOINT_POOL_SIZE = int(os.getenv("AGENT_CHECKPOINT_POOL_SIZE", "10"))
+# Pruning: checkpoints kept per conversation, days before an idle conversation's state is dropped (0 keeps it; the
+# next message rebuilds it from the messages table), and the interval between sweeps
+AGENT_CHECKPOINTS_PER_CONVERSATION = int(os.getenv("AGENT_CHECKPOINTS_PER_CONVERSATION", "3"))
+AGENT_CHECKPOINT_RETENTION_DAYS = float(os.getenv("AGENT_CHECKPOINT_RETENTION_DAYS", "30"))
+AGENT_CHECKPOINT_PRUNE_INTERVAL_SECONDS = float(os.getenv("AGENT_CHECKPOINT_PRUNE_INTERVAL_SECONDS", "3600"))
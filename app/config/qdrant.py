@@ -1,7 +1,19 @@
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from app.config.load import QDRANT_URL, QDRANT_API_KEY
 
-qdrant_client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY
-)
+# Named vectors used by collections created by the agent (dense embeddings + BM25 terms)
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "bm25"
+
+# QDRANT_URL=":memory:" runs Qdrant in-process (tests and benchmarks); each client then has its own store
+_client_options = {"location": ":memory:"} if QDRANT_URL == ":memory:" else {"url": QDRANT_URL, "api_key": QDRANT_API_KEY}
+
+qdrant_client = QdrantClient(**_client_options)
+
+# Shared async client used by the agent tools so searches don't block the event loop
+async_qdrant_client = AsyncQdrantClient(**_client_options)
+
+async def close_qdrant_clients():
+    """Close the shared Qdrant clients. Called once on application shutdown."""
+    await async_qdrant_client.close()
+    qdrant_client.close()
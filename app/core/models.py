@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base  
@@ -46,4 +46,26 @@ class Message(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+class IngestionJobRecord(Base):
+    """Progress of a background document ingestion, shared by all worker processes."""
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    collection_name = Column(String, nullable=False)
+    filename = Column(String, nullable=False)
+    document_id = Column(String, nullable=True)
+    status = Column(String, nullable=False)
+    pages_total = Column(Integer, nullable=True)
+    pages_done = Column(Integer, default=0)
+    chunks_ingested = Column(Integer, default=0)
+    chunks_failed = Column(Integer, default=0)
+    chunks_unchanged = Column(Integer, default=0)
+    chunks_removed = Column(Integer, default=0)
+    chunks_duplicate = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(Float, nullable=False)  # epoch seconds, as reported by the API
+    updated_at = Column(Float, nullable=False)  # last progress save or heartbeat of the running process
+    finished_at = Column(Float, nullable=True)
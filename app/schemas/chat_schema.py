@@ -4,6 +4,7 @@ from langchain.schema import BaseMessage
 from langgraph.prebuilt.chat_agent_executor import AgentState as LGAgentState
 
 END = "end"
+DEFAULT_CONVERSATION_TITLE = "New Conversation"
 
 class SendMessageRequest(BaseModel):
     """Request schema for sending a message to a conversation."""
@@ -15,4 +16,4 @@ class AgentState(LGAgentState):
 
 class CreateConversationRequest(BaseModel):
     """Request schema for creating a new conversation."""
-    title: str = "New Conversation"
\ No newline at end of file
+    title: str = DEFAULT_CONVERSATION_TITLE
\ No newline at end of file
@@ -3,11 +3,42 @@ from pydantic import BaseModel, Field
 from typing_extensions import Annotated
 from langgraph.graph.message import add_messages
 
+class DocumentMetadata(BaseModel):
+    """Structured metadata stored with each document chunk."""
+    source: Optional[str] = Field(default=None, description="Source document, e.g. file name or URL")
+    page: Optional[int] = Field(default=None, description="Page number within the source")
+    section: Optional[str] = Field(default=None, description="Section or chapter title")
+    doc_version: Optional[str] = Field(default=None, description="Product or document version, e.g. '2.3'")
+    tags: List[str] = Field(default_factory=list, description="Free-form tags, e.g. product names")
+
 class RAGQueryInput(BaseModel):
     """Input schema for RAG (Retrieval-Augmented Generation) queries."""
     query: str = Field(..., description="Query text for searching relevant documents")
-    top_k: Optional[int] = Field(default=5, description="Maximum number of documents to retrieve")
+    top_k: int = Field(default=5, ge=1, description="Maximum number of documents to retrieve")
+    collection: str = Field(..., description="Name of the Qdrant collection to search documents, or 'all' to search every collection")
+    collections: Optional[List[str]] = Field(
+        default=None,
+        description="Search several collections at once (use when unsure where something is documented); overrides `collection`"
+    )
+    diversify: bool = Field(default=False, description="Re-rank results for diversity (MMR) and drop near-duplicate chunks")
+    mmr_lambda: float = Field(default=0.5, ge=0.0, le=1.0, description="MMR trade-off: 1.0 favors relevance, 0.0 favors diversity")
+    max_chunks_per_source: Optional[int] = Field(default=None, ge=1, description="Maximum chunks returned from the same source document")
+    source: Optional[str] = Field(default=None, description="Only search chunks from this source document")
+    page: Optional[int] = Field(default=None, description="Only search chunks from this page")
+    section: Optional[str] = Field(default=None, description="Only search chunks from this section")
+    doc_version: Optional[str] = Field(default=None, description="Only search chunks for this document version")
+    tags: Optional[List[str]] = Field(default=None, description="Only search chunks having any of these tags")
+
+class RAGBatchQueryInput(BaseModel):
+    """Input schema for answering several queries against one collection in a single request."""
+    queries: List[str] = Field(..., min_length=1, max_length=10, description="Independent search queries, one per sub-question")
     collection: str = Field(..., description="Name of the Qdrant collection to search documents")
+    top_k: int = Field(default=3, ge=1, description="Maximum number of documents to retrieve per query")
+    source: Optional[str] = Field(default=None, description="Only search chunks from this source document")
+    page: Optional[int] = Field(default=None, description="Only search chunks from this page")
+    section: Optional[str] = Field(default=None, description="Only search chunks from this section")
+    doc_version: Optional[str] = Field(default=None, description="Only search chunks for this document version")
+    tags: Optional[List[str]] = Field(default=None, description="Only search chunks having any of these tags")
 
 class RagSearchArgs(BaseModel):
     """Arguments for RAG search tool."""
@@ -18,10 +49,32 @@ class RagSearchArgs(BaseModel):
 class PDFChunkerArgs(BaseModel):
     """Arguments for PDF chunking tool."""
     file_path: str = Field(..., description="Path to the PDF file to process")
-    max_pages: int = Field(default=15, description="Maximum number of pages to process from PDF")
+    max_pages: Optional[int] = Field(default=None, description="Only process the first N pages (all pages when omitted)")
     max_tokens_per_chunk: int = Field(default=650, description="Maximum number of tokens per chunk")
+    overlap_tokens: int = Field(default=64, ge=0, description="Tokens shared between consecutive chunks")
+    start_chunk: int = Field(default=0, ge=0, description="First chunk to return; pass the previous call's next_start_chunk to continue")
+    max_chunks: int = Field(default=20, ge=1, le=50, description="Maximum number of chunks returned by this call")
+
+class CreateCollectionArgs(BaseModel):
+    """Arguments for creating a collection."""
+    collection_name: str = Field(..., description="Name of the collection to create")
+    profile: str = Field(
+        default="default",
+        description="Storage profile: 'default' (small/medium, all in RAM), 'high_recall' (more RAM, best recall), "
+                    "'compact' (int8 quantized, ~4x less RAM), 'reduced' (1024-dim shortened embeddings, int8 quantized) "
+                    "or 'large' (binary quantized, ~32x less RAM)"
+    )
 
 class AddDocumentsArgs(BaseModel):
     """Arguments for adding documents to a collection."""
     collection_name: str = Field(..., description="Name of the Qdrant collection")
     documents: List[str] = Field(..., description="List of documents to add to the collection")
+    metadata: Optional[DocumentMetadata] = Field(default=None, description="Metadata applied to every document")
+    metadatas: Optional[List[DocumentMetadata]] = Field(
+        default=None,
+        description="Per-document metadata, same length and order as documents (overrides `metadata` fields)"
+    )
+    document_id: Optional[str] = Field(
+        default=None,
+        description="Stable id of the document these chunks belong to; re-adding it replaces the previous version (only changed chunks are re-embedded)"
+    )
@@ -2,6 +2,7 @@ from app.schemas.auth_schema import RegisterRequest, LoginRequest
 import bcrypt
 from app.core.models import User
 from sqlalchemy.orm import Session
+from uuid import UUID
 from fastapi import HTTPException, status, Depends, Header
 from app.services.jwt_service import create_access_token, decode_token, extract_token_from_header
 from app.core.database import get_db
@@ -146,7 +147,8 @@ async def get_current_user(
         user_id = payload.get("id")
         logger.debug("Fetching current user from database", user_id=user_id)
         
-        user = db.query(User).filter(User.id == user_id).first()
+        # The token carries the id as a string; compare as UUID so non-Postgres backends (SQLite) match too
+        user = db.query(User).filter(User.id == UUID(user_id)).first()
         
         if not user:
             logger.warning("Current user not found in database", user_id=user_id)
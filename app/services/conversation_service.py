@@ -185,6 +185,51 @@ async def update_conversation_summary(
         logger.error("Error updating conversation summary", conversation_id=conversation_id, user_id=user_id, error=str(e))
         raise
 
+async def update_conversation_title(
+    conversation_id: UUID,
+    user_id: UUID,
+    title: str,
+    db: Session,
+    only_if_title: Optional[str] = None
+) -> bool:
+    """
+    Update the title of a conversation.
+    
+    Args:
+        conversation_id: UUID of the conversation
+        user_id: UUID of the user
+        title: New title
+        db: Database session
+        only_if_title: Only rename a conversation still titled this (e.g. the default one)
+        
+    Returns:
+        True if the title was changed
+    """
+    logger.debug("Updating conversation title", conversation_id=conversation_id, user_id=user_id)
+    
+    try:
+        query = db.query(Conversation)\
+            .filter(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+        if only_if_title is not None:
+            query = query.filter(Conversation.title == only_if_title)
+        
+        conversation = query.first()
+        if not conversation:
+            return False
+        
+        conversation.title = title
+        db.commit()
+        
+        logger.info("Conversation title updated", conversation_id=conversation_id, user_id=user_id, title=title)
+        return True
+    except Exception as e:
+        logger.error("Error updating conversation title", conversation_id=conversation_id, user_id=user_id, error=str(e))
+        db.rollback()
+        raise
+
 async def delete_conversation_service(
     conversation_id: UUID,
     user_id: UUID,
@@ -0,0 +1,307 @@
+import asyncio
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID, uuid4
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.models import IngestionJobRecord
+from app.config.load import RAG_NEAR_DUPLICATE_THRESHOLD, RAG_UPSERT_BATCH_SIZE
+from app.tools.rag.ingestion import ingest_documents
+from app.tools.rag.near_duplicates import NearDuplicateFilter
+from app.tools.rag.pdf_chunker import PdfChunk, chunk_text, iter_pdf_chunks
+from app.tools.rag.versioning import DocumentSync
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# File types accepted for upload and how their text is extracted
+PDF_EXTENSIONS = {".pdf"}
+TEXT_EXTENSIONS = {".txt", ".md"}
+SUPPORTED_EXTENSIONS = PDF_EXTENSIONS | TEXT_EXTENSIONS
+
+# Chunk batches buffered between the extraction thread and the ingestion loop
+QUEUED_BATCHES = 2
+
+# Finished jobs are deleted after this many days
+JOB_RETENTION_DAYS = 7
+
+# A running job saves its progress at least this often, even while a batch is still being extracted or embedded
+JOB_HEARTBEAT_SECONDS = 30
+# Queued or processing jobs not saved for this long lost their process (crash, restart) and are marked failed
+JOB_STALE_SECONDS = 300
+
+# Statuses of jobs that have not finished
+ACTIVE_STATUSES = ("queued", "processing")
+
+@dataclass
+class IngestionJob:
+    """Progress of a background document ingestion."""
+    id: str
+    user_id: UUID
+    collection_name: str
+    filename: str
+    document_id: Optional[str] = None
+    status: str = "queued"  # queued, processing, completed, failed
+    pages_total: Optional[int] = None
+    pages_done: int = 0
+    chunks_ingested: int = 0
+    chunks_failed: int = 0
+    chunks_unchanged: int = 0
+    chunks_removed: int = 0
+    chunks_duplicate: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "collection_name": self.collection_name,
+            "filename": self.filename,
+            "document_id": self.document_id,
+            "status": self.status,
+            "pages_total": self.pages_total,
+            "pages_done": self.pages_done,
+            "chunks_ingested": self.chunks_ingested,
+            "chunks_failed": self.chunks_failed,
+            "chunks_unchanged": self.chunks_unchanged,
+            "chunks_removed": self.chunks_removed,
+            "chunks_duplicate": self.chunks_duplicate,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at,
+        }
+
+class IngestionJobRegistry:
+    """
+    Ingestion jobs persisted in the database.
+
+    Any worker process can report on a job started by another. The process
+    running a job keeps the live `IngestionJob` and writes it back when its
+    status changes, after every batch and on a heartbeat. A job that stops
+    being saved lost its process and is reported as failed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        retention_days: float = JOB_RETENTION_DAYS,
+        stale_seconds: float = JOB_STALE_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.retention_days = retention_days
+        self.stale_seconds = stale_seconds
+
+    def setup(self) -> None:
+        """Create the jobs table if needed and fail jobs left behind by a crash (called from the application lifespan)."""
+        with self.session_factory() as db:
+            IngestionJobRecord.__table__.create(db.get_bind(), checkfirst=True)
+            self._expire_stale(db)
+
+    def _expire_stale(self, db: Session) -> None:
+        """Mark queued or processing jobs whose process stopped saving them as failed."""
+        now = time.time()
+        expired = db.query(IngestionJobRecord)\
+            .filter(
+                IngestionJobRecord.status.in_(ACTIVE_STATUSES),
+                IngestionJobRecord.updated_at < now - self.stale_seconds
+            )\
+            .update(
+                {"status": "failed", "error": "Ingestion was interrupted (the server stopped)", "finished_at": now},
+                synchronize_session=False
+            )
+        db.commit()
+        if expired:
+            logger.warning("Stale ingestion jobs marked as failed", count=expired)
+
+    def create(self, user_id: UUID, collection_name: str, filename: str, document_id: Optional[str] = None) -> IngestionJob:
+        job = IngestionJob(
+            id=str(uuid4()),
+            user_id=user_id,
+            collection_name=collection_name,
+            filename=filename,
+            document_id=document_id
+        )
+        with self.session_factory() as db:
+            db.query(IngestionJobRecord)\
+                .filter(IngestionJobRecord.finished_at < time.time() - self.retention_days * 86400)\
+                .delete(synchronize_session=False)
+            db.add(IngestionJobRecord(**asdict(job)))
+            db.commit()
+        return job
+
+    def save(self, job: IngestionJob) -> None:
+        job.updated_at = time.time()
+        with self.session_factory() as db:
+            db.merge(IngestionJobRecord(**asdict(job)))
+            db.commit()
+
+    async def asave(self, job: IngestionJob) -> None:
+        """Write a job's progress without blocking the event loop; never raises (the job keeps running)."""
+        try:
+            await asyncio.to_thread(self.save, job)
+        except Exception as e:
+            logger.warning("Ingestion job progress not saved", job_id=job.id, error=str(e))
+
+    def get(self, job_id: str, user_id: UUID) -> Optional[IngestionJob]:
+        """Job by id, only if it belongs to `user_id`."""
+        with self.session_factory() as db:
+            self._expire_stale(db)
+            record = db.query(IngestionJobRecord)\
+                .filter(IngestionJobRecord.id == job_id, IngestionJobRecord.user_id == user_id)\
+                .first()
+            return _job_from_record(record) if record is not None else None
+
+    def list_for_user(self, user_id: UUID, limit: int = 100) -> List[IngestionJob]:
+        with self.session_factory() as db:
+            self._expire_stale(db)
+            records = db.query(IngestionJobRecord)\
+                .filter(IngestionJobRecord.user_id == user_id)\
+                .order_by(IngestionJobRecord.created_at.desc())\
+                .limit(limit)\
+                .all()
+            return [_job_from_record(record) for record in records]
+
+def _job_from_record(record: IngestionJobRecord) -> IngestionJob:
+    return IngestionJob(**{item.name: getattr(record, item.name) for item in fields(IngestionJob)})
+
+ingestion_jobs = IngestionJobRegistry()
+
+def _iter_file_chunks(job: IngestionJob, file_path: str, extension: str) -> Iterator[PdfChunk]:
+    """Chunks of an uploaded file, updating the job's page progress."""
+    if extension in PDF_EXTENSIONS:
+        def progress(page_number: int, total_pages: int) -> None:
+            job.pages_total = total_pages
+            job.pages_done = page_number
+
+        yield from iter_pdf_chunks(file_path, progress=progress)
+        return
+
+    with open(file_path, encoding="utf-8", errors="replace") as handle:
+        text = handle.read()
+    job.pages_total = job.pages_done = 1
+    for chunk in chunk_text(text):
+        yield PdfChunk(text=chunk, page=1)
+
+async def run_ingestion_job(job: IngestionJob, file_path: str, extension: str, metadata: Dict[str, Any]) -> None:
+    """
+    Extract, chunk, embed and upsert an uploaded file, then delete it.
+
+    Extraction and chunking run in a worker thread and hand batches of chunks
+    to the event loop through a small queue, so the document is never held
+    in memory as a whole and ingestion of one batch overlaps extraction of
+    the next. Jobs with a `document_id` replace the stored version of that
+    document, embedding only changed chunks (see `DocumentSync`).
+
+    Args:
+        job: Job to report progress on
+        file_path: Spooled upload on disk
+        extension: Lower-case file extension (selects the extractor)
+        metadata: Payload metadata applied to every chunk (section, doc_version, tags)
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUED_BATCHES)
+    stop = threading.Event()
+
+    def produce() -> None:
+        batch: List[PdfChunk] = []
+        try:
+            for chunk in _iter_file_chunks(job, file_path, extension):
+                if stop.is_set():
+                    return
+                batch.append(chunk)
+                if len(batch) >= RAG_UPSERT_BATCH_SIZE:
+                    asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                    batch = []
+            if batch:
+                asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+    finished = asyncio.Event()
+
+    async def heartbeat() -> None:
+        while not finished.is_set():
+            try:
+                await asyncio.wait_for(finished.wait(), JOB_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                await ingestion_jobs.asave(job)
+
+    job.status = "processing"
+    await ingestion_jobs.asave(job)
+    logger.info("Ingestion job started", job_id=job.id, collection_name=job.collection_name, filename=job.filename)
+
+    producer = loop.run_in_executor(None, produce)
+    beating = asyncio.create_task(heartbeat())
+    try:
+        sync = None
+        # One filter for the whole file, so boilerplate repeated across batches is caught
+        near_duplicates = NearDuplicateFilter(RAG_NEAR_DUPLICATE_THRESHOLD) if RAG_NEAR_DUPLICATE_THRESHOLD > 0 else None
+        if job.document_id:
+            sync = DocumentSync(job.collection_name, job.document_id, version=metadata.get("doc_version"))
+            await sync.begin()
+
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                break
+            texts = [chunk.text for chunk in batch]
+            metadatas = [{**metadata, "source": job.filename, "page": chunk.page} for chunk in batch]
+            if sync is not None:
+                await sync.add(texts, metadatas)
+                job.chunks_ingested = sync.report.added
+                job.chunks_failed = sync.report.failed
+                job.chunks_unchanged = sync.report.unchanged
+                job.chunks_duplicate = len(sync.report.duplicates)
+                await ingestion_jobs.asave(job)
+                continue
+            report = await ingest_documents(
+                job.collection_name,
+                texts,
+                metadatas=metadatas,
+                first_chunk_index=job.chunks_ingested + job.chunks_failed + job.chunks_duplicate,
+                near_duplicate_threshold=0,
+                near_duplicates=near_duplicates
+            )
+            job.chunks_ingested += report.added
+            job.chunks_failed += report.failed
+            job.chunks_duplicate += len(report.duplicates)
+            await ingestion_jobs.asave(job)
+        await producer
+
+        if sync is not None:
+            job.chunks_removed = (await sync.finish()).removed
+
+        job.status = "completed"
+        logger.info(
+            "Ingestion job completed",
+            job_id=job.id,
+            collection_name=job.collection_name,
+            chunks_ingested=job.chunks_ingested,
+            chunks_failed=job.chunks_failed,
+            chunks_removed=job.chunks_removed
+        )
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        logger.error("Ingestion job failed", job_id=job.id, collection_name=job.collection_name, error=str(e))
+        # Stop the producer and unblock it so the worker thread can finish
+        stop.set()
+        while not producer.done():
+            if (await queue.get()) is None:
+                break
+    finally:
+        # Let a heartbeat save in flight land before the final one
+        finished.set()
+        await beating
+        job.finished_at = time.time()
+        await ingestion_jobs.asave(job)
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
@@ -1,14 +1,16 @@
 import logging, sys
-from uuid import uuid4
 from langchain.tools import tool
-from typing import Dict, Any, List
-from app.config.qdrant import qdrant_client
-from app.config.embeddings import embedding_model
-from app.schemas.tools_schema import AddDocumentsArgs
+from typing import Dict, Any, List, Optional
+from app.tools.rag.ingestion import ingest_documents
+from app.tools.rag.versioning import sync_document
+from app.schemas.tools_schema import AddDocumentsArgs, DocumentMetadata
 from app.utils.logging_utils import get_secure_logger
 
 logger = get_secure_logger(__name__)
 
+# Skipped near duplicates listed in the tool result (the rest are only counted)
+DUPLICATE_EXAMPLES = 3
+
 def logger_setup():
     """
     Set up logger configuration for the application.
@@ -23,10 +25,34 @@ def logger_setup():
     )
     logging.info("logger setup complete.")
 
-@tool
-def add_documents_tool(
+def _merge_metadata(
+    metadata: Optional[DocumentMetadata],
+    metadatas: Optional[List[DocumentMetadata]],
+    count: int
+) -> Optional[List[Dict[str, Any]]]:
+    """Combine shared and per-document metadata into one payload dict per document."""
+    if metadata is None and metadatas is None:
+        return None
+
+    shared = metadata.model_dump(exclude_none=True) if metadata else {}
+    merged = []
+    for index in range(count):
+        own = metadatas[index].model_dump(exclude_none=True) if metadatas else {}
+        tags = list(dict.fromkeys(shared.get("tags", []) + own.get("tags", [])))
+        payload = {**shared, **own}
+        payload.pop("tags", None)
+        if tags:
+            payload["tags"] = tags
+        merged.append(payload)
+    return merged
+
+@tool(args_schema=AddDocumentsArgs)
+async def add_documents_tool(
     collection_name: str,
-    documents: List[str]
+    documents: List[str],
+    metadata: Optional[DocumentMetadata] = None,
+    metadatas: Optional[List[DocumentMetadata]] = None,
+    document_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Add documents to a specified Qdrant collection.
@@ -34,6 +60,10 @@ def add_documents_tool(
     Args:
         collection_name: Name of the Qdrant collection
         documents: List of document texts to add
+        metadata: Metadata (source, page, section, doc_version, tags) applied to every document
+        metadatas: Per-document metadata, same order as documents
+        document_id: Stable id of the document the texts are the chunks of; replaces its
+            previously stored version, embedding only changed chunks
         
     Returns:
         Dictionary with result message or error
@@ -44,28 +74,63 @@ def add_documents_tool(
         logger.warning("No documents provided for addition", collection_name=collection_name)
         return {"error": "No documents to add."}
 
+    if metadatas is not None and len(metadatas) != len(documents):
+        logger.warning("Metadata count does not match documents", collection_name=collection_name)
+        return {"error": f"Got {len(metadatas)} metadata entries for {len(documents)} documents."}
+
+    merged = _merge_metadata(metadata, metadatas, len(documents))
     try:
-        # Generate embeddings for all documents
-        vectors = embedding_model.embed_documents(documents)
-        logger.debug("Document embeddings generated", collection_name=collection_name, vector_count=len(vectors))
-        
-        # Create points for Qdrant
-        points = [
-            {"id": str(uuid4()), "vector": vec, "payload": {"text": doc}}
-            for doc, vec in zip(documents, vectors)
-        ]
+        if document_id:
+            # One stored version per document: the chunks must agree on doc_version
+            versions = {payload.get("doc_version") for payload in merged or [{}]}
+            if len(versions) > 1:
+                logger.warning("Conflicting document versions", collection_name=collection_name, document_id=document_id)
+                return {"error": f"Chunks of document '{document_id}' have different doc_version values: {sorted(map(str, versions))}."}
 
-        # Upsert points to collection
-        qdrant_client.upsert(
-            collection_name=collection_name,
-            points=points
+            # Versioned re-index: diff chunk hashes against the stored version
+            report = await sync_document(
+                collection_name,
+                document_id,
+                documents,
+                version=versions.pop(),
+                metadatas=merged
+            )
+            logger.info("Document synchronized", collection_name=collection_name, documents_added=report.added, documents_removed=report.removed)
+            result: Dict[str, Any] = {
+                "result": (
+                    f"Document '{document_id}' synchronized in '{collection_name}': "
+                    f"{report.added} chunks added, {report.unchanged} unchanged, {report.removed} removed."
+                )
+            }
+            if report.duplicates:
+                result["duplicates_skipped"] = len(report.duplicates)
+            if report.failed:
+                result["failed"] = report.failed
+                result["failed_batches"] = report.failed_batches
+            return result
+
+        # Embed and upsert in batches; failed batches are reported, not fatal
+        report = await ingest_documents(
+            collection_name,
+            documents,
+            metadatas=merged
         )
-        
-        logger.info("Documents added successfully", collection_name=collection_name, documents_added=len(points))
-        return {"result": f"{len(points)} documents added to '{collection_name}'."}
+
+        if not report.added and not report.duplicates:
+            logger.error("No documents could be added", collection_name=collection_name, failed=report.failed)
+            return {"error": f"No documents could be added to '{collection_name}'.", "failed_batches": report.failed_batches}
+
+        logger.info("Documents added successfully", collection_name=collection_name, documents_added=report.added)
+        result = {"result": f"{report.added} documents added to '{collection_name}'."}
+        if report.duplicates:
+            # Near-duplicate boilerplate (headers, footers, license text) is not embedded
+            result["duplicates_skipped"] = len(report.duplicates)
+            result["duplicate_examples"] = report.duplicates[:DUPLICATE_EXAMPLES]
+        if report.failed:
+            result["failed"] = report.failed
+            result["failed_batches"] = report.failed_batches
+        return result
     
     except Exception as e:
         logger.error("Error adding documents", collection_name=collection_name, error=str(e))
         return {"error": str(e)}
-
-
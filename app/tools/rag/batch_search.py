@@ -0,0 +1,74 @@
+from langchain.tools import tool
+from typing import List, Optional
+from app.config.qdrant import async_qdrant_client
+from app.config.embeddings import get_embeddings_for
+from app.schemas.tools_schema import RAGBatchQueryInput
+from app.tools.rag.collection_info import get_collection_layout
+from app.tools.rag.filters import build_filter
+from app.tools.rag.search import build_query_request, to_retrieved_chunks
+from app.tools.rag.context_packer import pack_context
+from app.config.load import RAG_CONTEXT_TOKEN_BUDGET
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+@tool(args_schema=RAGBatchQueryInput)
+async def rag_batch_search(
+    queries: List[str],
+    collection: str,
+    top_k: int = 3,
+    source: Optional[str] = None,
+    page: Optional[int] = None,
+    section: Optional[str] = None,
+    doc_version: Optional[str] = None,
+    tags: Optional[List[str]] = None
+) -> str:
+    """
+    Search a collection for several independent queries at once.
+
+    Use this instead of several rag_search calls when a question has multiple
+    parts. All queries are embedded in one request and searched with a single
+    Qdrant batch query.
+
+    Args:
+        queries: Search queries, one per sub-question
+        collection: Name of the Qdrant collection to search
+        top_k: Maximum number of results per query
+        source, page, section, doc_version, tags: Optional metadata filters applied to every query
+
+    Returns:
+        Results grouped under a heading per query
+    """
+    logger.info("Executing batch RAG search", collection=collection, query_count=len(queries), top_k=top_k)
+    query_filter = build_filter(source=source, page=page, section=section, doc_version=doc_version, tags=tags)
+
+    try:
+        layout = await get_collection_layout(collection)
+        embeddings = await get_embeddings_for(layout.vector_size)
+        query_vectors = await embeddings.aembed_documents(queries)
+
+        responses = await async_qdrant_client.query_batch_points(
+            collection_name=collection,
+            requests=[
+                build_query_request(layout, query, vector, top_k, query_filter=query_filter)
+                for query, vector in zip(queries, query_vectors)
+            ]
+        )
+        logger.debug("Qdrant batch search completed", collection=collection, query_count=len(responses))
+
+        # Each query gets an equal share of the context budget
+        budget_per_query = RAG_CONTEXT_TOKEN_BUDGET // len(queries)
+        sections: List[str] = []
+        found = 0
+        for index, (query, response) in enumerate(zip(queries, responses), start=1):
+            hits = [(collection, point) for point in response.points if (point.payload or {}).get("text")]
+            found += len(hits)
+            body = pack_context(to_retrieved_chunks(hits), budget_per_query) if hits else ""
+            sections.append(f"### Query {index}: {query}\n{body or 'No relevant documents found for this query.'}")
+
+        logger.info("Batch RAG search completed successfully", collection=collection, docs_found=found)
+        return "\n\n".join(sections)
+
+    except Exception as e:
+        logger.error("Batch RAG search failed", collection=collection, error=str(e))
+        return f"Search error: {str(e)}"
@@ -0,0 +1,170 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+from app.config.qdrant import async_qdrant_client
+from app.config.load import RAG_CATALOG_TTL_SECONDS
+from app.tools.rag.collection_info import CollectionLayout, layout_from_info, remember_layout
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Maximum concurrent get_collection calls during a full refresh
+REFRESH_CONCURRENCY = 8
+
+@dataclass(frozen=True)
+class CollectionEntry:
+    """Cached description of a collection."""
+    name: str
+    points_count: Optional[int]
+    layout: CollectionLayout
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "points_count": self.points_count,
+            "vector_size": self.layout.vector_size,
+            "hybrid": self.layout.hybrid,
+            "profile": self.layout.profile.name if self.layout.profile else None,
+        }
+
+class CollectionCatalog:
+    """
+    Cached catalog of Qdrant collections with cheap per-collection stats.
+
+    Reads are served from memory. The catalog is refreshed in the background
+    every `ttl` seconds, and writers invalidate it explicitly: a stale
+    collection (or the whole catalog) is re-fetched on the next read, so
+    callers never see data older than their own writes.
+    """
+
+    def __init__(self, ttl: float = RAG_CATALOG_TTL_SECONDS, client: Any = None):
+        self.ttl = ttl
+        self.client = client
+        self.last_error: Optional[str] = None
+        self._entries: Dict[str, CollectionEntry] = {}
+        self._loaded_at: Optional[float] = None
+        self._stale: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+
+    @property
+    def _client(self) -> Any:
+        return self.client or async_qdrant_client
+
+    @property
+    def healthy(self) -> bool:
+        return self._loaded_at is not None and self.last_error is None
+
+    async def _fetch_entry(self, name: str) -> CollectionEntry:
+        info = await self._client.get_collection(name)
+        layout = layout_from_info(info)
+        remember_layout(name, layout)
+        return CollectionEntry(name=name, points_count=info.points_count, layout=layout)
+
+    async def refresh(self) -> None:
+        """Reload the full catalog from Qdrant."""
+        async with self._lock:
+            await self._refresh_all()
+
+    async def _refresh_all(self) -> None:
+        try:
+            response = await self._client.get_collections()
+            names = [item.name for item in response.collections]
+            semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+            async def fetch(name: str) -> CollectionEntry:
+                async with semaphore:
+                    return await self._fetch_entry(name)
+
+            entries = await asyncio.gather(*(fetch(name) for name in names))
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("Collection catalog refresh failed", error=str(e))
+            raise
+
+        self._entries = {entry.name: entry for entry in entries}
+        self._loaded_at = time.monotonic()
+        self._stale.clear()
+        self.last_error = None
+        logger.debug("Collection catalog refreshed", collection_count=len(self._entries))
+
+    def _expired(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        # With the background task running, reads only refresh if it fell behind
+        max_age = self.ttl * 2 if self._task is not None else self.ttl
+        return time.monotonic() - self._loaded_at > max_age
+
+    async def _ensure_fresh(self) -> None:
+        if not self._expired() and not self._stale:
+            return
+
+        async with self._lock:
+            if self._expired() or None in self._stale:
+                await self._refresh_all()
+                return
+
+            for name in list(self._stale):
+                try:
+                    self._entries[name] = await self._fetch_entry(name)
+                except Exception as e:
+                    logger.warning("Collection catalog entry refresh failed", collection_name=name, error=str(e))
+                    self._entries.pop(name, None)
+                self._stale.discard(name)
+
+    async def entries(self) -> List[CollectionEntry]:
+        """All cached collections, refreshed first if stale or expired."""
+        await self._ensure_fresh()
+        return list(self._entries.values())
+
+    async def names(self) -> List[str]:
+        """Names of all collections."""
+        await self._ensure_fresh()
+        return list(self._entries)
+
+    async def get(self, name: str) -> Optional[CollectionEntry]:
+        """Cached entry of one collection, or None if it does not exist."""
+        await self._ensure_fresh()
+        return self._entries.get(name)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Mark a collection (or, with no name, the whole catalog) as stale.
+
+        Call after creating a collection (no name: the set of collections
+        changed) or writing points to one (its stats changed).
+        """
+        self._stale.add(name)
+        for listener in self._listeners:
+            listener(name)
+
+    def add_invalidation_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """Call `listener(name)` on every invalidation, so caches derived from collection contents can drop it."""
+        self._listeners.append(listener)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # already logged and recorded in last_error; retried next period
+
+    def start(self) -> None:
+        """Start the background refresh task (called from the application lifespan)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+collection_catalog = CollectionCatalog()
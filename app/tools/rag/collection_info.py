@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from qdrant_client import models
+from app.config.qdrant import async_qdrant_client, DENSE_VECTOR_NAME
+from app.config.collection_profiles import CollectionProfile, match_profile
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+@dataclass(frozen=True)
+class CollectionLayout:
+    """Vector layout of a collection, as needed to build points and queries."""
+    dense_vector_name: Optional[str]  # None for legacy collections with a single unnamed vector
+    sparse_vector_name: Optional[str]
+    vector_size: Optional[int]
+    quantization: Optional[str] = None
+    profile: Optional[CollectionProfile] = None
+
+    @property
+    def hybrid(self) -> bool:
+        return self.sparse_vector_name is not None
+
+    @property
+    def search_params(self) -> Optional[models.SearchParams]:
+        return self.profile.search_params() if self.profile else None
+
+def _quantization_kind(config: Any) -> Optional[str]:
+    if isinstance(config, models.ScalarQuantization):
+        return "scalar"
+    if isinstance(config, models.BinaryQuantization):
+        return "binary"
+    if isinstance(config, models.ProductQuantization):
+        return "product"
+    return None
+
+def layout_from_info(info: models.CollectionInfo) -> CollectionLayout:
+    """Derive the layout of a collection from its `get_collection` response."""
+    vectors = info.config.params.vectors
+    sparse_vectors = info.config.params.sparse_vectors or {}
+
+    if isinstance(vectors, dict):
+        dense_name = DENSE_VECTOR_NAME if DENSE_VECTOR_NAME in vectors else next(iter(vectors), None)
+        dense_params = vectors.get(dense_name) if dense_name else None
+    else:
+        dense_name = None
+        dense_params = vectors
+
+    quantization = _quantization_kind(
+        (dense_params.quantization_config if dense_params else None) or info.config.quantization_config
+    )
+    hnsw_m = info.config.hnsw_config.m if info.config.hnsw_config else None
+    vector_size = dense_params.size if dense_params else None
+
+    return CollectionLayout(
+        dense_vector_name=dense_name,
+        sparse_vector_name=next(iter(sparse_vectors), None),
+        vector_size=vector_size,
+        quantization=quantization,
+        profile=match_profile(quantization, hnsw_m, vector_size)
+    )
+
+# Layouts never change for an existing collection, so they are cached per process
+_layouts: Dict[str, CollectionLayout] = {}
+
+def remember_layout(collection_name: str, layout: CollectionLayout) -> None:
+    """Cache a layout obtained elsewhere (e.g. by the collection catalog)."""
+    _layouts[collection_name] = layout
+
+async def get_collection_layout(collection_name: str, client: Any = None) -> CollectionLayout:
+    """
+    Get the vector layout of a collection, fetching it from Qdrant once.
+
+    Args:
+        collection_name: Name of the Qdrant collection
+        client: Qdrant client override (defaults to the configured async client)
+
+    Returns:
+        CollectionLayout for the collection
+    """
+    layout = _layouts.get(collection_name)
+    if layout is not None:
+        return layout
+
+    info = await (client or async_qdrant_client).get_collection(collection_name)
+    layout = layout_from_info(info)
+    remember_layout(collection_name, layout)
+    logger.debug("Collection layout cached", collection_name=collection_name, hybrid=layout.hybrid)
+    return layout
+
+def invalidate_collection_layout(collection_name: str) -> None:
+    """Forget the cached layout of a collection (after it is created or recreated)."""
+    _layouts.pop(collection_name, None)
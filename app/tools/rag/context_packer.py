@@ -0,0 +1,194 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.tokens import count_tokens, truncate_tokens
+
+# Smallest remainder (in tokens) worth filling with a trimmed chunk
+MIN_TRIMMED_TOKENS = 40
+# Overlap (in characters) looked for when joining adjacent chunks
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 4000
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+@dataclass
+class RetrievedChunk:
+    """A search hit as seen by the packer, in rank order."""
+    text: str
+    score: float
+    collection: Optional[str] = None
+    source: Optional[str] = None
+    page: Optional[int] = None
+    chunk_index: Optional[int] = None
+    doc_version: Optional[str] = None
+    document_id: Optional[str] = None
+
+@dataclass
+class _Block:
+    chunks: List[RetrievedChunk]
+    text: str
+    score: float
+
+def _join_adjacent(left: str, right: str) -> str:
+    """Concatenate consecutive chunks, dropping the overlap they share."""
+    if len(right) >= MIN_OVERLAP_CHARS:
+        probe = right[:MIN_OVERLAP_CHARS]
+        start = left.find(probe, max(0, len(left) - MAX_OVERLAP_CHARS))
+        while start != -1:
+            if right.startswith(left[start:]):
+                return left[:start] + right
+            start = left.find(probe, start + 1)
+    return f"{left} {right}"
+
+def _document_key(chunk: RetrievedChunk) -> Tuple[Any, ...]:
+    """Chunks with the same key and consecutive chunk_index are neighbours in one document."""
+    return (chunk.collection, chunk.source, chunk.doc_version, chunk.document_id)
+
+def _join_run(run: List[RetrievedChunk]) -> str:
+    text = run[0].text
+    for part in run[1:]:
+        text = _join_adjacent(text, part.text)
+    return text
+
+def _merge_adjacent(chunks: List[RetrievedChunk]) -> List[_Block]:
+    """
+    Merge hits that are consecutive chunks of the same document.
+
+    A merged block keeps the best score of its parts, so a highly ranked
+    chunk pulls its retrieved neighbours in with it as one passage. Several
+    hits may share a position (the same source added twice without a
+    document id); each is used in one block only.
+    """
+    by_position: Dict[Tuple[Any, ...], List[RetrievedChunk]] = defaultdict(list)
+    for chunk in chunks:
+        if chunk.source is not None and chunk.chunk_index is not None:
+            by_position[(*_document_key(chunk), chunk.chunk_index)].append(chunk)
+
+    consumed = set()
+
+    def neighbour(key: Tuple[Any, ...], index: int) -> Optional[RetrievedChunk]:
+        for candidate in by_position.get((*key, index), ()):
+            if id(candidate) not in consumed:
+                return candidate
+        return None
+
+    blocks: List[_Block] = []
+    for chunk in chunks:
+        if id(chunk) in consumed:
+            continue
+        consumed.add(id(chunk))
+        if chunk.source is None or chunk.chunk_index is None:
+            blocks.append(_Block([chunk], chunk.text, chunk.score))
+            continue
+
+        # The run is seeded with the hit itself, then extended over unused neighbours both ways
+        key = _document_key(chunk)
+        run = [chunk]
+        index = chunk.chunk_index - 1
+        while (part := neighbour(key, index)) is not None:
+            consumed.add(id(part))
+            run.insert(0, part)
+            index -= 1
+        index = chunk.chunk_index + 1
+        while (part := neighbour(key, index)) is not None:
+            consumed.add(id(part))
+            run.append(part)
+            index += 1
+
+        blocks.append(_Block(run, _join_run(run), max(part.score for part in run)))
+
+    blocks.sort(key=lambda block: block.score, reverse=True)
+    return blocks
+
+def _header(block: _Block, show_collection: bool) -> str:
+    first = block.chunks[0]
+    parts = []
+    if first.source:
+        parts.append(first.source)
+    pages = sorted({chunk.page for chunk in block.chunks if chunk.page is not None})
+    if pages:
+        parts.append(f"p.{pages[0]}" if len(pages) == 1 else f"pp.{pages[0]}-{pages[-1]}")
+    if show_collection and first.collection:
+        parts.append(f"collection: {first.collection}")
+    return f"[{' · '.join(parts)}]" if parts else ""
+
+def _trim_to_sentences(text: str, budget: int) -> str:
+    """Keep whole leading sentences of `text` that fit in `budget` tokens."""
+    kept: List[str] = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text):
+        cost = count_tokens(sentence + " ")
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    return " ".join(kept).strip()
+
+def _fit_block(block: _Block, budget: int) -> Tuple[List[RetrievedChunk], str]:
+    """
+    The part of a block that fits in `budget` tokens.
+
+    An overflowing block is narrowed to its best-scoring chunk, grown back
+    over neighbours while they fit, then trimmed to whole sentences (or to a
+    token prefix when even the first sentence is too long).
+    """
+    if count_tokens(block.text) <= budget:
+        return block.chunks, block.text
+
+    chunks = block.chunks
+    low = high = max(range(len(chunks)), key=lambda position: chunks[position].score)
+    text = chunks[low].text
+    grown = True
+    while grown:
+        grown = False
+        for new_low, new_high in ((low, high + 1), (low - 1, high)):
+            if new_low < 0 or new_high >= len(chunks):
+                continue
+            candidate = _join_run(chunks[new_low:new_high + 1])
+            if count_tokens(candidate) <= budget:
+                low, high, text, grown = new_low, new_high, candidate, True
+                break
+
+    if count_tokens(text) > budget:
+        text = _trim_to_sentences(text, budget) or truncate_tokens(text, budget).strip()
+    return chunks[low:high + 1], text
+
+def pack_context(chunks: List[RetrievedChunk], token_budget: int, show_collection: bool = False) -> str:
+    """
+    Fit retrieved chunks into a token budget, most relevant first.
+
+    Adjacent chunks of the same document are merged into one passage, each
+    passage gets a compact source header, and the passage that overflows the
+    budget is trimmed around its best chunk. Lower-ranked passages are dropped.
+
+    Args:
+        chunks: Search hits in rank order
+        token_budget: Maximum tokens of the packed context
+        show_collection: Include the collection name in headers (multi-collection searches)
+
+    Returns:
+        Packed context text
+    """
+    sections: List[str] = []
+    remaining = token_budget
+
+    for block in _merge_adjacent(chunks):
+        header = _header(block, show_collection)
+        header_cost = count_tokens(header + "\n") if header else 0
+        separator_cost = 1 if sections else 0
+        available = remaining - header_cost - separator_cost
+        if available < MIN_TRIMMED_TOKENS:
+            break
+
+        kept, text = _fit_block(block, available)
+        if not text:
+            continue
+        cost = count_tokens(text)
+        if kept is not block.chunks:
+            header = _header(_Block(kept, text, block.score), show_collection)
+
+        sections.append(f"{header}\n{text}" if header else text)
+        remaining -= header_cost + separator_cost + cost
+
+    return "\n\n".join(sections)
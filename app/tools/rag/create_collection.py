@@ -1,7 +1,13 @@
 import logging, sys
 from langchain.tools import tool, Tool
 from typing import Dict, Any
-from app.config.qdrant import qdrant_client
+from app.config.qdrant import async_qdrant_client
+from app.config.collection_profiles import get_profile
+from app.config.embeddings import get_embedding_vector_size, supports_dimensions
+from app.schemas.tools_schema import CreateCollectionArgs
+from app.tools.rag.collection_info import invalidate_collection_layout
+from app.tools.rag.filters import ensure_payload_indexes
+from app.tools.rag.catalog import collection_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -19,23 +25,50 @@ def logger_setup():
     )
     logging.info("logger setup complete.")
 
-@tool
-def create_collection_tool(collection_name: str) -> Dict[str, Any]:
+@tool(args_schema=CreateCollectionArgs)
+async def create_collection_tool(collection_name: str, profile: str = "default") -> Dict[str, Any]:
     """
-    Create a new collection in Qdrant.
+    Create a new collection in Qdrant with dense and BM25 sparse vectors.
     
     Args:
         collection_name (str): Name of the collection to create.
+        profile (str): Collection profile controlling quantization, HNSW and on-disk storage.
     
     Returns:
         Dict[str, Any]: Result of the collection creation.
     """
 
-    logger.info(f"Creating collection: {collection_name}")
+    logger.info(f"Creating collection: {collection_name} (profile: {profile})")
     
     try:
-        qdrant_client.create_collection(collection_name=collection_name)
-        return {"result": f"Collection '{collection_name}' created successfully."}
+        collection_profile = get_profile(profile)
+        native_size = await get_embedding_vector_size()
+        vector_size = collection_profile.dimensions or native_size
+        if vector_size > native_size:
+            raise ValueError(
+                f"Profile '{collection_profile.name}' needs {vector_size}-dimensional embeddings, "
+                f"but the embedding deployment produces {native_size}."
+            )
+        if vector_size < native_size:
+            try:
+                shortened = await supports_dimensions(vector_size)
+            except Exception as e:
+                logger.warning(f"Shortened embedding probe failed: {e}")
+                shortened = False
+            if not shortened:
+                raise ValueError(
+                    f"Profile '{collection_profile.name}' needs shortened {vector_size}-dimensional embeddings, "
+                    f"which the embedding deployment does not support (text-embedding-3 models only)."
+                )
+
+        await async_qdrant_client.create_collection(
+            collection_name=collection_name,
+            **collection_profile.collection_config(vector_size)
+        )
+        invalidate_collection_layout(collection_name)
+        await ensure_payload_indexes(collection_name)
+        collection_catalog.invalidate()
+        return {"result": f"Collection '{collection_name}' created successfully with profile '{collection_profile.name}'."}
     except Exception as e:
         logger.error(f"Error creating collection: {e}")
         return {"error": str(e)}
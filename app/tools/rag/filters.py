@@ -0,0 +1,66 @@
+from typing import Any, List, Optional, Set
+from qdrant_client import models
+from app.config.qdrant import async_qdrant_client
+from app.tools.rag.near_duplicates import BUCKETS_FIELD
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Structured metadata stored in point payloads and the index type for each field
+PAYLOAD_INDEXES = {
+    "source": models.PayloadSchemaType.KEYWORD,
+    "page": models.PayloadSchemaType.INTEGER,
+    "section": models.PayloadSchemaType.KEYWORD,
+    "doc_version": models.PayloadSchemaType.KEYWORD,
+    "tags": models.PayloadSchemaType.KEYWORD,
+    "document_id": models.PayloadSchemaType.KEYWORD,
+    "chunk_hash": models.PayloadSchemaType.KEYWORD,
+    BUCKETS_FIELD: models.PayloadSchemaType.KEYWORD,
+}
+
+# Collections whose payload indexes were already ensured by this process
+_indexed_collections: Set[str] = set()
+
+async def ensure_payload_indexes(collection_name: str, client: Any = None) -> None:
+    """
+    Create the metadata payload indexes on a collection (once per process).
+
+    Creating an index that already exists is a no-op in Qdrant, so this is
+    safe to call on collections created before metadata was introduced.
+    """
+    if collection_name in _indexed_collections:
+        return
+
+    client = client or async_qdrant_client
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        await client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=schema
+        )
+    _indexed_collections.add(collection_name)
+    logger.debug("Payload indexes ensured", collection_name=collection_name, fields=list(PAYLOAD_INDEXES))
+
+def build_filter(
+    source: Optional[str] = None,
+    page: Optional[int] = None,
+    section: Optional[str] = None,
+    doc_version: Optional[str] = None,
+    tags: Optional[List[str]] = None
+) -> Optional[models.Filter]:
+    """
+    Translate metadata filter arguments into a Qdrant filter.
+
+    All given fields must match; `tags` matches points having any of the tags.
+
+    Returns:
+        Filter, or None when no filter argument is set
+    """
+    conditions: List[models.FieldCondition] = [
+        models.FieldCondition(key=key, match=models.MatchValue(value=value))
+        for key, value in (("source", source), ("page", page), ("section", section), ("doc_version", doc_version))
+        if value is not None
+    ]
+    if tags:
+        conditions.append(models.FieldCondition(key="tags", match=models.MatchAny(any=tags)))
+    return models.Filter(must=conditions) if conditions else None
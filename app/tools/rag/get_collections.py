@@ -1,22 +1,21 @@
 import logging, sys
 from langchain.tools import tool
-from typing import List
-from app.config.qdrant import qdrant_client
+from typing import Any, Dict, List
+from app.tools.rag.catalog import collection_catalog
 
 logger = logging.getLogger(__name__)
 
 @tool
-def get_collections_tool() -> List[str]:
+async def get_collections_tool() -> List[Dict[str, Any]]:
     """
-    Retrieve the list of collections from the Qdrant client.
+    Retrieve the available collections with their size and settings.
     
     Returns:
-        List[str]: A list of collection names.
+        List[Dict[str, Any]]: One entry per collection with name, points_count, vector_size, hybrid and profile.
     """
     try:
-        collections = qdrant_client.get_collections() #returns a tuple 
-        return [collection.name for collection in collections.collections]  # Assuming collections[0] is the response object
+        entries = await collection_catalog.entries()
+        return [entry.to_dict() for entry in sorted(entries, key=lambda entry: entry.name)]
     except Exception as e:
         logger.error(f"Error retrieving collections: {e}")
-        logger.error(f"Returns a tuple like this: {collections}")
         return []
@@ -0,0 +1,354 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+from qdrant_client import models
+from app.config.qdrant import async_qdrant_client
+from app.config.embeddings import get_embeddings_for
+from app.tools.rag.collection_info import CollectionLayout, get_collection_layout
+from app.tools.rag.sparse import encode_document
+from app.tools.rag.filters import ensure_payload_indexes
+from app.tools.rag.catalog import collection_catalog
+from app.tools.rag.near_duplicates import BUCKETS_FIELD, DroppedChunk, NearDuplicateFilter
+from app.tools.rag.router import collection_router
+from app.config.load import (
+    RAG_EMBED_BATCH_SIZE,
+    RAG_EMBED_CONCURRENCY,
+    RAG_UPSERT_BATCH_SIZE,
+    RAG_INGEST_MAX_RETRIES,
+    RAG_NEAR_DUPLICATE_THRESHOLD,
+)
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Base delay (seconds) for exponential backoff between batch retries
+RETRY_BASE_DELAY = 0.5
+
+# Stored chunks fetched per call as near-duplicate candidates
+NEAR_DUPLICATE_CANDIDATES = 1024
+
+@dataclass
+class IngestionReport:
+    """Outcome of an ingestion run."""
+    collection_name: str
+    total: int
+    added: int = 0
+    failed_batches: List[Dict[str, Any]] = field(default_factory=list)
+    duplicates: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def failed(self) -> int:
+        return sum(batch["size"] for batch in self.failed_batches)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "collection_name": self.collection_name,
+            "total": self.total,
+            "added": self.added,
+            "failed": self.failed,
+            "failed_batches": self.failed_batches,
+            "duplicates_skipped": len(self.duplicates),
+            "duplicates": self.duplicates,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+def _point_vector(layout: CollectionLayout, dense: List[float], text: str) -> Any:
+    """Build the vector field of a point for the collection's layout."""
+    if layout.dense_vector_name is None:
+        return dense
+    vector: Dict[str, Any] = {layout.dense_vector_name: dense}
+    if layout.hybrid:
+        vector[layout.sparse_vector_name] = encode_document(text)
+    return vector
+
+def _batched(items: List[Any], size: int) -> Iterator[Tuple[int, List[Any]]]:
+    """Yield (start_offset, batch) pairs of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+async def _with_retries(
+    operation: Callable[[], Awaitable[Any]],
+    max_retries: int,
+    stage: str,
+    **log_context: Any
+) -> Any:
+    """
+    Run an async operation, retrying with exponential backoff.
+
+    Args:
+        operation: Zero-argument coroutine factory to execute
+        max_retries: Total number of attempts before giving up
+        stage: Pipeline stage name used in log messages
+
+    Returns:
+        Result of the operation
+
+    Raises:
+        The last exception raised once all attempts are exhausted
+    """
+    delay = RETRY_BASE_DELAY
+    for attempt in range(1, max_retries + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            logger.warning("Ingestion batch failed, retrying", stage=stage, attempt=attempt, error=str(e), **log_context)
+            await asyncio.sleep(delay)
+            delay *= 2
+
+async def find_near_duplicates(
+    collection_name: str,
+    documents: List[str],
+    near_duplicates: NearDuplicateFilter,
+    client: Any = None,
+    exclude_document_id: Optional[str] = None
+) -> Tuple[List[int], List[DroppedChunk], List[List[str]]]:
+    """
+    Find documents nearly identical to earlier ones or to chunks already in the collection.
+
+    Stored chunks sharing an LSH bucket with any of the documents are fetched
+    through their `BUCKETS_FIELD` payload and added to the filter, so
+    duplicates are caught across calls and worker processes. Chunks stored
+    before bucket keys were recorded are not candidates.
+
+    Args:
+        collection_name: Name of the Qdrant collection
+        documents: Document texts about to be ingested
+        near_duplicates: Filter holding the earlier documents of the run
+        client: Qdrant client override (defaults to the configured client)
+        exclude_document_id: Ignore the stored chunks of this document (when replacing it)
+
+    Returns:
+        Positions of the documents to keep, the dropped documents, and the
+        bucket keys of every document (to store in its payload)
+    """
+    client = client or async_qdrant_client
+    keys = await asyncio.to_thread(lambda: [near_duplicates.bucket_keys(document) for document in documents])
+    wanted = sorted({key for document_keys in keys for key in document_keys})
+    if wanted:
+        try:
+            points, _ = await client.scroll(
+                collection_name=collection_name,
+                scroll_filter=models.Filter(
+                    must=[models.FieldCondition(key=BUCKETS_FIELD, match=models.MatchAny(any=wanted))],
+                    must_not=[
+                        models.FieldCondition(key="document_id", match=models.MatchValue(value=exclude_document_id))
+                    ] if exclude_document_id else None
+                ),
+                limit=NEAR_DUPLICATE_CANDIDATES,
+                with_payload=["text", BUCKETS_FIELD],
+                with_vectors=False
+            )
+            for point in points:
+                payload = point.payload or {}
+                if payload.get("text"):
+                    near_duplicates.remember(str(point.id), payload["text"], payload.get(BUCKETS_FIELD, []))
+        except Exception as e:
+            # Still deduplicate within the run
+            logger.warning("Stored near-duplicate candidates unavailable", collection_name=collection_name, error=str(e))
+
+    kept, dropped = await asyncio.to_thread(near_duplicates.filter, documents, keys)
+    return kept, dropped, keys
+
+async def ingest_documents(
+    collection_name: str,
+    documents: List[str],
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    ids: Optional[List[str]] = None,
+    embed_batch_size: Optional[int] = None,
+    embed_concurrency: Optional[int] = None,
+    upsert_batch_size: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    embeddings: Any = None,
+    client: Any = None,
+    first_chunk_index: int = 0,
+    near_duplicate_threshold: Optional[float] = None,
+    near_duplicates: Optional[NearDuplicateFilter] = None
+) -> IngestionReport:
+    """
+    Embed and upsert documents into a Qdrant collection as a pipeline.
+
+    Documents are embedded in batches by a bounded pool of workers while a
+    single writer upserts the resulting points in chunks with `wait=False`,
+    so embedding and upserting overlap. Each batch is retried on its own; a
+    batch that still fails is reported and skipped instead of aborting the
+    whole ingest. Once every chunk has been sent, the last chunk is re-sent
+    with `wait=True` as a consistency barrier (same ids, so it is idempotent).
+
+    Before embedding, documents whose word shingles are nearly identical to
+    an earlier document's or to a chunk already stored in the collection
+    (boilerplate headers, footers, license text) are skipped and listed in
+    the report; the first occurrence is kept. See `find_near_duplicates`.
+
+    Args:
+        collection_name: Name of the Qdrant collection
+        documents: List of document texts to add
+        metadatas: Optional payload metadata per document (source, page, section, doc_version, tags);
+            a `chunk_index` given here overrides the positional one
+        ids: Optional point id per document (random UUIDs by default)
+        embed_batch_size: Documents per embedding request
+        embed_concurrency: Maximum embedding requests in flight
+        upsert_batch_size: Points per upsert request
+        max_retries: Attempts per batch before it is reported as failed
+        embeddings: Embedding model override (defaults to the configured model)
+        client: Qdrant client override (defaults to the configured client)
+        first_chunk_index: chunk_index of the first document, when one source is ingested in several calls
+        near_duplicate_threshold: Jaccard similarity above which a document is skipped
+            (defaults to RAG_NEAR_DUPLICATE_THRESHOLD; 0 disables the check)
+        near_duplicates: Filter shared across calls, to deduplicate a source ingested in
+            several calls (overrides `near_duplicate_threshold`)
+
+    Returns:
+        IngestionReport with counts and failed batches
+    """
+    embed_batch_size = embed_batch_size or RAG_EMBED_BATCH_SIZE
+    embed_concurrency = embed_concurrency or RAG_EMBED_CONCURRENCY
+    upsert_batch_size = upsert_batch_size or RAG_UPSERT_BATCH_SIZE
+    max_retries = max_retries or RAG_INGEST_MAX_RETRIES
+    client = client or async_qdrant_client
+
+    report = IngestionReport(collection_name=collection_name, total=len(documents))
+    started = time.perf_counter()
+    layout = await get_collection_layout(collection_name, client=client)
+    embeddings = embeddings or await get_embeddings_for(layout.vector_size)
+    await ensure_payload_indexes(collection_name, client=client)
+
+    if near_duplicates is None:
+        threshold = RAG_NEAR_DUPLICATE_THRESHOLD if near_duplicate_threshold is None else near_duplicate_threshold
+        near_duplicates = NearDuplicateFilter(threshold) if threshold > 0 else None
+    if near_duplicates is not None:
+        kept, dropped, keys = await find_near_duplicates(collection_name, documents, near_duplicates, client=client)
+        # Keep each surviving document's original position as its chunk_index, and record
+        # its bucket keys so later ingests can compare against it
+        metadatas = [
+            {"chunk_index": first_chunk_index + i, **(metadatas[i] if metadatas else {}), BUCKETS_FIELD: keys[i]}
+            for i in kept
+        ]
+        documents = [documents[i] for i in kept]
+        ids = [ids[i] for i in kept] if ids else None
+        if dropped:
+            report.duplicates = [chunk.to_dict() for chunk in dropped]
+            logger.info("Near-duplicate documents skipped", collection_name=collection_name, duplicates_skipped=len(dropped))
+
+    logger.info(
+        "Starting document ingestion",
+        collection_name=collection_name,
+        document_count=len(documents),
+        embed_batch_size=embed_batch_size,
+        embed_concurrency=embed_concurrency,
+        upsert_batch_size=upsert_batch_size
+    )
+
+    batches = _batched(documents, embed_batch_size)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=embed_concurrency * 2)
+
+    async def embed_worker() -> None:
+        for start, batch in batches:
+            try:
+                vectors = await _with_retries(
+                    lambda: embeddings.aembed_documents(batch),
+                    max_retries,
+                    stage="embed",
+                    collection_name=collection_name,
+                    batch_start=start
+                )
+            except Exception as e:
+                logger.error("Embedding batch failed", collection_name=collection_name, batch_start=start, error=str(e))
+                report.failed_batches.append({"stage": "embed", "start": start, "size": len(batch), "error": str(e)})
+                continue
+
+            collection_router.observe(collection_name, vectors)
+            points = [
+                models.PointStruct(
+                    id=ids[start + offset] if ids else str(uuid4()),
+                    vector=_point_vector(layout, vec, doc),
+                    payload={
+                        "chunk_index": first_chunk_index + start + offset,
+                        **(metadatas[start + offset] if metadatas else {}),
+                        "text": doc,
+                    }
+                )
+                for offset, (doc, vec) in enumerate(zip(batch, vectors))
+            ]
+            await queue.put((start, points))
+
+    async def upsert(points: List[models.PointStruct], wait: bool) -> None:
+        await client.upsert(
+            collection_name=collection_name,
+            points=points,
+            wait=wait
+        )
+
+    async def upsert_writer() -> Optional[List[models.PointStruct]]:
+        last_chunk: Optional[List[models.PointStruct]] = None
+        buffer: List[models.PointStruct] = []
+        # Document index of every buffered point (embedding batches may arrive out of order)
+        positions: List[int] = []
+        done = False
+
+        while not done:
+            item = await queue.get()
+            if item is None:
+                done = True
+            else:
+                start, points = item
+                buffer.extend(points)
+                positions.extend(range(start, start + len(points)))
+
+            while len(buffer) >= upsert_batch_size or (done and buffer):
+                chunk, buffer = buffer[:upsert_batch_size], buffer[upsert_batch_size:]
+                chunk_start, positions = positions[0], positions[upsert_batch_size:]
+                try:
+                    await _with_retries(
+                        lambda: upsert(chunk, wait=False),
+                        max_retries,
+                        stage="upsert",
+                        collection_name=collection_name,
+                        batch_start=chunk_start
+                    )
+                    report.added += len(chunk)
+                    last_chunk = chunk
+                except Exception as e:
+                    logger.error("Upsert batch failed", collection_name=collection_name, batch_start=chunk_start, error=str(e))
+                    report.failed_batches.append({"stage": "upsert", "start": chunk_start, "size": len(chunk), "error": str(e)})
+
+        return last_chunk
+
+    writer = asyncio.create_task(upsert_writer())
+    try:
+        await asyncio.gather(*(embed_worker() for _ in range(embed_concurrency)))
+        await queue.put(None)
+        last_chunk = await writer
+
+        if last_chunk:
+            # Upserts are applied in order, so waiting on the last one waits on all of them
+            await _with_retries(
+                lambda: upsert(last_chunk, wait=True),
+                max_retries,
+                stage="barrier",
+                collection_name=collection_name
+            )
+    except BaseException:
+        # Cancelled (e.g. a tool deadline) or failed: stop the writer instead of leaving it blocked on the queue
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        raise
+    finally:
+        # Points written before a failure or cancellation are visible too
+        if report.added:
+            collection_catalog.invalidate(collection_name)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        "Document ingestion finished",
+        collection_name=collection_name,
+        documents_added=report.added,
+        documents_failed=report.failed,
+        duplicates_skipped=len(report.duplicates),
+        elapsed_seconds=round(report.elapsed_seconds, 3)
+    )
+    return report
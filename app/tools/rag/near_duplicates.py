@@ -0,0 +1,147 @@
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Union
+import numpy as np
+
+# Words per shingle
+SHINGLE_SIZE = 5
+# MinHash permutations (signature length)
+NUM_PERMUTATIONS = 128
+# Mersenne prime for the universal hash family; keeps a * x + b within uint64
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+# Payload field listing a chunk's LSH bucket keys, so later ingests can find it as a candidate
+BUCKETS_FIELD = "minhash_buckets"
+
+_WORD = re.compile(r"\w+")
+
+def _shingles(text: str) -> Set[int]:
+    """Hashed word shingles of a text (whole text for texts shorter than a shingle)."""
+    words = _WORD.findall(text.lower())
+    size = min(SHINGLE_SIZE, len(words))
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    } if words else set()
+
+def _lsh_shape(threshold: float, num_permutations: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band whose LSH S-curve crosses `threshold`.
+
+    Two signatures collide in some band with probability 1 - (1 - s^r)^b,
+    whose steep part sits near (1/b)^(1/r).
+    """
+    shapes = [(b, num_permutations // b) for b in range(1, num_permutations + 1) if num_permutations % b == 0]
+    return min(shapes, key=lambda shape: abs((1 / shape[0]) ** (1 / shape[1]) - threshold))
+
+@dataclass
+class DroppedChunk:
+    """A chunk skipped as a near duplicate of an earlier one."""
+    index: int
+    duplicate_of: Union[int, str]  # index of an earlier chunk of the run, or id of a stored point
+    similarity: float
+    preview: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "duplicate_of": self.duplicate_of,
+            "similarity": round(self.similarity, 3),
+            "preview": self.preview,
+        }
+
+class NearDuplicateFilter:
+    """
+    MinHash/LSH index that flags chunks nearly identical to earlier ones.
+
+    Each chunk is reduced to a MinHash signature of its word shingles and
+    bucketed by LSH bands; only chunks sharing a bucket are compared, by the
+    exact Jaccard similarity of their shingle sets. Chunk indices keep
+    counting across `filter` calls, so one instance can deduplicate a
+    document fed in batches. Chunks already stored in a collection are
+    compared too once added with `remember` (their bucket keys are stored in
+    the `BUCKETS_FIELD` payload, see `ingestion.find_near_duplicates`).
+    """
+
+    def __init__(self, threshold: float, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        self.threshold = threshold
+        self.bands, self.rows = _lsh_shape(threshold, num_permutations)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_permutations).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_permutations).astype(np.uint64)
+        self._buckets: Dict[str, List[Hashable]] = defaultdict(list)
+        self._shingle_sets: Dict[Hashable, Set[int]] = {}
+        self._seen = 0
+
+    def _signature(self, shingles: Set[int]) -> np.ndarray:
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles)) % _MERSENNE_PRIME
+        hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return hashed.min(axis=1)
+
+    def bucket_keys(self, text: str) -> List[str]:
+        """LSH bucket keys of a text, one per band (none for texts without words)."""
+        shingles = _shingles(text)
+        if not shingles:
+            return []
+        signature = self._signature(shingles)
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
+
+    def remember(self, label: Hashable, text: str, keys: List[str]) -> None:
+        """Add a chunk stored outside this run (e.g. a point id) as a duplicate candidate."""
+        shingles = _shingles(text)
+        if not shingles or label in self._shingle_sets:
+            return
+        self._shingle_sets[label] = shingles
+        for key in keys:
+            self._buckets[key].append(label)
+
+    def _find_duplicate(self, shingles: Set[int], keys: List[str]) -> Tuple[Optional[Hashable], float]:
+        best, best_similarity = None, 0.0
+        candidates = {label for key in keys for label in self._buckets.get(key, ())}
+        for candidate in candidates:
+            other = self._shingle_sets[candidate]
+            similarity = len(shingles & other) / len(shingles | other)
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        return best, best_similarity
+
+    def filter(self, texts: List[str], keys: Optional[List[List[str]]] = None) -> Tuple[List[int], List[DroppedChunk]]:
+        """
+        Split a batch into chunks to keep and near duplicates to skip.
+
+        Args:
+            texts: Chunk texts, continuing the order of previous calls
+            keys: Bucket keys per text, when already computed with `bucket_keys`
+
+        Returns:
+            Positions (within `texts`) of the chunks to keep, and the dropped
+            chunks with the index of the chunk each one duplicates (indices
+            count from the first chunk of the first call)
+        """
+        kept: List[int] = []
+        dropped: List[DroppedChunk] = []
+        for position, text in enumerate(texts):
+            index = self._seen + position
+            shingles = _shingles(text)
+            if not shingles:
+                kept.append(position)
+                continue
+
+            text_keys = keys[position] if keys is not None else self.bucket_keys(text)
+            duplicate_of, similarity = self._find_duplicate(shingles, text_keys)
+            if duplicate_of is not None:
+                dropped.append(DroppedChunk(index, duplicate_of, similarity, " ".join(text.split())[:80]))
+                continue
+
+            kept.append(position)
+            self._shingle_sets[index] = shingles
+            for key in text_keys:
+                self._buckets[key].append(index)
+        self._seen += len(texts)
+        return kept, dropped
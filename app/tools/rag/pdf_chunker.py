@@ -1,43 +1,294 @@
-from PyPDF2 import PdfReader
-from typing import List
-import tiktoken
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 from langchain_core.tools import tool
+from app.config.load import RAG_PDF_WORKERS
 from app.schemas.tools_schema import PDFChunkerArgs
+from app.tools.rag.pdf_extraction import ProgressCallback, iter_page_texts
+from app.utils.logging_utils import get_secure_logger
+from app.utils.tokens import DEFAULT_ENCODING, get_tokenizer
 
-@tool(args_schema=PDFChunkerArgs)
-def pdf_to_chunks(file_path: str, max_pages: int = 15, max_tokens_per_chunk: int = 650) -> List[str]:
+logger = get_secure_logger(__name__)
+
+# Boundaries a chunk may end on, strongest first
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"[.!?;:][\"')\]]*\s+")
+
+# Characters of extracted text chunked at a time while streaming a PDF
+STREAM_WINDOW_CHARS = 200_000
+
+# Chunks returned per pdf_to_chunks call; the tool result goes straight into the model's context
+PDF_TOOL_MAX_CHUNKS = 20
+
+# Documents whose full chunk list pdf_to_chunks keeps for paging past the first result page
+PDF_TOOL_CACHED_DOCUMENTS = 4
+
+# A chunk is only cut early at a boundary if it keeps at least this share of max_tokens
+MIN_FILL_RATIO = 0.5
+
+_WHITESPACE_BYTES = frozenset(b" \t\n\r\x0b\x0c")
+
+@lru_cache(maxsize=None)
+def _token_tables(encoding_name: str = DEFAULT_ENCODING) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Carga un PDF desde ruta y lo divide en chunks de máximo `max_tokens_per_chunk` tokens.
-    Solo toma las primeras `max_pages` páginas.
+    Per-token lookup tables, built once per encoding.
+
+    Returns:
+        Characters each token completes, whether it starts inside a UTF-8
+        character, and whether it starts with whitespace
     """
+    tokenizer = get_tokenizer(encoding_name)
+    size = tokenizer.max_token_value + 1
+    char_counts = np.zeros(size, dtype=np.int64)
+    continues_char = np.zeros(size, dtype=bool)
+    starts_with_space = np.zeros(size, dtype=bool)
+    for token in range(size):
+        try:
+            data = tokenizer.decode_single_token_bytes(token)
+        except KeyError:
+            continue
+        char_counts[token] = sum(1 for byte in data if not 0x80 <= byte < 0xC0)
+        continues_char[token] = bool(data) and 0x80 <= data[0] < 0xC0
+        starts_with_space[token] = bool(data) and data[0] in _WHITESPACE_BYTES
+    return char_counts, continues_char, starts_with_space
+
+def _char_offsets(tokens: List[int], encoding_name: str) -> Tuple[List[int], List[int]]:
+    """Character offset of every token in the encoded text, and the tokens starting a word."""
+    char_counts, continues_char, starts_with_space = _token_tables(encoding_name)
+    ids = np.asarray(tokens, dtype=np.int64)
+    ends = np.cumsum(char_counts[ids])
+    offsets = np.maximum(ends - char_counts[ids] - continues_char[ids], 0)
+    words = np.flatnonzero(starts_with_space[ids])
+    return offsets.tolist(), words[words > 0].tolist()
 
-    # Leer PDF
-    reader = PdfReader(file_path)
-    pages = reader.pages[:max_pages]  # limitar a N páginas
-    
-    # Extraer texto
-    full_text = "\n".join(page.extract_text() or "" for page in pages)
+def _boundary_tokens(pattern: re.Pattern, text: str, offsets: List[int]) -> List[int]:
+    """Token indices at which a new segment starts, for every match of `pattern`."""
+    return [bisect_left(offsets, match.end()) for match in pattern.finditer(text)]
 
-    # Tokenizador OpenAI (usa el del modelo de embeddings)
-    tokenizer = tiktoken.get_encoding("cl100k_base")
+def _last_boundary(boundaries: List[int], low: int, high: int) -> int:
+    """Largest boundary in [low, high], or -1 if there is none."""
+    position = bisect_right(boundaries, high) - 1
+    if position >= 0 and boundaries[position] >= low:
+        return boundaries[position]
+    return -1
 
-    # Chunking
-    words = full_text.split()
-    chunks = []
-    chunk = []
-    token_count = 0
+def _first_boundary(boundaries: List[int], low: int, high: int) -> int:
+    """Smallest boundary in [low, high), or -1 if there is none."""
+    position = bisect_left(boundaries, low)
+    if position < len(boundaries) and boundaries[position] < high:
+        return boundaries[position]
+    return -1
 
-    for word in words:
-        word_tokens = len(tokenizer.encode(word, disallowed_special=()))
-        if token_count + word_tokens > max_tokens_per_chunk:
-            chunks.append(" ".join(chunk))
-            chunk = []
-            token_count = 0
-        chunk.append(word)
-        token_count += word_tokens
+def chunk_text(
+    text: str,
+    max_tokens_per_chunk: int = 650,
+    overlap_tokens: int = 64,
+    encoding_name: str = DEFAULT_ENCODING
+) -> List[str]:
+    """
+    Split text into chunks of at most `max_tokens_per_chunk` tokens.
 
-    if chunk:
-        chunks.append(" ".join(chunk))
+    The text is encoded once and split on token offsets, so token counts are
+    exact across word boundaries. Each chunk ends on the last paragraph break
+    in its second half if there is one, otherwise on the last sentence end,
+    otherwise on a word boundary. Consecutive chunks share about
+    `overlap_tokens` tokens, starting on a word boundary.
+
+    Args:
+        text: Text to split
+        max_tokens_per_chunk: Maximum tokens per chunk
+        overlap_tokens: Tokens repeated at the start of the next chunk
+        encoding_name: tiktoken encoding of the embedding model
+
+    Returns:
+        List of chunk texts
+    """
+    tokens = get_tokenizer(encoding_name).encode(text, disallowed_special=())
+    if not tokens:
+        return []
+
+    offsets, words = _char_offsets(tokens, encoding_name)
+    total = len(tokens)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens_per_chunk // 2))
+
+    paragraphs = _boundary_tokens(PARAGRAPH_BREAK, text, offsets)
+    sentences = _boundary_tokens(SENTENCE_END, text, offsets)
+
+    chunks: List[str] = []
+    start = 0
+    while start < total:
+        end = min(start + max_tokens_per_chunk, total)
+        if end < total:
+            low = start + max(1, int(max_tokens_per_chunk * MIN_FILL_RATIO))
+            for boundaries in (paragraphs, sentences, words):
+                boundary = _last_boundary(boundaries, low, end)
+                if boundary > 0:
+                    end = boundary
+                    break
+
+        stop = offsets[end] if end < total else len(text)
+        chunk = text[offsets[start]:stop].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= total:
+            break
+
+        # Start the next chunk `overlap_tokens` back, snapped forward to a word boundary
+        next_start = end - overlap_tokens
+        snapped = _first_boundary(words, next_start, end)
+        start = max(snapped if snapped > 0 else next_start, start + 1)
 
     return chunks
 
+@dataclass
+class PdfChunk:
+    """A chunk of extracted PDF text and the 1-based page it starts on."""
+    text: str
+    page: int
+
+def _log_page_progress(page_number: int, total_pages: int) -> None:
+    logger.debug("PDF page extracted", page=page_number, total_pages=total_pages)
+
+def iter_pdf_chunks(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    max_tokens_per_chunk: int = 650,
+    overlap_tokens: int = 64,
+    workers: Optional[int] = RAG_PDF_WORKERS,
+    progress: Optional[ProgressCallback] = None
+) -> Iterator[PdfChunk]:
+    """
+    Stream the chunks of a PDF as its pages are extracted.
+
+    Pages are extracted in parallel (see `iter_page_texts`) and appended to a
+    text window; once the window holds `STREAM_WINDOW_CHARS` characters it is
+    chunked and every chunk but the last is yielded. The last chunk is kept
+    as the start of the next window, so chunks span page and window
+    boundaries exactly as if the document had been chunked in one piece.
+
+    Args:
+        file_path: Path to the PDF file
+        max_pages: Only process the first `max_pages` pages (all pages when None)
+        max_tokens_per_chunk: Maximum tokens per chunk
+        overlap_tokens: Tokens shared between consecutive chunks
+        workers: Extraction processes (defaults to the CPU count)
+        progress: Called with (page_number, total_pages) after each page is extracted
+
+    Yields:
+        Chunks in document order
+    """
+    window = ""
+    page_starts: List[int] = []    # offset in `window` where each page starts
+    page_numbers: List[int] = []
+
+    def flush(final: bool) -> Iterator[PdfChunk]:
+        nonlocal window, page_starts, page_numbers
+        chunks = chunk_text(window, max_tokens_per_chunk=max_tokens_per_chunk, overlap_tokens=overlap_tokens)
+        cursor = 0
+        positions = []
+        for chunk in chunks:
+            position = window.find(chunk, cursor)
+            position = cursor if position < 0 else position
+            positions.append(position)
+            cursor = position + 1
+
+        emitted = len(chunks) if final or len(chunks) < 2 else len(chunks) - 1
+        for chunk, position in zip(chunks[:emitted], positions[:emitted]):
+            yield PdfChunk(text=chunk, page=page_numbers[max(0, bisect_right(page_starts, position) - 1)])
+
+        if emitted == len(chunks):
+            window, page_starts, page_numbers = "", [], []
+            return
+        tail = positions[emitted]
+        first_page = max(0, bisect_right(page_starts, tail) - 1)
+        window = window[tail:]
+        page_starts = [0] + [start - tail for start in page_starts[first_page + 1:]]
+        page_numbers = page_numbers[first_page:]
+
+    for page_number, text in iter_page_texts(file_path, max_pages=max_pages, workers=workers, progress=progress or _log_page_progress):
+        if window:
+            window += "\n"
+        page_starts.append(len(window))
+        page_numbers.append(page_number)
+        window += text
+        if len(window) >= STREAM_WINDOW_CHARS:
+            yield from flush(final=False)
+
+    if window.strip():
+        yield from flush(final=True)
+
+# Full chunk lists keyed by (path, mtime, size, chunking parameters), least recently used first
+_chunk_lists: "OrderedDict[Tuple[Any, ...], List[str]]" = OrderedDict()
+_chunk_lists_lock = threading.Lock()
+
+def _document_chunks(file_path: str, max_pages: Optional[int], max_tokens_per_chunk: int, overlap_tokens: int) -> List[str]:
+    """
+    All chunk texts of a PDF, extracted once per file version and chunking parameters.
+
+    Continuation calls of `pdf_to_chunks` slice this list instead of
+    re-extracting the document from its first page.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size, max_pages, max_tokens_per_chunk, overlap_tokens)
+    with _chunk_lists_lock:
+        if key in _chunk_lists:
+            _chunk_lists.move_to_end(key)
+            return _chunk_lists[key]
+
+    chunks = [
+        chunk.text
+        for chunk in iter_pdf_chunks(file_path, max_pages=max_pages, max_tokens_per_chunk=max_tokens_per_chunk, overlap_tokens=overlap_tokens)
+    ]
+    with _chunk_lists_lock:
+        _chunk_lists[key] = chunks
+        while len(_chunk_lists) > PDF_TOOL_CACHED_DOCUMENTS:
+            _chunk_lists.popitem(last=False)
+    return chunks
+
+@tool(args_schema=PDFChunkerArgs)
+def pdf_to_chunks(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    max_tokens_per_chunk: int = 650,
+    overlap_tokens: int = 64,
+    start_chunk: int = 0,
+    max_chunks: int = PDF_TOOL_MAX_CHUNKS
+) -> Dict[str, Any]:
+    """
+    Carga un PDF desde ruta y lo divide en chunks de máximo `max_tokens_per_chunk` tokens.
+    Devuelve como máximo `max_chunks` chunks a partir de `start_chunk`; `next_start_chunk`
+    indica dónde continuar (None al final del documento). Los documentos completos se
+    cargan mejor con el endpoint de subida.
+    """
+    if start_chunk == 0:
+        # Primera página: extracción en streaming que se detiene al llenarla
+        stream = iter_pdf_chunks(
+            file_path,
+            max_pages=max_pages,
+            max_tokens_per_chunk=max_tokens_per_chunk,
+            overlap_tokens=overlap_tokens
+        )
+        try:
+            window = [chunk.text for chunk in islice(stream, max_chunks + 1)]
+        finally:
+            stream.close()
+    else:
+        # Continuaciones: el documento se extrae una sola vez y las páginas siguientes se recortan de la caché
+        document = _document_chunks(file_path, max_pages, max_tokens_per_chunk, overlap_tokens)
+        window = document[start_chunk:start_chunk + max_chunks + 1]
+
+    chunks = window[:max_chunks]
+    has_more = len(window) > max_chunks
+    logger.info("PDF chunked", start_chunk=start_chunk, chunk_count=len(chunks), has_more=has_more)
+    return {
+        "chunks": chunks,
+        "start_chunk": start_chunk,
+        "next_start_chunk": start_chunk + len(chunks) if has_more else None,
+    }
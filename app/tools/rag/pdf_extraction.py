@@ -0,0 +1,91 @@
+"""
+Page-level PDF text extraction fanned out to a process pool.
+
+This module only depends on PyPDF2 so that pool workers (started with
+"spawn", which is safe from threaded servers) import it quickly.
+"""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+from PyPDF2 import PdfReader
+
+# Pages extracted by one pool task
+PAGES_PER_TASK = 8
+# Tasks queued per worker; bounds the extracted text held in memory
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+ProgressCallback = Callable[[int, int], None]
+
+def count_pages(file_path: str) -> int:
+    """Number of pages of a PDF (page contents are not parsed)."""
+    return len(PdfReader(file_path).pages)
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF (0-based)."""
+    reader = PdfReader(file_path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+def iter_page_texts(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    workers: Optional[int] = None,
+    pages_per_task: int = PAGES_PER_TASK,
+    progress: Optional[ProgressCallback] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield `(page_number, text)` for each page of a PDF, in page order.
+
+    Page ranges are extracted in parallel by a process pool, with at most a
+    few ranges queued per worker, so memory stays bounded by the pages in
+    flight rather than by the document size. Small documents are extracted
+    in-process.
+
+    Args:
+        file_path: Path to the PDF file
+        max_pages: Only extract the first `max_pages` pages (all pages when None)
+        workers: Pool size (defaults to the CPU count)
+        pages_per_task: Pages extracted by one pool task
+        progress: Called with (page_number, total_pages) after each page
+
+    Yields:
+        1-based page number and the extracted text of that page
+    """
+    total = count_pages(file_path)
+    if max_pages is not None:
+        total = min(total, max_pages)
+    workers = max(1, workers or os.cpu_count() or 1)
+    ranges = [(start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)]
+
+    def emit(start: int, texts: List[str]) -> Iterator[Tuple[int, str]]:
+        for offset, text in enumerate(texts):
+            page_number = start + offset + 1
+            if progress:
+                progress(page_number, total)
+            yield page_number, text
+
+    if workers == 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            yield from emit(start, extract_page_range(file_path, start, stop))
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=context) as pool:
+        pending: Deque[Tuple[int, Future]] = deque()
+        remaining = iter(ranges)
+        try:
+            for start, stop in remaining:
+                pending.append((start, pool.submit(extract_page_range, file_path, start, stop)))
+                if len(pending) >= workers * TASKS_IN_FLIGHT_PER_WORKER:
+                    break
+            while pending:
+                start, future = pending.popleft()
+                texts = future.result()
+                next_range = next(remaining, None)
+                if next_range is not None:
+                    pending.append((next_range[0], pool.submit(extract_page_range, file_path, *next_range)))
+                yield from emit(start, texts)
+        finally:
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,90 @@
+import re
+from typing import Any, Dict, List, Optional
+import numpy as np
+from qdrant_client import models
+
+# Cosine similarity above which two chunks are treated as the same text
+NEAR_DUPLICATE_SIMILARITY = 0.95
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _normalized_text(point: models.ScoredPoint) -> str:
+    return _WHITESPACE.sub(" ", (point.payload or {}).get("text", "")).strip().lower()
+
+def _point_vector(point: models.ScoredPoint, vector_name: Optional[str]) -> Any:
+    if isinstance(point.vector, dict):
+        return point.vector.get(vector_name)
+    return point.vector
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+def mmr_rerank(
+    points: List[models.ScoredPoint],
+    query_vector: List[float],
+    top_k: int,
+    vector_name: Optional[str] = None,
+    mmr_lambda: float = 0.5,
+    max_per_source: Optional[int] = None,
+    duplicate_similarity: float = NEAR_DUPLICATE_SIMILARITY
+) -> List[models.ScoredPoint]:
+    """
+    Select a diverse subset of search results with maximal marginal relevance.
+
+    Candidates are picked greedily by `lambda * sim(query) - (1 - lambda) *
+    max sim(already selected)`. Exact text repeats and chunks whose vector is
+    within `duplicate_similarity` of a selected chunk are dropped, and at most
+    `max_per_source` chunks are kept per payload `source`.
+
+    Args:
+        points: Oversampled search results, fetched with their dense vectors
+        query_vector: Dense query embedding
+        top_k: Number of results to keep
+        vector_name: Name of the dense vector in the points (None if unnamed)
+        mmr_lambda: 1.0 ranks by relevance only, 0.0 by diversity only
+        max_per_source: Maximum chunks per source document (None for no cap)
+        duplicate_similarity: Cosine similarity treated as a near-duplicate
+
+    Returns:
+        Up to `top_k` points in selection order
+    """
+    # Exact duplicates first: keep the best-ranked copy of each text
+    seen_texts = set()
+    candidates: List[models.ScoredPoint] = []
+    for point in points:
+        text = _normalized_text(point)
+        if text in seen_texts or _point_vector(point, vector_name) is None:
+            continue
+        seen_texts.add(text)
+        candidates.append(point)
+
+    if not candidates:
+        return []
+
+    vectors = _unit_rows(np.asarray([_point_vector(p, vector_name) for p in candidates], dtype=np.float32))
+    query = _unit_rows(np.asarray(query_vector, dtype=np.float32))
+    relevance = vectors @ query
+    similarity = vectors @ vectors.T
+
+    available = np.ones(len(candidates), dtype=bool)
+    max_similarity = np.full(len(candidates), -1.0, dtype=np.float32)
+    per_source: Dict[Any, int] = {}
+    selected: List[models.ScoredPoint] = []
+
+    while len(selected) < top_k and available.any():
+        scores = mmr_lambda * relevance - (1 - mmr_lambda) * np.maximum(max_similarity, 0.0)
+        index = int(np.argmax(np.where(available, scores, -np.inf)))
+        available[index] = False
+
+        source = (candidates[index].payload or {}).get("source")
+        if max_per_source and source is not None:
+            if per_source.get(source, 0) >= max_per_source:
+                continue
+            per_source[source] = per_source.get(source, 0) + 1
+
+        selected.append(candidates[index])
+        max_similarity = np.maximum(max_similarity, similarity[index])
+        available &= max_similarity < duplicate_similarity
+
+    return selected
@@ -0,0 +1,163 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.config.qdrant import async_qdrant_client
+from app.config.embeddings import embed_query
+from app.tools.rag.catalog import collection_catalog
+from app.tools.rag.collection_info import get_collection_layout
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Sampled chunk vectors kept per collection to represent its topics
+PROTOTYPES_PER_COLLECTION = 256
+# A collection scores the mean similarity of its closest prototypes to the query
+PROTOTYPE_TOP_K = 3
+
+@dataclass(frozen=True)
+class RoutedCollection:
+    """A collection predicted to hold the answer to a query."""
+    name: str
+    score: Optional[float]  # None when there was nothing to choose between
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "score": round(self.score, 3) if self.score is not None else None}
+
+class _Prototypes:
+    """Uniform sample (reservoir) of a collection's normalized chunk vectors."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.seen = 0
+        self.vectors: Optional[np.ndarray] = None
+        # Whether the sample covers the chunks stored before this process started observing
+        self.seeded = False
+        self._rng = random.Random(0)
+
+    def add(self, vectors: Sequence[Sequence[float]]) -> None:
+        batch = np.asarray(vectors, dtype=np.float32)
+        if batch.ndim != 2 or not len(batch):
+            return
+        batch /= np.maximum(np.linalg.norm(batch, axis=1, keepdims=True), 1e-12)
+        if self.vectors is None or self.vectors.shape[1] != batch.shape[1]:
+            self.vectors = np.empty((0, batch.shape[1]), dtype=np.float32)
+            self.seen = 0
+
+        room = self.capacity - len(self.vectors)
+        if room > 0:
+            self.vectors = np.vstack([self.vectors, batch[:room]])
+            self.seen += min(room, len(batch))
+            batch = batch[room:]
+        for vector in batch:
+            self.seen += 1
+            slot = self._rng.randrange(self.seen)
+            if slot < self.capacity:
+                self.vectors[slot] = vector
+
+    def score(self, query: np.ndarray) -> float:
+        similarities = self.vectors @ query
+        top = min(PROTOTYPE_TOP_K, len(similarities))
+        return float(np.mean(np.partition(similarities, -top)[-top:]))
+
+class CollectionRouter:
+    """
+    Predicts which collections hold the answer to a query.
+
+    Each collection is represented by a sample of its chunk vectors, fed by
+    ingestion as it embeds and seeded once from Qdrant, so collections built
+    before this process started (or by another worker) are represented too.
+    Routing embeds the query once per vector size, reusing the embedding of
+    the searches for the same message, and compares it with the samples in
+    memory, so the agent can be told where to search instead of listing
+    collections with a tool call.
+    """
+
+    def __init__(self, capacity: int = PROTOTYPES_PER_COLLECTION, client: Any = None):
+        self.capacity = capacity
+        self.client = client
+        self._prototypes: Dict[str, _Prototypes] = {}
+
+    @property
+    def _client(self) -> Any:
+        return self.client or async_qdrant_client
+
+    def observe(self, collection_name: str, vectors: Sequence[Sequence[float]]) -> None:
+        """Record freshly embedded chunk vectors of a collection (merged into its Qdrant sample once seeded)."""
+        self._prototypes.setdefault(collection_name, _Prototypes(self.capacity)).add(vectors)
+
+    def forget(self, collection_name: str) -> None:
+        self._prototypes.pop(collection_name, None)
+
+    async def _seed(self, collection_name: str, points_count: int) -> None:
+        """
+        Sample an existing collection's vectors from Qdrant.
+
+        Vectors observed before seeding are merged into the stored sample,
+        unless the sample already read the whole collection (which includes them).
+        """
+        layout = await get_collection_layout(collection_name)
+        records, _ = await self._client.scroll(
+            collection_name=collection_name,
+            limit=self.capacity,
+            with_payload=False,
+            with_vectors=[layout.dense_vector_name] if layout.dense_vector_name else True
+        )
+        vectors = [
+            record.vector[layout.dense_vector_name] if layout.dense_vector_name else record.vector
+            for record in records if record.vector
+        ]
+        prototypes = _Prototypes(self.capacity)
+        prototypes.add(vectors)
+        observed = self._prototypes.get(collection_name)
+        if len(records) >= self.capacity and observed is not None and observed.vectors is not None:
+            # The stored sample stands for the chunks not observed by this process
+            prototypes.seen = max(prototypes.seen, points_count - observed.seen)
+            prototypes.add(observed.vectors)
+        prototypes.seeded = True
+        self._prototypes[collection_name] = prototypes
+        logger.debug("Collection routing sample loaded", collection_name=collection_name, vectors=len(vectors))
+
+    async def route(self, query: str, top_k: int) -> List[RoutedCollection]:
+        """
+        Rank the non-empty collections for a query.
+
+        Returns:
+            Up to top_k collections, best first; every collection unscored when there are no more than top_k
+        """
+        entries = [entry for entry in await collection_catalog.entries() if entry.points_count]
+        for name in set(self._prototypes) - {entry.name for entry in entries}:
+            self.forget(name)  # deleted or emptied (e.g. recreated)
+        if len(entries) <= top_k:
+            return [RoutedCollection(entry.name, None) for entry in entries]
+
+        missing = [entry for entry in entries if entry.name not in self._prototypes or not self._prototypes[entry.name].seeded]
+        outcomes = await asyncio.gather(*(self._seed(entry.name, entry.points_count) for entry in missing), return_exceptions=True)
+        for entry, outcome in zip(missing, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Collection routing sample failed", collection_name=entry.name, error=str(outcome))
+
+        candidates = [
+            entry for entry in entries
+            if entry.name in self._prototypes and self._prototypes[entry.name].vectors is not None
+        ]
+        sizes = {entry.layout.vector_size for entry in candidates}
+        query_vectors = {}
+        for size, vector in zip(sizes, await asyncio.gather(*(self._embed(query, size) for size in sizes))):
+            query_vectors[size] = vector
+
+        routed = [
+            RoutedCollection(entry.name, self._prototypes[entry.name].score(query_vectors[entry.layout.vector_size]))
+            for entry in candidates
+        ]
+        routed.sort(key=lambda collection: collection.score, reverse=True)
+        return routed[:top_k]
+
+    @staticmethod
+    async def _embed(query: str, vector_size: Optional[int]) -> np.ndarray:
+        # Shared with the searches for the same message (see `embed_query`)
+        vector = np.asarray(await embed_query(query, vector_size), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+collection_router = CollectionRouter()
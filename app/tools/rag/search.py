@@ -1,54 +1,320 @@
+import asyncio
 import logging
+import numpy as np
 from langchain.tools import tool
-from typing import Dict, Any, List
-from app.config.qdrant import qdrant_client 
+from typing import Dict, Any, List, Optional, Tuple
+from app.config.qdrant import qdrant_client, async_qdrant_client
 from app.schemas.tools_schema import RAGQueryInput, RagSearchArgs
-from app.config.embeddings import embedding_model
+from app.config.embeddings import embed_query, embedding_model
 from langchain_core.messages import ToolMessage
+from qdrant_client import models
+from app.tools.rag.collection_info import CollectionLayout, get_collection_layout
+from app.tools.rag.sparse import encode_query
+from app.tools.rag.rerank import mmr_rerank
+from app.tools.rag.filters import build_filter
+from app.tools.rag.catalog import collection_catalog
+from app.tools.rag.context_packer import RetrievedChunk, pack_context
+from app.config.load import RAG_CONTEXT_TOKEN_BUDGET
 from app.utils.logging_utils import get_secure_logger
 
 logger = get_secure_logger(__name__)
 
+# Candidates fetched from each of the dense and sparse indexes before fusion
+HYBRID_PREFETCH_MULTIPLIER = 4
+# Candidates fetched per requested result when re-ranking for diversity
+MMR_OVERSAMPLE_MULTIPLIER = 4
+# Pseudo collection name that fans a search out to every collection
+ALL_COLLECTIONS = "all"
+# Results of a search that found nothing to return
+NO_COLLECTIONS_MESSAGE = "There are no collections to search."
+NO_RESULTS_MESSAGE = "No relevant documents found for this query in the specified collection."
+
+def build_query_request(
+    layout: CollectionLayout,
+    query: str,
+    query_vector: List[float],
+    limit: int,
+    with_vectors: bool = False,
+    query_filter: Optional[models.Filter] = None
+) -> models.QueryRequest:
+    """
+    Build the Qdrant query for one search against a collection.
+
+    Hybrid collections are queried with dense and BM25 prefetches fused by
+    reciprocal rank on the server; legacy dense-only collections fall back
+    to a plain vector search.
+    """
+    vectors = [layout.dense_vector_name] if with_vectors and layout.dense_vector_name else with_vectors
+
+    if not layout.hybrid:
+        return models.QueryRequest(
+            query=query_vector,
+            using=layout.dense_vector_name,
+            filter=query_filter,
+            params=layout.search_params,
+            limit=limit,
+            with_payload=True,
+            with_vector=vectors
+        )
+
+    prefetch_limit = limit * HYBRID_PREFETCH_MULTIPLIER
+    return models.QueryRequest(
+        prefetch=[
+            models.Prefetch(
+                query=query_vector,
+                using=layout.dense_vector_name,
+                limit=prefetch_limit,
+                params=layout.search_params,
+                filter=query_filter
+            ),
+            models.Prefetch(
+                query=encode_query(query),
+                using=layout.sparse_vector_name,
+                limit=prefetch_limit,
+                filter=query_filter
+            ),
+        ],
+        query=models.FusionQuery(fusion=models.Fusion.RRF),
+        filter=query_filter,
+        limit=limit,
+        with_payload=True,
+        with_vector=vectors
+    )
+
+async def _query_collection(
+    collection: str,
+    query: str,
+    query_vector: List[float],
+    limit: int,
+    with_vectors: bool = False,
+    query_filter: Optional[models.Filter] = None
+) -> List[models.ScoredPoint]:
+    """Run a single search request against a collection."""
+    layout = await get_collection_layout(collection)
+    request = build_query_request(layout, query, query_vector, limit, with_vectors=with_vectors, query_filter=query_filter)
+    responses = await async_qdrant_client.query_batch_points(collection_name=collection, requests=[request])
+    return responses[0].points
+
+async def _search_collection(
+    collection: str,
+    query: str,
+    query_vector: List[float],
+    top_k: int,
+    diversify: bool = False,
+    mmr_lambda: float = 0.5,
+    max_chunks_per_source: Optional[int] = None,
+    query_filter: Optional[models.Filter] = None,
+    with_vectors: bool = False
+) -> List[models.ScoredPoint]:
+    """Search one collection, optionally re-ranking the results for diversity."""
+    if not (diversify or max_chunks_per_source):
+        return await _query_collection(
+            collection, query, query_vector, top_k, with_vectors=with_vectors, query_filter=query_filter
+        )
+
+    candidates = await _query_collection(
+        collection,
+        query,
+        query_vector,
+        top_k * MMR_OVERSAMPLE_MULTIPLIER,
+        with_vectors=True,
+        query_filter=query_filter
+    )
+    layout = await get_collection_layout(collection)
+    results = mmr_rerank(
+        candidates,
+        query_vector,
+        top_k,
+        vector_name=layout.dense_vector_name,
+        mmr_lambda=mmr_lambda if diversify else 1.0,
+        max_per_source=max_chunks_per_source
+    )
+    logger.debug("Results re-ranked", collection=collection, candidates=len(candidates), kept=len(results))
+    return results
+
+async def _query_vectors(query: str, targets: List[str]) -> Dict[str, List[float]]:
+    """
+    Embed the query once per distinct vector size among the target collections.
+
+    Collections created with shortened embeddings are queried with vectors
+    of the same size. Collections whose layout cannot be read are left out
+    (their search fails on its own).
+    """
+    layouts = await asyncio.gather(*(get_collection_layout(target) for target in targets), return_exceptions=True)
+    sizes = list({layout.vector_size for layout in layouts if isinstance(layout, CollectionLayout)})
+    vectors = dict(zip(sizes, await asyncio.gather(*(embed_query(query, size) for size in sizes))))
+    return {
+        target: vectors[layout.vector_size]
+        for target, layout in zip(targets, layouts)
+        if isinstance(layout, CollectionLayout)
+    }
+
+def query_similarities(points: List[models.ScoredPoint], query_vector: List[float], vector_name: Optional[str]) -> List[float]:
+    """
+    Cosine similarity between the query and each point's dense vector.
+
+    Search scores from different collections (fused ranks vs. cosine,
+    different profiles) are not comparable; the dense cosine is, so it is
+    what results from several collections are merged on. Points returned
+    without their vector score -1.
+    """
+    query = np.asarray(query_vector, dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+    similarities = []
+    for point in points:
+        vector = point.vector.get(vector_name) if isinstance(point.vector, dict) else point.vector
+        if not vector:
+            similarities.append(-1.0)
+            continue
+        vector = np.asarray(vector, dtype=np.float32)
+        similarities.append(float(vector @ query / max(float(np.linalg.norm(vector)), 1e-12)))
+    return similarities
+
+def merge_ranked_results(
+    results_by_collection: Dict[str, List[models.ScoredPoint]],
+    top_k: int,
+    similarities: Optional[Dict[str, List[float]]] = None
+) -> List[Tuple[str, models.ScoredPoint]]:
+    """
+    Merge per-collection results into a single top_k list.
+
+    Args:
+        results_by_collection: Each collection's results, best first
+        top_k: Number of results to keep
+        similarities: Per collection, the query similarity of each result (see `query_similarities`);
+            required to merge several collections, a single collection keeps its own order
+
+    Returns:
+        (collection, point) pairs ordered by query similarity, then rank within their collection
+    """
+    ranked = [
+        ((similarities or {}).get(collection, [0.0] * len(points))[rank], -rank, collection, point)
+        for collection, points in results_by_collection.items()
+        for rank, point in enumerate(points)
+    ]
+    ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [(collection, point) for _, _, collection, point in ranked[:top_k]]
+
+def to_retrieved_chunks(ranked: List[Tuple[str, models.ScoredPoint]]) -> List[RetrievedChunk]:
+    """Convert ranked (collection, point) pairs for the context packer, preserving rank order."""
+    return [
+        RetrievedChunk(
+            text=point.payload["text"],
+            score=float(len(ranked) - rank),
+            collection=collection,
+            source=point.payload.get("source"),
+            page=point.payload.get("page"),
+            chunk_index=point.payload.get("chunk_index"),
+            doc_version=point.payload.get("doc_version"),
+            document_id=point.payload.get("document_id")
+        )
+        for rank, (collection, point) in enumerate(ranked)
+    ]
+
+async def _resolve_collections(collection: str, collections: Optional[List[str]]) -> List[str]:
+    """Expand the collection arguments into the list of collections to search."""
+    if collections:
+        names = list(dict.fromkeys(collections))
+    else:
+        names = [collection]
+
+    if ALL_COLLECTIONS in names:
+        return await collection_catalog.names()
+    return names
+
 @tool(args_schema=RAGQueryInput)
-def rag_qdrant_search(query: str, collection: str, top_k: int = 5) -> str:
+async def rag_qdrant_search(
+    query: str,
+    collection: str,
+    top_k: int = 5,
+    collections: Optional[List[str]] = None,
+    diversify: bool = False,
+    mmr_lambda: float = 0.5,
+    max_chunks_per_source: Optional[int] = None,
+    source: Optional[str] = None,
+    page: Optional[int] = None,
+    section: Optional[str] = None,
+    doc_version: Optional[str] = None,
+    tags: Optional[List[str]] = None
+) -> str:
     """
-    Perform semantic search on a Qdrant vector database collection.
+    Perform hybrid (semantic + keyword) search on one or more Qdrant collections.
     
     Args:
         query: Search query text
-        collection: Name of the Qdrant collection to search
+        collection: Name of the Qdrant collection to search, or "all"
         top_k: Maximum number of results to return
+        collections: Several collections to search concurrently; results are merged
+        diversify: Oversample and re-rank with MMR, dropping near-duplicate chunks
+        mmr_lambda: MMR relevance/diversity trade-off (1.0 = relevance only)
+        max_chunks_per_source: Cap on chunks from the same source document
+        source, page, section, doc_version, tags: Optional metadata filters
         
     Returns:
-        Combined text from relevant documents found in the collection
+        Combined text from relevant documents found in the collection(s)
     """
-    logger.info("Executing RAG search", query=query, collection=collection, top_k=top_k)
+    logger.info("Executing RAG search", query=query, collection=collection, collections=collections, top_k=top_k, diversify=diversify)
+    query_filter = build_filter(source=source, page=page, section=section, doc_version=doc_version, tags=tags)
     
     try:
-        query_vector = embedding_model.embed_query(query)
-        logger.debug("Query vector generated successfully", collection=collection)
+        targets = await _resolve_collections(collection, collections)
+        if not targets:
+            logger.warning("No collections to search", query=query)
+            return NO_COLLECTIONS_MESSAGE
+
+        query_vectors = await _query_vectors(query, targets)
+        logger.debug("Query vector generated successfully", collections=targets)
         
-        results = qdrant_client.search(
-            collection_name=collection,
-            query_vector=query_vector,
-            limit=top_k,
-            with_payload=True
+        outcomes = await asyncio.gather(
+            *(
+                _search_collection(
+                    target,
+                    query,
+                    query_vectors.get(target),
+                    top_k,
+                    diversify=diversify,
+                    mmr_lambda=mmr_lambda,
+                    max_chunks_per_source=max_chunks_per_source,
+                    query_filter=query_filter,
+                    with_vectors=len(targets) > 1
+                )
+                for target in targets
+            ),
+            return_exceptions=True
         )
+
+        results_by_collection: Dict[str, List[models.ScoredPoint]] = {}
+        for target, outcome in zip(targets, outcomes):
+            if isinstance(outcome, Exception):
+                if len(targets) == 1:
+                    raise outcome
+                logger.warning("Collection search failed, skipping", collection=target, error=str(outcome))
+                continue
+            results_by_collection[target] = [point for point in outcome if (point.payload or {}).get("text")]
         
-        logger.debug("Qdrant search completed", collection=collection, results_count=len(results))
+        logger.debug("Qdrant search completed", collections=targets, results_count=sum(map(len, results_by_collection.values())))
         
-        docs_text: List[str] = [
-            result.payload.get("text", "") 
-            for result in results 
-            if result.payload.get("text")
-        ]
+        similarities = None
+        if len(results_by_collection) > 1:
+            similarities = {}
+            for target, points in results_by_collection.items():
+                layout = await get_collection_layout(target)
+                similarities[target] = query_similarities(points, query_vectors[target], layout.dense_vector_name)
+        merged = merge_ranked_results(results_by_collection, top_k, similarities)
         
-        if not docs_text:
+        if not merged:
             logger.warning("No relevant documents found", query=query, collection=collection)
-            return "No relevant documents found for this query in the specified collection."
+            return NO_RESULTS_MESSAGE
+
+        # Fit the hits into a bounded prompt: merge neighbours, add source headers, trim
+        context = pack_context(
+            to_retrieved_chunks(merged),
+            RAG_CONTEXT_TOKEN_BUDGET,
+            show_collection=len(targets) > 1
+        )
         
-        logger.info("RAG search completed successfully", collection=collection, docs_found=len(docs_text))
-        return "\n\n".join(docs_text)
+        logger.info("RAG search completed successfully", collections=targets, docs_found=len(merged))
+        return context
         
     except Exception as e:
         logger.error("RAG search failed", query=query, collection=collection, error=str(e))
@@ -0,0 +1,69 @@
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List
+from qdrant_client import models
+
+# BM25 term-frequency saturation and length normalization parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Expected chunk length in terms; chunks are produced at a roughly fixed token size
+BM25_AVG_DOC_LENGTH = 256.0
+
+# Identifiers, error codes, dotted config keys and versions are kept whole
+# (e.g. "ERR_CONN_42", "db.pool.size", "v1.2.3") and also split into parts.
+TOKEN_PATTERN = re.compile(r"\w+(?:[.\-:/]\w+)*")
+PART_SEPARATORS = re.compile(r"[.\-:/_]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "which",
+    "with", "el", "la", "los", "las", "de", "del", "en", "y", "que", "un", "una", "por",
+    "para", "con", "es", "se", "como", "qué", "cómo",
+})
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lexical terms for sparse retrieval.
+
+    Compound tokens are emitted whole and as their separator-delimited parts,
+    so a search for "ERR_CONN_42" matches exactly while "conn" still matches.
+    """
+    terms: List[str] = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        parts = [part for part in PART_SEPARATORS.split(token) if part]
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part not in STOPWORDS)
+    return terms
+
+def term_index(term: str) -> int:
+    """Stable, process-independent index for a term (31-bit CRC32)."""
+    return zlib.crc32(term.encode("utf-8")) & 0x7FFFFFFF
+
+def _to_sparse_vector(weights: Dict[int, float]) -> models.SparseVector:
+    indices = sorted(weights)
+    return models.SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+def encode_document(text: str) -> models.SparseVector:
+    """
+    Encode a document as BM25 term weights.
+
+    Only the term-frequency part of BM25 is computed here; the IDF part is
+    applied by Qdrant at query time (collections use `Modifier.IDF`), so
+    weights never need recomputing as the corpus grows.
+    """
+    terms = tokenize(text)
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / BM25_AVG_DOC_LENGTH)
+
+    weights: Dict[int, float] = {}
+    for term, tf in Counter(terms).items():
+        index = term_index(term)
+        weights[index] = weights.get(index, 0.0) + tf * (BM25_K1 + 1) / (tf + length_norm)
+    return _to_sparse_vector(weights)
+
+def encode_query(text: str) -> models.SparseVector:
+    """Encode a query as a binary bag of terms (BM25 weights queries by IDF only)."""
+    return _to_sparse_vector({term_index(term): 1.0 for term in set(tokenize(text))})
@@ -0,0 +1,262 @@
+import hashlib
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from uuid import NAMESPACE_URL, uuid5
+from qdrant_client import models
+from app.config.qdrant import async_qdrant_client
+from app.tools.rag.catalog import collection_catalog
+from app.tools.rag.filters import ensure_payload_indexes
+from app.tools.rag.ingestion import find_near_duplicates, ingest_documents
+from app.tools.rag.near_duplicates import BUCKETS_FIELD, NearDuplicateFilter
+from app.config.load import RAG_NEAR_DUPLICATE_THRESHOLD
+from app.utils.logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Points fetched per scroll request when listing a document's chunks
+SCROLL_PAGE_SIZE = 1024
+
+# Namespace for deterministic point ids of versioned documents
+POINT_ID_NAMESPACE = uuid5(NAMESPACE_URL, "docs-agent/chunks")
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk (whitespace-normalized)."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def chunk_point_id(document_id: str, content_hash: str, occurrence: int = 0) -> str:
+    """
+    Deterministic point id of a chunk of a document.
+
+    The id depends on the content, not the position, so an unchanged chunk
+    keeps its id (and its embedding) when text is inserted before it.
+    `occurrence` tells apart identical chunks within one document.
+    """
+    return str(uuid5(POINT_ID_NAMESPACE, f"{document_id}:{content_hash}:{occurrence}"))
+
+def _document_condition(document_id: str) -> models.FieldCondition:
+    return models.FieldCondition(key="document_id", match=models.MatchValue(value=document_id))
+
+@dataclass
+class SyncReport:
+    """Outcome of synchronizing a document's chunks with a collection."""
+    collection_name: str
+    document_id: str
+    version: Optional[str]
+    total: int = 0
+    unchanged: int = 0
+    added: int = 0
+    removed: int = 0
+    failed: int = 0
+    failed_batches: List[Dict[str, Any]] = field(default_factory=list)
+    duplicates: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "collection_name": self.collection_name,
+            "document_id": self.document_id,
+            "version": self.version,
+            "total": self.total,
+            "unchanged": self.unchanged,
+            "added": self.added,
+            "removed": self.removed,
+            "failed": self.failed,
+            "failed_batches": self.failed_batches,
+            "duplicates_skipped": len(self.duplicates),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+class DocumentSync:
+    """
+    Incremental re-index of one document, fed chunk batches in order.
+
+    Chunks get content-derived point ids. On `begin`, the ids of the chunks
+    already stored for the document are loaded; each `add` drops near
+    duplicates of earlier chunks and of other documents' stored chunks, embeds and upserts only chunks that are not
+    stored yet, and re-labels stored ones (position, version, metadata)
+    without re-embedding them. `finish` removes every stored chunk that was
+    not part of this version with one filtered delete. New chunks are written before stale ones are removed, so the
+    document stays searchable throughout.
+
+    Usage:
+        sync = DocumentSync(collection_name, document_id, version)
+        await sync.begin()
+        await sync.add(chunks, metadatas)    # once or per batch
+        report = await sync.finish()
+    """
+
+    def __init__(self, collection_name: str, document_id: str, version: Optional[str] = None, client: Any = None):
+        self.collection_name = collection_name
+        self.document_id = document_id
+        self.version = version
+        self.client = client or async_qdrant_client
+        self.report = SyncReport(collection_name=collection_name, document_id=document_id, version=version)
+        self._stored: Dict[str, Dict[str, Any]] = {}
+        self._kept: Set[str] = set()
+        self._occurrences: Counter = Counter()
+        self._near_duplicates = NearDuplicateFilter(RAG_NEAR_DUPLICATE_THRESHOLD) if RAG_NEAR_DUPLICATE_THRESHOLD > 0 else None
+        self._started = time.perf_counter()
+
+    async def begin(self) -> None:
+        """Load the ids and payloads (without text) of the chunks stored for this document."""
+        await ensure_payload_indexes(self.collection_name, client=self.client)
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=models.Filter(must=[_document_condition(self.document_id)]),
+                limit=SCROLL_PAGE_SIZE,
+                offset=offset,
+                with_payload=models.PayloadSelectorExclude(exclude=["text"]),
+                with_vectors=False
+            )
+            for point in points:
+                self._stored[str(point.id)] = point.payload or {}
+            if offset is None:
+                break
+        logger.debug("Stored document chunks loaded", collection_name=self.collection_name, stored_count=len(self._stored))
+
+    async def add(self, chunks: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Synchronize the next batch of chunks of the new version.
+
+        Args:
+            chunks: Chunk texts, continuing the order of previous batches
+            metadatas: Optional payload metadata per chunk (source, page, section, tags)
+        """
+        new_texts: List[str] = []
+        new_ids: List[str] = []
+        new_payloads: List[Dict[str, Any]] = []
+        relabel: List[models.PointsUpdateOperation] = []
+
+        kept = range(len(chunks))
+        keys = None
+        if self._near_duplicates is not None:
+            kept, dropped, keys = await find_near_duplicates(
+                self.collection_name,
+                chunks,
+                self._near_duplicates,
+                client=self.client,
+                exclude_document_id=self.document_id
+            )
+            self.report.duplicates.extend(chunk.to_dict() for chunk in dropped)
+
+        for offset in kept:
+            text = chunks[offset]
+            content_hash = chunk_hash(text)
+            point_id = chunk_point_id(self.document_id, content_hash, self._occurrences[content_hash])
+            self._occurrences[content_hash] += 1
+            payload = {
+                **(metadatas[offset] if metadatas else {}),
+                "document_id": self.document_id,
+                "chunk_hash": content_hash,
+                "chunk_index": self.report.total + offset,
+            }
+            if self.version is not None:
+                payload["doc_version"] = self.version
+            if keys is not None:
+                payload[BUCKETS_FIELD] = keys[offset]
+
+            self._kept.add(point_id)
+            stored = self._stored.get(point_id)
+            if stored is None:
+                new_texts.append(text)
+                new_ids.append(point_id)
+                new_payloads.append(payload)
+                continue
+
+            self.report.unchanged += 1
+            if stored != payload:
+                # Overwrite rather than merge, so metadata the new version dropped does not linger
+                relabel.append(models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(payload={**payload, "text": text}, points=[point_id])
+                ))
+        self.report.total += len(chunks)
+
+        if relabel:
+            # One request re-labels every moved or re-versioned chunk of the batch
+            await self.client.batch_update_points(collection_name=self.collection_name, update_operations=relabel)
+
+        if new_texts:
+            ingested = await ingest_documents(
+                self.collection_name,
+                new_texts,
+                metadatas=new_payloads,
+                ids=new_ids,
+                client=self.client,
+                near_duplicate_threshold=0
+            )
+            self.report.added += ingested.added
+            self.report.failed += ingested.failed
+            self.report.failed_batches.extend(ingested.failed_batches)
+
+    async def finish(self) -> SyncReport:
+        """Remove chunks of the document that are not part of the new version."""
+        stale = set(self._stored) - self._kept
+        if stale and not self.report.failed:
+            # A single filtered delete: every point of the document not kept by this version
+            await self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=models.Filter(
+                    must=[_document_condition(self.document_id)],
+                    must_not=[models.HasIdCondition(has_id=list(self._kept))]
+                )),
+                wait=True
+            )
+            self.report.removed = len(stale)
+        elif stale:
+            logger.warning(
+                "Keeping stale chunks because some new chunks failed",
+                collection_name=self.collection_name,
+                stale_count=len(stale),
+                failed=self.report.failed
+            )
+
+        if self.report.added or self.report.removed or self.report.unchanged:
+            collection_catalog.invalidate(self.collection_name)
+
+        self.report.elapsed_seconds = time.perf_counter() - self._started
+        logger.info(
+            "Document synchronized",
+            collection_name=self.collection_name,
+            version=self.version,
+            chunks_total=self.report.total,
+            chunks_unchanged=self.report.unchanged,
+            chunks_added=self.report.added,
+            chunks_removed=self.report.removed,
+            chunks_failed=self.report.failed,
+            duplicates_skipped=len(self.report.duplicates),
+            elapsed_seconds=round(self.report.elapsed_seconds, 3)
+        )
+        return self.report
+
+async def sync_document(
+    collection_name: str,
+    document_id: str,
+    chunks: List[str],
+    version: Optional[str] = None,
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    client: Any = None
+) -> SyncReport:
+    """
+    Replace the stored chunks of a document with a new version.
+
+    Only chunks whose content changed are embedded; chunks that disappeared
+    are deleted. See `DocumentSync`.
+
+    Args:
+        collection_name: Name of the Qdrant collection
+        document_id: Stable id of the document (e.g. its file name or URL)
+        chunks: All chunk texts of the new version, in order
+        version: Version label stored as `doc_version`
+        metadatas: Optional payload metadata per chunk
+
+    Returns:
+        SyncReport with unchanged, added, removed and failed counts
+    """
+    sync = DocumentSync(collection_name, document_id, version=version, client=client)
+    await sync.begin()
+    await sync.add(chunks, metadatas)
+    return await sync.finish()
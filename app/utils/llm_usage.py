@@ -0,0 +1,82 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# Latency samples kept per tier for the percentiles
+LATENCY_WINDOW = 1000
+
+class LLMUsageTracker(BaseCallbackHandler):
+    """
+    Callback recording the latency and token usage of one model tier.
+
+    Attached to the tier's chat model, so every call through it is counted
+    whatever chain or agent makes it.
+    """
+
+    run_inline = True  # only updates counters; no need for an executor hop on async calls
+
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id: UUID) -> None:
+        self.calls += 1
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self._latencies.append((time.perf_counter() - started) * 1000)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+        usage = self._usage(response)
+        self.input_tokens += usage.get("input_tokens", 0)
+        self.output_tokens += usage.get("output_tokens", 0)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+        self.errors += 1
+
+    @staticmethod
+    def _usage(response: LLMResult) -> Dict[str, int]:
+        """Token counts from the generated messages, or the provider's aggregate."""
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    usage["input_tokens"] += metadata.get("input_tokens", 0)
+                    usage["output_tokens"] += metadata.get("output_tokens", 0)
+        if not any(usage.values()):
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            usage["input_tokens"] = token_usage.get("prompt_tokens", 0)
+            usage["output_tokens"] = token_usage.get("completion_tokens", 0)
+        return usage
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_p50_ms": self._percentile(0.50),
+            "latency_p95_ms": self._percentile(0.95),
+        }
@@ -0,0 +1,19 @@
+from functools import lru_cache
+import tiktoken
+
+# Encoding used by the OpenAI chat and embedding models we deploy
+DEFAULT_ENCODING = "cl100k_base"
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding_name: str = DEFAULT_ENCODING) -> tiktoken.Encoding:
+    """Get a tiktoken encoding, loading it only once per process."""
+    return tiktoken.get_encoding(encoding_name)
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    """Count the tokens of a text."""
+    return len(get_tokenizer(encoding_name).encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, max_tokens: int, encoding_name: str = DEFAULT_ENCODING) -> str:
+    """Leading part of a text of at most `max_tokens` tokens."""
+    tokenizer = get_tokenizer(encoding_name)
+    return tokenizer.decode(tokenizer.encode(text, disallowed_special=())[:max(0, max_tokens)])
@@ -0,0 +1,27 @@
+"""
+Offline benchmarks for the documentation agent.
+
+Run modules from the repository root, e.g. `python -m benchmarks.bench_ingestion`.
+Importing this package fills in placeholder credentials so app modules can be
+imported without a `.env`; the app's Qdrant client runs in-process and its
+database engine points at SQLite. Benchmarks never call Azure, a remote
+Qdrant or Supabase unless asked to.
+"""
+import os
+
+_OFFLINE_DEFAULTS = {
+    "AZURE_OPENAI_API_KEY": "offline",
+    "AZURE_OPENAI_ENDPOINT": "https://offline.invalid/",
+    "AZURE_OPENAI_DEPLOYMENT_NAME": "offline",
+    "AZURE_OPENAI_EMBEDDINGS_API_KEY": "offline",
+    "AZURE_OPENAI_EMBEDDINGS_ENDPOINT": "https://offline.invalid/",
+    "AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME": "offline",
+    "AZURE_OPENAI_API_VERSION": "2024-02-01",
+    "JWT_SECRET_KEY": "offline-benchmark-secret",
+    "SECRET_KEY": "offline-benchmark-secret",
+    "QDRANT_URL": ":memory:",
+    "DATABASE_URL": "sqlite://",
+}
+
+for _name, _value in _OFFLINE_DEFAULTS.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,108 @@
+"""
+Machine-readable benchmark baselines and regression checks.
+
+A baseline is a JSON file `{"metrics": {name: value}, "config": {...}}`
+written by a benchmark with `--update-baseline`. Later runs with
+`--baseline` compare their metrics against it and exit non-zero on a
+regression beyond the metric's tolerance.
+"""
+import json
+import os
+import platform
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+@dataclass(frozen=True)
+class Tolerance:
+    """How much a metric may get worse before it counts as a regression."""
+    higher_is_better: bool
+    allowed: float
+    relative: bool = False  # `allowed` is a fraction of the baseline value instead of an absolute delta
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile, e.g. fraction=0.99 for p99."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+def write_baseline(path: str, metrics: Dict[str, float], config: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(
+            {
+                "metrics": metrics,
+                "config": config,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            handle,
+            indent=2,
+            sort_keys=True
+        )
+        handle.write("\n")
+
+def find_regressions(
+    metrics: Dict[str, float],
+    baseline: Dict[str, Any],
+    tolerances: Dict[str, Tolerance]
+) -> List[str]:
+    """
+    Compare metrics with a baseline.
+
+    Returns:
+        One message per metric that regressed beyond its tolerance
+    """
+    regressions = []
+    reference = baseline.get("metrics", {})
+    for name, tolerance in tolerances.items():
+        if name not in metrics or name not in reference:
+            continue
+        current, previous = metrics[name], reference[name]
+        allowed = tolerance.allowed * abs(previous) if tolerance.relative else tolerance.allowed
+        worse = previous - current if tolerance.higher_is_better else current - previous
+        if worse > allowed:
+            regressions.append(f"{name}: {current:.4g} vs baseline {previous:.4g} (allowed change {allowed:.4g})")
+    return regressions
+
+def report_against_baseline(
+    metrics: Dict[str, float],
+    config: Dict[str, Any],
+    tolerances: Dict[str, Tolerance],
+    baseline_path: Optional[str],
+    update: bool
+) -> int:
+    """
+    Shared `--baseline` / `--update-baseline` handling of the benchmark scripts.
+
+    Returns:
+        Process exit code: 1 if a metric regressed, 2 if the baseline file is missing, else 0
+    """
+    if not baseline_path:
+        return 0
+    if update:
+        write_baseline(baseline_path, metrics, config)
+        print(f"baseline written to {baseline_path}")
+        return 0
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(f"no baseline at {baseline_path}; run with --update-baseline to create it")
+        return 2
+    if baseline.get("config") != config:
+        print("warning: baseline was recorded with a different configuration")
+
+    regressions = find_regressions(metrics, baseline, tolerances)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print(f"no regressions against {baseline_path}")
+    return 1 if regressions else 0
@@ -0,0 +1,86 @@
+"""
+Chunker benchmark: single-pass token-offset chunker vs. the legacy per-word one.
+
+Builds a large synthetic manual (paragraphs of sentences with identifiers,
+numbers and accented words, which tokenize across word boundaries) and
+times both chunkers on it, reporting chunks produced and the largest chunk
+re-measured with the real tokenizer.
+
+    python -m benchmarks.bench_chunker --words 300000 --max-tokens 650
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+import benchmarks  # noqa: F401  (offline credentials)
+from app.tools.rag.pdf_chunker import chunk_text
+from app.utils.tokens import count_tokens, get_tokenizer
+
+VOCABULARY = [
+    "the", "collection", "vector", "payload", "index", "configuración", "búsqueda", "segment",
+    "shard", "replication_factor", "HNSW", "ef_construct=256", "v1.10.0", "https://qdrant.tech/docs",
+    "embedding", "documento", "cuantización", "oversampling", "rescore", "2048-dimensional",
+]
+
+def make_document(word_count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    paragraphs: List[str] = []
+    written = 0
+    while written < word_count:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            length = rng.randint(6, 24)
+            words = [rng.choice(VOCABULARY) for _ in range(length)]
+            sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", "?", ";"]))
+            written += length
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+def legacy_chunks(text: str, max_tokens_per_chunk: int) -> List[str]:
+    """The previous pdf_to_chunks algorithm: one encode call per whitespace-separated word."""
+    tokenizer = get_tokenizer()
+    chunks = []
+    chunk = []
+    token_count = 0
+    for word in text.split():
+        word_tokens = len(tokenizer.encode(word, disallowed_special=()))
+        if token_count + word_tokens > max_tokens_per_chunk:
+            chunks.append(" ".join(chunk))
+            chunk = []
+            token_count = 0
+        chunk.append(word)
+        token_count += word_tokens
+    if chunk:
+        chunks.append(" ".join(chunk))
+    return chunks
+
+def measure(name: str, run: Callable[[], List[str]], repeats: int) -> float:
+    best = float("inf")
+    chunks: List[str] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        chunks = run()
+        best = min(best, time.perf_counter() - started)
+    largest = max(count_tokens(chunk) for chunk in chunks)
+    print(f"{name:<12} {best * 1000:>10.1f} ms {len(chunks):>8} chunks   largest {largest} tokens")
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=300_000)
+    parser.add_argument("--max-tokens", type=int, default=650)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_document(args.words)
+    get_tokenizer()  # load the encoding outside the timed region
+    print(f"document: {len(text):,} chars, {count_tokens(text):,} tokens")
+
+    legacy = measure("legacy", lambda: legacy_chunks(text, args.max_tokens), args.repeats)
+    single = measure("single-pass", lambda: chunk_text(text, args.max_tokens, args.overlap), args.repeats)
+    print(f"speedup: {legacy / single:.1f}x")
+
+if __name__ == "__main__":
+    main()
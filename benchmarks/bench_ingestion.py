@@ -0,0 +1,102 @@
+"""
+Ingestion throughput benchmark (documents per second by batch size).
+
+Uses an in-process Qdrant (`:memory:`) and a fake embedding backend whose
+latency models a remote deployment (fixed per-request overhead plus a
+per-document cost), so numbers reflect pipeline behaviour rather than Azure.
+
+    python -m benchmarks.bench_ingestion --documents 5000 --batch-sizes 16 64 256
+"""
+import argparse
+import asyncio
+import random
+from typing import List
+
+import benchmarks  # noqa: F401  (offline credentials)
+from qdrant_client import AsyncQdrantClient, models
+from app.tools.rag.ingestion import ingest_documents
+
+COLLECTION = "bench_ingestion"
+
+class FakeEmbeddings:
+    """Deterministic embedding stand-in with configurable latency."""
+
+    def __init__(self, dimensions: int, request_latency: float, per_document_latency: float):
+        self.dimensions = dimensions
+        self.request_latency = request_latency
+        self.per_document_latency = per_document_latency
+
+    def _vector(self, text: str) -> List[float]:
+        rng = random.Random(text)
+        return [rng.uniform(-1.0, 1.0) for _ in range(self.dimensions)]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.request_latency + self.per_document_latency * len(texts))
+        return [self._vector(text) for text in texts]
+
+class SlowQdrantClient:
+    """Wraps a Qdrant client and adds a fixed network delay to upserts."""
+
+    def __init__(self, client: AsyncQdrantClient, latency: float):
+        self.client = client
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def upsert(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return await self.client.upsert(**kwargs)
+
+def make_documents(count: int) -> List[str]:
+    rng = random.Random(0)
+    words = ["qdrant", "vector", "index", "payload", "shard", "segment", "token", "chunk", "query", "embedding"]
+    return [" ".join(rng.choice(words) for _ in range(120)) + f" #{i}" for i in range(count)]
+
+async def run_once(documents: List[str], batch_size: int, args: argparse.Namespace) -> float:
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=args.dimensions, distance=models.Distance.COSINE)
+    )
+    embeddings = FakeEmbeddings(args.dimensions, args.request_latency, args.per_document_latency)
+
+    report = await ingest_documents(
+        COLLECTION,
+        documents,
+        embed_batch_size=batch_size,
+        embed_concurrency=args.concurrency,
+        upsert_batch_size=args.upsert_batch_size,
+        embeddings=embeddings,
+        client=SlowQdrantClient(client, args.upsert_latency)
+    )
+    stored = await client.count(COLLECTION)
+    assert stored.count == len(documents), report.to_dict()
+    await client.close()
+    return len(documents) / report.elapsed_seconds
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64, 128, 256])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--upsert-batch-size", type=int, default=256)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--request-latency", type=float, default=0.08, help="Seconds per embedding request")
+    parser.add_argument("--per-document-latency", type=float, default=0.0005, help="Seconds per embedded document")
+    parser.add_argument("--upsert-latency", type=float, default=0.02, help="Seconds per upsert request")
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents)
+
+    # Reference point: the previous behaviour, one embedding request and one upsert
+    single_shot = asyncio.run(run_once(documents, len(documents), argparse.Namespace(**{**vars(args), "concurrency": 1, "upsert_batch_size": len(documents)})))
+
+    print(f"{'batch_size':>10} {'concurrency':>11} {'docs/sec':>10}")
+    print(f"{'all':>10} {1:>11} {single_shot:>10.1f}")
+    for batch_size in args.batch_sizes:
+        rate = asyncio.run(run_once(documents, batch_size, args))
+        print(f"{batch_size:>10} {args.concurrency:>11} {rate:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Offline retrieval quality and latency benchmark.
+
+Builds a collection in Qdrant's in-process mode with the app's own
+pipeline (create_collection_tool, chunk_text, ingest_documents), then
+replays a labeled query set through `rag_qdrant_search`. The benchmark
+reports:
+- recall@k and MRR of the source documents in the tool's output
+- p50/p99 search latency
+- index size
+
+Embeddings are a deterministic hashing stand-in by default, or vectors
+recorded from the real deployment (--embeddings recorded.json, created
+once with --record).
+
+The dataset is JSON:
+
+    {"documents": [{"id": "...", "text": "...", "metadata": {"doc_version": "2"}}],
+     "queries": [{"query": "...", "relevant": ["doc id", ...], "filters": {"doc_version": "2"}}]}
+
+Without --dataset a synthetic corpus is generated. It has topic
+vocabulary, identifiers shared by a few documents of the same topic, and
+versions. Queries combine identifiers with topic terms; every document
+containing those identifiers counts as relevant.
+
+    python -m benchmarks.bench_retrieval --top-k 5 --chunk-tokens 400 --baseline benchmarks/baselines/retrieval.json
+    python -m benchmarks.bench_retrieval --profile compact --diversify --baseline benchmarks/baselines/retrieval.json
+    python -m benchmarks.bench_retrieval --update-baseline --baseline benchmarks/baselines/retrieval.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+import benchmarks  # noqa: F401  (offline credentials, in-process Qdrant)
+from benchmarks.baseline import Tolerance, percentile, report_against_baseline
+from benchmarks.fakes import HashingEmbeddings, RecordedEmbeddings, record_embeddings, use_embeddings
+from app.config.qdrant import async_qdrant_client
+from app.tools.rag.create_collection import create_collection_tool
+from app.tools.rag.ingestion import ingest_documents
+from app.tools.rag.pdf_chunker import chunk_text
+from app.tools.rag.search import rag_qdrant_search
+
+COLLECTION = "bench_retrieval"
+
+# Context headers written by the packer: "[source · p.3 · collection: x]"
+HEADER = re.compile(r"^\[([^\]]+)\]$", re.MULTILINE)
+
+TOLERANCES = {
+    "recall_at_k": Tolerance(higher_is_better=True, allowed=0.01),
+    "mrr": Tolerance(higher_is_better=True, allowed=0.01),
+    "p50_ms": Tolerance(higher_is_better=False, allowed=0.5, relative=True),
+    "p99_ms": Tolerance(higher_is_better=False, allowed=0.75, relative=True),
+    "index_memory_mb": Tolerance(higher_is_better=False, allowed=0.1, relative=True),
+}
+
+FILLER = (
+    "the system uses a configuration file to control how the service behaves when it starts and "
+    "you can change these settings at any time by editing the file and restarting the process so "
+    "that new values take effect for every request handled by the application"
+).split()
+QUESTION_STARTS = ["how do I", "what does", "where is", "why does", "how to fix"]
+
+def synthetic_dataset(documents: int = 200, queries: int = 200, topics: int = 20, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+
+    def word() -> str:
+        return "".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+    topic_terms = [[word() for _ in range(25)] for _ in range(topics)]
+    topic_identifiers = [[f"{word()}_{rng.randint(100, 999)}" for _ in range(30)] for _ in range(topics)]
+    docs = []
+    for index in range(documents):
+        topic = rng.randrange(topics)
+        identifiers = rng.sample(topic_identifiers[topic], 6)
+        paragraphs = []
+        for _ in range(rng.randint(3, 8)):
+            sentence_words = []
+            for _ in range(rng.randint(40, 90)):
+                roll = rng.random()
+                if roll < 0.08:
+                    sentence_words.append(rng.choice(identifiers))
+                elif roll < 0.45:
+                    sentence_words.append(rng.choice(topic_terms[topic]))
+                else:
+                    sentence_words.append(rng.choice(FILLER))
+            paragraphs.append(" ".join(sentence_words).capitalize() + ".")
+        docs.append({
+            "id": f"doc-{index:04d}",
+            "text": "\n\n".join(paragraphs),
+            "metadata": {"doc_version": rng.choice(["1", "2"]), "section": f"topic-{topic}"},
+            "_identifiers": identifiers,
+            "_topic": topic,
+        })
+
+    query_set = []
+    for _ in range(queries):
+        doc = rng.choice(docs)
+        identifiers = rng.sample(doc["_identifiers"], 2)
+        terms = identifiers + rng.sample(topic_terms[doc["_topic"]], 3)
+        rng.shuffle(terms)
+        filters = {"doc_version": doc["metadata"]["doc_version"]} if rng.random() < 0.25 else {}
+        relevant = [
+            other["id"] for other in docs
+            if set(identifiers) <= set(other["_identifiers"])
+            and all(other["metadata"][name] == value for name, value in filters.items())
+        ]
+        entry = {"query": f"{rng.choice(QUESTION_STARTS)} {' '.join(terms)}", "relevant": relevant}
+        if filters:
+            entry["filters"] = filters
+        query_set.append(entry)
+
+    for doc in docs:
+        del doc["_identifiers"], doc["_topic"]
+    return {"documents": docs, "queries": query_set}
+
+def ranked_sources(context: str) -> List[str]:
+    """Source documents in the order the packed context presents them."""
+    sources = []
+    for header in HEADER.findall(context):
+        source = header.split(" · ")[0]
+        if source not in sources:
+            sources.append(source)
+    return sources
+
+async def build_index(dataset: Dict[str, Any], args: argparse.Namespace) -> Dict[str, float]:
+    result = await create_collection_tool.ainvoke({"collection_name": COLLECTION, "profile": args.profile})
+    if "error" in result:
+        raise RuntimeError(result["error"])
+
+    texts: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    for doc in dataset["documents"]:
+        for index, chunk in enumerate(chunk_text(doc["text"], args.chunk_tokens, args.overlap)):
+            texts.append(chunk)
+            metadatas.append({**doc.get("metadata", {}), "source": doc["id"], "chunk_index": index})
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    report = await ingest_documents(COLLECTION, texts, metadatas=metadatas)
+    elapsed = time.perf_counter() - started
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    points = (await async_qdrant_client.count(COLLECTION, exact=True)).count
+    return {
+        "chunks": len(texts),
+        "points": points,
+        "duplicates_skipped": len(report.duplicates),
+        "index_seconds": elapsed,
+        "index_memory_mb": (after - before) / 2**20,
+    }
+
+async def replay(dataset: Dict[str, Any], args: argparse.Namespace) -> Dict[str, float]:
+    latencies: List[float] = []
+    recalls: List[float] = []
+    reciprocal_ranks: List[float] = []
+
+    async def search(entry: Dict[str, Any]) -> str:
+        return await rag_qdrant_search.ainvoke({
+            "query": entry["query"],
+            "collection": COLLECTION,
+            "top_k": args.top_k,
+            "diversify": args.diversify,
+            **entry.get("filters", {}),
+        })
+
+    await search(dataset["queries"][0])  # warm-up (tokenizer, layout cache)
+    for entry in dataset["queries"]:
+        started = time.perf_counter()
+        context = await search(entry)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        relevant = set(entry["relevant"])
+        sources = ranked_sources(context)[:args.top_k]
+        recalls.append(len(relevant.intersection(sources)) / min(len(relevant), args.top_k))
+        rank = next((position for position, source in enumerate(sources, start=1) if source in relevant), None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    return {
+        "recall_at_k": statistics.mean(recalls),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+def load_embeddings(args: argparse.Namespace, dataset: Dict[str, Any]):
+    if args.record:
+        texts = [chunk for doc in dataset["documents"] for chunk in chunk_text(doc["text"], args.chunk_tokens, args.overlap)]
+        texts += [entry["query"] for entry in dataset["queries"]]
+        return asyncio.run(record_embeddings(texts, args.record))
+    if args.embeddings:
+        return RecordedEmbeddings.load(args.embeddings)
+    return HashingEmbeddings(args.dimensions)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", help="labeled dataset JSON (synthetic when omitted)")
+    parser.add_argument("--write-dataset", help="save the (synthetic) dataset as JSON and exit")
+    parser.add_argument("--embeddings", help="recorded embeddings JSON to replay")
+    parser.add_argument("--record", help="embed the dataset with the Azure deployment, save to this path, then run")
+    parser.add_argument("--dimensions", type=int, default=1536, help="hashing embedding size")
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-tokens", type=int, default=650)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--diversify", action="store_true")
+    parser.add_argument("--output", help="write the metrics as JSON to this path")
+    parser.add_argument("--baseline", help="baseline JSON to compare against (or write with --update-baseline)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.dataset:
+        with open(args.dataset, encoding="utf-8") as handle:
+            dataset = json.load(handle)
+    else:
+        dataset = synthetic_dataset()
+    if args.write_dataset:
+        with open(args.write_dataset, "w", encoding="utf-8") as handle:
+            json.dump(dataset, handle, indent=1)
+        return
+
+    embeddings = load_embeddings(args, dataset)
+    use_embeddings(embeddings)
+
+    async def run() -> Dict[str, float]:
+        index = await build_index(dataset, args)
+        quality = await replay(dataset, args)
+        return {**index, **quality}
+
+    metrics = asyncio.run(run())
+    config = {
+        "dataset": args.dataset or "synthetic",
+        "embeddings": args.embeddings or args.record or f"hashing-{args.dimensions}",
+        "profile": args.profile,
+        "top_k": args.top_k,
+        "chunk_tokens": args.chunk_tokens,
+        "overlap": args.overlap,
+        "diversify": args.diversify,
+    }
+
+    print(f"{len(dataset['documents'])} documents -> {metrics['chunks']} chunks, {len(dataset['queries'])} queries")
+    print(f"recall@{args.top_k}   {metrics['recall_at_k']:.3f}")
+    print(f"MRR         {metrics['mrr']:.3f}")
+    print(f"p50 / p99   {metrics['p50_ms']:.1f} / {metrics['p99_ms']:.1f} ms")
+    print(f"index       {metrics['points']} points, {metrics['index_memory_mb']:.1f} MB, built in {metrics['index_seconds']:.1f} s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"metrics": metrics, "config": config}, handle, indent=2)
+    sys.exit(report_against_baseline(metrics, config, TOLERANCES, args.baseline, args.update_baseline))
+
+if __name__ == "__main__":
+    main()
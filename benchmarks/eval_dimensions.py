@@ -0,0 +1,141 @@
+"""
+Recall/latency trade-off of shortened embeddings.
+
+text-embedding-3 models return shortened embeddings equal to the leading
+components of the full vector, re-normalized. So every dimension can be
+evaluated from one set of full-size vectors: each candidate size is
+truncated, loaded into a Qdrant collection and searched. Recall@k is
+measured against exact full-size neighbours.
+
+Vectors come from a synthetic corpus whose variance decays across
+components, like learned embeddings. With --texts they are real
+embeddings from the configured Azure deployment.
+
+    python -m benchmarks.eval_dimensions --dimensions 256 512 1024 1536 --k 10
+    python -m benchmarks.eval_dimensions --texts corpus.txt --queries-file questions.txt
+    python -m benchmarks.eval_dimensions --qdrant-url http://localhost:6333   # HNSW + real latency
+
+The in-process `:memory:` Qdrant searches exhaustively. Its recall numbers
+isolate the effect of shortening, but its latencies only show relative
+cost. Use --qdrant-url for production-like latency.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+import benchmarks  # noqa: F401  (offline credentials)
+from qdrant_client import AsyncQdrantClient, models
+
+COLLECTION_PREFIX = "eval_dimensions"
+UPLOAD_BATCH_SIZE = 1024
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+def synthetic_vectors(documents: int, queries: int, dimensions: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Clustered corpus with most variance in the leading components, and noisy copies of documents as queries."""
+    rng = np.random.default_rng(seed)
+    scale = 1.0 / np.sqrt(1.0 + np.arange(dimensions) / 64.0)
+    centers = rng.normal(size=(max(1, documents // 50), dimensions)) * scale
+    docs = centers[rng.integers(0, len(centers), size=documents)] + 0.6 * rng.normal(size=(documents, dimensions)) * scale
+    picked = docs[rng.integers(0, documents, size=queries)]
+    qs = picked + 0.4 * rng.normal(size=(queries, dimensions)) * scale
+    return _normalize(docs).astype(np.float32), _normalize(qs).astype(np.float32)
+
+async def azure_vectors(texts_path: str, queries_path: str, queries: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Full-size embeddings of a text corpus (one document per line) from the configured deployment."""
+    from app.config.embeddings import embedding_model
+
+    with open(texts_path, encoding="utf-8") as handle:
+        texts = [line.strip() for line in handle if line.strip()]
+    if queries_path:
+        with open(queries_path, encoding="utf-8") as handle:
+            questions = [line.strip() for line in handle if line.strip()]
+    else:
+        # Without real questions, use the first words of sampled documents
+        rng = np.random.default_rng(0)
+        questions = [" ".join(texts[i].split()[:12]) for i in rng.integers(0, len(texts), size=queries)]
+
+    docs: List[List[float]] = []
+    for start in range(0, len(texts), 256):
+        docs.extend(await embedding_model.aembed_documents(texts[start:start + 256]))
+    qs = await embedding_model.aembed_documents(questions)
+    return _normalize(np.asarray(docs, dtype=np.float32)), _normalize(np.asarray(qs, dtype=np.float32))
+
+def exact_neighbours(docs: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+async def evaluate(client: AsyncQdrantClient, docs: np.ndarray, queries: np.ndarray, truth: np.ndarray, dimensions: int, k: int) -> dict:
+    collection = f"{COLLECTION_PREFIX}_{dimensions}"
+    shortened_docs = _normalize(docs[:, :dimensions])
+    shortened_queries = _normalize(queries[:, :dimensions])
+
+    if await client.collection_exists(collection):
+        await client.delete_collection(collection)
+    await client.create_collection(
+        collection_name=collection,
+        vectors_config=models.VectorParams(size=dimensions, distance=models.Distance.COSINE)
+    )
+    for start in range(0, len(shortened_docs), UPLOAD_BATCH_SIZE):
+        batch = shortened_docs[start:start + UPLOAD_BATCH_SIZE]
+        await client.upsert(
+            collection_name=collection,
+            points=models.Batch(ids=list(range(start, start + len(batch))), vectors=batch.tolist()),
+            wait=True
+        )
+
+    latencies: List[float] = []
+    hits = 0
+    for query, expected in zip(shortened_queries, truth):
+        started = time.perf_counter()
+        response = await client.query_points(collection_name=collection, query=query.tolist(), limit=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len({point.id for point in response.points} & set(expected.tolist()))
+
+    await client.delete_collection(collection)
+    latencies.sort()
+    return {
+        "dimensions": dimensions,
+        "recall": hits / truth.size,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "vector_mb": shortened_docs.nbytes / 2**20,
+    }
+
+async def main_async(args: argparse.Namespace) -> None:
+    if args.texts:
+        docs, queries = await azure_vectors(args.texts, args.queries_file, args.queries)
+    else:
+        docs, queries = synthetic_vectors(args.documents, args.queries, args.full_dimensions)
+    full = docs.shape[1]
+    dimensions = sorted({d for d in args.dimensions if d <= full} | {full})
+    truth = exact_neighbours(docs, queries, args.k)
+
+    client = AsyncQdrantClient(url=args.qdrant_url) if args.qdrant_url else AsyncQdrantClient(":memory:")
+    print(f"{len(docs)} documents, {len(queries)} queries, full size {full}, recall@{args.k} vs exact full-size neighbours")
+    print(f"{'dims':>6} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8} {'vectors MB':>11}")
+    for size in dimensions:
+        row = await evaluate(client, docs, queries, truth, size, args.k)
+        print(f"{row['dimensions']:>6} {row['recall']:>10.3f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['vector_mb']:>11.1f}")
+    await client.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[256, 512, 768, 1024, 1536])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--documents", type=int, default=5000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--full-dimensions", type=int, default=3072, help="synthetic full vector size")
+    parser.add_argument("--texts", help="embed this corpus (one document per line) with the Azure deployment")
+    parser.add_argument("--queries-file", help="questions to embed with --texts (one per line)")
+    parser.add_argument("--qdrant-url", help="evaluate against a Qdrant server instead of :memory:")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Local stand-ins for Azure OpenAI used by the benchmarks.
+
+`use_embeddings` routes the app's embedding lookups (`get_embeddings_for`,
+used by ingestion and search) to one of these, and `use_chat_model` swaps
+the agent's LLM, so the real tools and endpoints run unchanged against them.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import app.config.embeddings as embeddings_config
+import app.config.llm as llm_config
+from app.tools.rag.sparse import tokenize
+
+class HashingEmbeddings:
+    """
+    Deterministic lexical embeddings: hashed unigrams and bigrams.
+
+    Texts sharing terms get similar vectors, so retrieval quality is
+    meaningful (if keyword-like) without a model. Optional latency models a
+    remote deployment.
+    """
+
+    # Vector components each feature is spread over (with random signs)
+    FEATURE_SPREAD = 4
+
+    def __init__(self, dimensions: int = 1536, request_latency: float = 0.0, per_document_latency: float = 0.0):
+        self.dimensions = dimensions
+        self.request_latency = request_latency
+        self.per_document_latency = per_document_latency
+
+    def with_dimensions(self, dimensions: Optional[int]) -> "HashingEmbeddings":
+        if not dimensions or dimensions == self.dimensions:
+            return self
+        return HashingEmbeddings(dimensions, self.request_latency, self.per_document_latency)
+
+    def embed(self, text: str) -> List[float]:
+        terms = tokenize(text)
+        features = terms + [f"{left} {right}" for left, right in zip(terms, terms[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            seed = zlib.crc32(feature.encode("utf-8"))
+            for spread in range(self.FEATURE_SPREAD):
+                hashed = zlib.crc32(spread.to_bytes(1, "little"), seed)
+                vector[hashed % self.dimensions] += 1.0 if hashed & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    async def _wait(self, count: int) -> None:
+        delay = self.request_latency + self.per_document_latency * count
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await self._wait(len(texts))
+        return [self.embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await self._wait(1)
+        return self.embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed(text)
+
+class RecordedEmbeddings:
+    """
+    Replays embeddings recorded from the real deployment.
+
+    The recording is a JSON object `{"dimensions": n, "vectors": {text: vector}}`;
+    see `record_embeddings`. Shortened sizes are derived by truncating and
+    re-normalizing, which is what text-embedding-3 models return.
+    """
+
+    def __init__(self, vectors: Dict[str, List[float]], dimensions: Optional[int] = None):
+        self.vectors = vectors
+        self.dimensions = dimensions or len(next(iter(vectors.values())))
+
+    @classmethod
+    def load(cls, path: str) -> "RecordedEmbeddings":
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        return cls(data["vectors"], data.get("dimensions"))
+
+    def with_dimensions(self, dimensions: Optional[int]) -> "RecordedEmbeddings":
+        if not dimensions or dimensions == self.dimensions:
+            return self
+        return RecordedEmbeddings(self.vectors, dimensions)
+
+    def embed(self, text: str) -> List[float]:
+        try:
+            vector = np.asarray(self.vectors[text][:self.dimensions], dtype=np.float32)
+        except KeyError:
+            raise KeyError(f"No recorded embedding for text: {text[:60]!r}; re-record the dataset") from None
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed(text)
+
+async def record_embeddings(texts: List[str], path: str, batch_size: int = 256) -> RecordedEmbeddings:
+    """Embed texts with the configured Azure deployment and save them for offline replay."""
+    unique = list(dict.fromkeys(texts))
+    vectors: Dict[str, List[float]] = {}
+    for start in range(0, len(unique), batch_size):
+        batch = unique[start:start + batch_size]
+        vectors.update(zip(batch, await embeddings_config.embedding_model.aembed_documents(batch)))
+    recorded = RecordedEmbeddings(vectors)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"dimensions": recorded.dimensions, "vectors": vectors}, handle)
+    return recorded
+
+def use_embeddings(model) -> None:
+    """Route the app's embedding clients (all output sizes) to a local stand-in."""
+    embeddings_config.embedding_model = model
+    embeddings_config._vector_size = model.dimensions
+    embeddings_config.get_embedding_model = model.with_dimensions
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model with configurable latency and output size.
+
+    A fraction of user turns first answer with a `rag_qdrant_search` tool
+    call (when `search_collection` is set), so the agent loop, the tool and
+    the vector store are exercised like in production. Turns whose user
+    message comes right after a system message (speculatively retrieved
+    context) are answered directly.
+    """
+
+    first_token_latency: float = 0.3
+    per_token_latency: float = 0.01
+    output_tokens: int = 120
+    tool_call_ratio: float = 0.5
+    search_collection: Optional[str] = None
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        prompt = " ".join(str(message.content) for message in messages)
+        rng = random.Random(f"{self.seed}:{prompt}")
+        input_tokens = len(prompt.split())
+
+        has_context = (
+            len(messages) > 1 and isinstance(messages[-2], SystemMessage)
+            and "Documentation retrieved" in str(messages[-2].content)
+        )
+        if isinstance(last, HumanMessage) and self.search_collection and not has_context and rng.random() < self.tool_call_ratio:
+            return AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": "rag_qdrant_search",
+                    "args": {"query": str(last.content), "collection": self.search_collection, "top_k": 3},
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                }],
+                usage_metadata={"input_tokens": input_tokens, "output_tokens": 20, "total_tokens": input_tokens + 20},
+            )
+
+        context = [str(message.content) for message in messages if isinstance(message, (ToolMessage, SystemMessage))]
+        vocabulary = (context[-1] if context else prompt).split() or ["ok"]
+        words = [rng.choice(vocabulary) for _ in range(self.output_tokens)]
+        return AIMessage(
+            content=" ".join(words),
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": input_tokens + self.output_tokens,
+            },
+        )
+
+    def _delay(self, message: AIMessage) -> float:
+        return self.first_token_latency + self.per_token_latency * message.usage_metadata["output_tokens"]
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        message = self._reply(messages)
+        time.sleep(self._delay(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        message = self._reply(messages)
+        await asyncio.sleep(self._delay(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+def use_chat_model(model: BaseChatModel) -> None:
+    """
+    Swap the app's chat model for a local stand-in.
+
+    Every model tier gets its own copy, carrying that tier's usage tracker.
+    Must run before `app.chat.graph_workflow` (or `main`) is imported, since
+    the agent binds the model at import time.
+    """
+    tiers = {
+        tier: model.model_copy(update={"callbacks": [tracker]})
+        for tier, tracker in llm_config.usage_trackers.items()
+    }
+    llm_config.get_chat_model = lambda tier="primary": tiers[tier]
+    llm_config.llm_model = tiers["primary"]
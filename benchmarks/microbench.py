@@ -0,0 +1,176 @@
+"""
+Microbenchmarks of pure-Python hot paths, with baselines and regression gates.
+
+Each case times one call on realistic input, pytest-benchmark style:
+calibrate the number of calls per round, run several rounds, and report
+min/median time and operations per second. The median ops/sec of every
+case is compared with the baseline; a drop beyond --max-regression fails
+the run.
+
+Cases:
+- sanitize_data on the kwargs of a typical request log line and of a
+  logged list of messages
+- chunk_text (pdf_to_chunks tokenization) on a 60-page manual
+- the row-to-dict conversions of get_user_conversations and
+  get_conversation_messages (in-memory SQLite, ORM hydration included)
+- decode_token on an access token
+
+    python -m benchmarks.microbench --update-baseline --baseline benchmarks/baselines/micro.json
+    python -m benchmarks.microbench --baseline benchmarks/baselines/micro.json --max-regression 0.2
+    python -m benchmarks.microbench -k sanitize
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict
+
+import benchmarks  # noqa: F401  (offline credentials)
+from benchmarks.baseline import Tolerance, report_against_baseline
+from benchmarks.bench_chunker import make_document
+
+# Setup functions: each prepares its input and returns the zero-argument callable to time
+CASES: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+def case(name: str):
+    def register(setup: Callable[[], Callable[[], Any]]):
+        CASES[name] = setup
+        return setup
+    return register
+
+@case("sanitize_data.request_log")
+def sanitize_request_log():
+    from app.utils.logging_utils import SecureLogger
+
+    kwargs = {
+        "conversation_id": str(uuid.uuid4()),
+        "user_id": uuid.uuid4(),
+        "content": "How do I configure the HNSW index for a collection with 2M points? " * 20,
+        "email": "someone@example.com",
+        "credits_deducted": True,
+        "count": 12,
+    }
+    return lambda: SecureLogger.sanitize_data(kwargs)
+
+@case("sanitize_data.message_list")
+def sanitize_message_list():
+    from app.utils.logging_utils import SecureLogger
+
+    messages = [
+        {"id": str(uuid.uuid4()), "role": "user" if index % 2 else "assistant",
+         "content": "Payload indexes speed up filtered search. " * 30,
+         "created_at": datetime.now(timezone.utc).isoformat() + "Z"}
+        for index in range(50)
+    ]
+    return lambda: SecureLogger.sanitize_data({"messages": messages})
+
+@case("chunk_text.60_pages")
+def chunk_manual():
+    from app.tools.rag.pdf_chunker import chunk_text
+
+    text = make_document(30_000)
+    return lambda: chunk_text(text)
+
+def _sqlite_session(conversations: int, messages_per_conversation: int):
+    """In-memory database with one user's conversations and messages."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.core.database import Base
+    from app.core.models import Conversation, Message, User
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", is_active=True)
+    db.add(user)
+    db.flush()
+    started = datetime.now(timezone.utc)
+    for index in range(conversations):
+        conversation = Conversation(user_id=user.id, title=f"Conversation {index}", summary="Short summary. " * 10)
+        db.add(conversation)
+        db.flush()
+        db.add_all(
+            Message(
+                conversation_id=conversation.id,
+                role="user" if turn % 2 == 0 else "assistant",
+                content="The collection uses scalar quantization with rescoring. " * 10,
+                created_at=started + timedelta(seconds=turn),
+            )
+            for turn in range(messages_per_conversation)
+        )
+    db.commit()
+    return db, user, conversation
+
+@case("rows_to_dicts.conversations")
+def conversations_to_dicts():
+    from app.services.conversation_service import get_user_conversations
+
+    db, user, _ = _sqlite_session(conversations=50, messages_per_conversation=0)
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(get_user_conversations(user.id, db))
+
+@case("rows_to_dicts.messages")
+def messages_to_dicts():
+    from app.services.messages_service import get_conversation_messages
+
+    db, user, conversation = _sqlite_session(conversations=1, messages_per_conversation=200)
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(get_conversation_messages(conversation.id, user.id, db))
+
+@case("decode_token")
+def decode_access_token():
+    from app.services.jwt_service import create_access_token, decode_token
+
+    token = create_access_token({"id": str(uuid.uuid4()), "email": "someone@example.com"})
+    return lambda: decode_token(token)
+
+def _time_round(run: Callable[[], Any], calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return time.perf_counter() - started
+
+def measure(run: Callable[[], Any], rounds: int, min_round_time: float) -> Dict[str, float]:
+    """Time `run` over calibrated rounds; per-call seconds and ops/sec."""
+    run()  # warm-up (imports, caches)
+    calls = 1
+    elapsed = _time_round(run, calls)
+    while elapsed < min_round_time:
+        calls = min(calls * 10, max(calls + 1, int(calls * min_round_time / max(elapsed, 1e-9))))
+        elapsed = _time_round(run, calls)
+
+    per_call = [elapsed / calls] + [_time_round(run, calls) / calls for _ in range(rounds - 1)]
+    median = statistics.median(per_call)
+    return {"min_s": min(per_call), "median_s": median, "ops": 1.0 / median}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round-time", type=float, default=0.1, help="seconds per round after calibration")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed drop in ops/sec vs. the baseline")
+    parser.add_argument("--baseline", help="baseline JSON to compare against (or write with --update-baseline)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    selected = [name for name in CASES if not args.pattern or args.pattern in name]
+    metrics: Dict[str, float] = {}
+    print(f"{'case':<32}{'min':>12}{'median':>12}{'ops/sec':>14}")
+    for name in selected:
+        result = measure(CASES[name](), args.rounds, args.min_round_time)
+        metrics[f"{name}.ops"] = result["ops"]
+        print(f"{name:<32}{result['min_s'] * 1e6:>10.1f}µs{result['median_s'] * 1e6:>10.1f}µs{result['ops']:>14,.0f}")
+
+    tolerances = {
+        metric: Tolerance(higher_is_better=True, allowed=args.max_regression, relative=True)
+        for metric in metrics
+    }
+    config = {"rounds": args.rounds, "min_round_time": args.min_round_time}
+    sys.exit(report_against_baseline(metrics, config, tolerances, args.baseline, args.update_baseline))
+
+if __name__ == "__main__":
+    main()
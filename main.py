@@ -4,6 +4,11 @@ import uvicorn
 from app.api.routes import router as api_router
 from app.core.database import test_connection
 from app.config.middleware import add_middlewares
+from app.config.qdrant import close_qdrant_clients
+from app.tools.rag.catalog import collection_catalog
+from app.services.ingestion_job_service import ingestion_jobs
+from app.chat.checkpoints import checkpoint_store
+from app.chat.graph_workflow import use_checkpointer
 from contextlib import asynccontextmanager
 from app.utils.logging_utils import get_secure_logger
 
@@ -19,8 +24,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.critical("Failed to establish database connection", error=str(e))
         raise
+    ingestion_jobs.setup()
+    collection_catalog.start()
+    use_checkpointer(await checkpoint_store.open())
+    checkpoint_store.start()
     yield
     logger.info("Application shutting down")
+    await checkpoint_store.stop()
+    use_checkpointer(None)
+    await checkpoint_store.close()
+    await collection_catalog.stop()
+    await close_qdrant_clients()
 
 app = FastAPI(
     title="AI Docs Agent",
@@ -0,0 +1,2 @@
+# Placeholder credentials, in-process Qdrant and SQLite, so app modules import without a `.env`
+import benchmarks  # noqa: F401
@@ -0,0 +1,59 @@
+import pytest
+from app.tools.rag import context_packer
+from app.tools.rag.context_packer import RetrievedChunk, pack_context
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    """Count one token per word, so budgets are easy to reason about (and no tokenizer download is needed)."""
+    monkeypatch.setattr(context_packer, "count_tokens", lambda text: len(text.split()))
+    monkeypatch.setattr(context_packer, "truncate_tokens", lambda text, budget: " ".join(text.split()[:budget]))
+
+def chunk(text, score, source="s", chunk_index=0, collection="c", **fields):
+    return RetrievedChunk(text=text, score=score, collection=collection, source=source, chunk_index=chunk_index, **fields)
+
+def test_hits_sharing_a_position_are_all_kept():
+    hits = [chunk("TOP hit.", 3), chunk("Other.", 2), chunk("Third.", 1)]
+
+    packed = pack_context(hits, 1000)
+
+    assert packed.index("TOP hit.") < packed.index("Other.")
+    assert "Third." in packed
+
+def test_two_colliding_hits_keep_the_top_one_first():
+    packed = pack_context([chunk("TOP hit.", 2), chunk("Other.", 1)], 1000)
+
+    assert packed.startswith("[s]\nTOP hit.")
+    assert "Other." in packed
+
+def test_versions_of_a_document_are_not_merged():
+    hits = [
+        chunk("Version one text.", 2, doc_version="1.0", chunk_index=0),
+        chunk("Version two text.", 1, doc_version="2.0", chunk_index=1),
+    ]
+
+    sections = pack_context(hits, 1000).split("\n\n")
+
+    assert len(sections) == 2
+
+def test_consecutive_chunks_merge_into_one_passage():
+    hits = [chunk("second part.", 2, chunk_index=1), chunk("first part,", 1, chunk_index=0)]
+
+    assert pack_context(hits, 1000) == "[s]\nfirst part, second part."
+
+def test_block_without_sentence_breaks_is_truncated_not_dropped():
+    packed = pack_context([chunk("word " * 5000, 1)], 100)
+
+    assert packed.startswith("[s]\nword")
+    assert 50 <= len(packed.split()) <= 100
+
+def test_overflowing_block_keeps_its_best_chunk():
+    filler = " ".join(["Filler sentence here."] * 30)
+    hits = [
+        chunk("The answer is 42.", 5, chunk_index=1),
+        chunk(filler, 1, chunk_index=0),
+        chunk(filler, 1, chunk_index=2),
+    ]
+
+    packed = pack_context(hits, 60)
+
+    assert "The answer is 42." in packed
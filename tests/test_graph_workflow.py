@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from app.chat import graph_workflow
+from app.chat.graph_workflow import recent_turns, summary_hook
+
+class FakeSummaryChain:
+    async def ainvoke(self, inputs):
+        return {**inputs, "text": "earlier questions"}
+
+@pytest.fixture(autouse=True)
+def fake_summary_chain(monkeypatch):
+    monkeypatch.setattr(graph_workflow, "summary_chain", FakeSummaryChain())
+
+def tool_call(call_id):
+    return {"name": "search_documents_tool", "args": {"query": "q"}, "id": call_id}
+
+def long_tool_turn():
+    return [
+        HumanMessage(content="How do I rotate keys?"),
+        AIMessage(content="", tool_calls=[tool_call("a"), tool_call("b")]),
+        ToolMessage(content="result a", tool_call_id="a"),
+        ToolMessage(content="result b", tool_call_id="b"),
+        AIMessage(content="", tool_calls=[tool_call("c")]),
+        ToolMessage(content="result c", tool_call_id="c"),
+    ]
+
+def history(turns):
+    messages = []
+    for turn in range(turns):
+        messages += [HumanMessage(content=f"question {turn}"), AIMessage(content=f"answer {turn}")]
+    return messages
+
+def test_a_long_tool_turn_is_kept_whole_with_its_question():
+    turn = long_tool_turn()
+
+    update = asyncio.run(summary_hook({"messages": history(3) + turn}))
+
+    removal, summary, *kept = update["messages"]
+    assert isinstance(removal, RemoveMessage)
+    assert isinstance(summary, SystemMessage) and "earlier questions" in summary.content
+    assert kept == turn
+
+def test_short_turns_keep_the_last_messages_from_a_user_message():
+    msgs = history(6)
+
+    kept = recent_turns(msgs)
+
+    assert kept == msgs[-4:]
+    assert isinstance(kept[0], HumanMessage)
+
+def test_short_conversations_are_not_summarized():
+    assert asyncio.run(summary_hook({"messages": history(2)})) == {}
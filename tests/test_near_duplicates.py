@@ -0,0 +1,41 @@
+import random
+from app.tools.rag.near_duplicates import NearDuplicateFilter
+
+def words(count, seed):
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(100000)}" for _ in range(count)]
+
+BASE = words(200, seed=1)
+# One word changed out of 200: 5 of ~196 shingles differ (Jaccard ~0.95)
+NEAR = " ".join(BASE[:100] + ["changed"] + BASE[101:])
+# A third of the words changed (Jaccard well below 0.5)
+HALF = " ".join(BASE[:130] + words(70, seed=2))
+UNRELATED = " ".join(words(200, seed=3))
+
+def test_chunk_above_the_threshold_is_dropped():
+    kept, dropped = NearDuplicateFilter(0.8).filter([" ".join(BASE), NEAR, UNRELATED])
+
+    assert kept == [0, 2]
+    assert [(chunk.index, chunk.duplicate_of) for chunk in dropped] == [(1, 0)]
+    assert dropped[0].similarity >= 0.8
+
+def test_chunk_below_the_threshold_is_kept():
+    kept, dropped = NearDuplicateFilter(0.8).filter([" ".join(BASE), HALF])
+
+    assert kept == [0, 1]
+    assert dropped == []
+
+def test_threshold_above_the_similarity_keeps_the_chunk():
+    kept, _ = NearDuplicateFilter(0.99).filter([" ".join(BASE), NEAR])
+
+    assert kept == [0, 1]
+
+def test_indices_count_across_batches_and_remembered_chunks():
+    near_duplicates = NearDuplicateFilter(0.8)
+    near_duplicates.remember("stored-point", UNRELATED, near_duplicates.bucket_keys(UNRELATED))
+
+    near_duplicates.filter([" ".join(BASE)])
+    kept, dropped = near_duplicates.filter([NEAR, UNRELATED])
+
+    assert kept == []
+    assert [(chunk.index, chunk.duplicate_of) for chunk in dropped] == [(1, 0), (2, "stored-point")]
@@ -0,0 +1,65 @@
+import pytest
+import tiktoken
+from app.tools.rag import pdf_chunker
+from app.tools.rag.pdf_chunker import chunk_text
+
+ENCODING = "test-bytes"
+
+# Byte-level BPE with a few merges: " the" and "é" are single tokens, everything else one token per byte
+_RANKS = {bytes([byte]): byte for byte in range(256)}
+_RANKS.update({b"th": 256, b"the": 257, b" the": 258, "é".encode("utf-8"): 259})
+TOKENIZER = tiktoken.Encoding(
+    name=ENCODING,
+    pat_str=r"""\s?\S+|\s+""",
+    mergeable_ranks=_RANKS,
+    special_tokens={}
+)
+
+@pytest.fixture(autouse=True)
+def local_tokenizer(monkeypatch):
+    """A small local encoding, so token counts are easy to check (and no tokenizer download is needed)."""
+    monkeypatch.setattr(pdf_chunker, "get_tokenizer", lambda name=None: TOKENIZER)
+    pdf_chunker._token_tables.cache_clear()
+    yield
+    pdf_chunker._token_tables.cache_clear()
+
+def tokens(text):
+    return len(TOKENIZER.encode(text))
+
+def test_chunks_respect_the_token_budget():
+    text = " ".join(f"the café number {i} is open." for i in range(200))
+
+    chunks = chunk_text(text, max_tokens_per_chunk=60, overlap_tokens=10, encoding_name=ENCODING)
+
+    assert len(chunks) > 1
+    assert all(tokens(chunk) <= 60 for chunk in chunks)
+
+def test_chunks_are_exact_slices_of_the_text():
+    text = " ".join(f"the café number {i} is open." for i in range(200))
+
+    chunks = chunk_text(text, max_tokens_per_chunk=60, overlap_tokens=10, encoding_name=ENCODING)
+
+    # Offsets mapped back from tokens never split a character or drop text between chunks
+    position = 0
+    for chunk in chunks:
+        found = text.find(chunk, max(0, position - len(chunk)))
+        assert found >= 0
+        assert found <= position
+        position = found + len(chunk)
+    assert position == len(text)
+
+def test_consecutive_chunks_overlap_on_a_word_boundary():
+    text = " ".join(f"word{i}" for i in range(300))
+
+    first, second = chunk_text(text, max_tokens_per_chunk=100, overlap_tokens=20, encoding_name=ENCODING)[:2]
+
+    assert second.startswith("word")
+    assert second.split()[0] in first.split()
+
+def test_chunk_ends_on_a_paragraph_break():
+    first_paragraph = "the first paragraph has a few short words. " * 2
+    text = first_paragraph.strip() + "\n\n" + "the next paragraph goes on and on " * 10
+
+    chunks = chunk_text(text, max_tokens_per_chunk=120, overlap_tokens=0, encoding_name=ENCODING)
+
+    assert chunks[0] == first_paragraph.strip()
@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel
+from app.chat import tool_cache as tool_cache_module
+from app.chat.tool_cache import CachePolicy, ToolResultCache, conversation_scope
+
+class SearchArgs(BaseModel):
+    query: str
+    collection: str
+
+POLICY = CachePolicy(collections_of=lambda arguments: [arguments["collection"]], text_args=("query",))
+
+@pytest.fixture
+def points(monkeypatch):
+    """Points count per collection reported by the catalog; a None count makes the catalog unavailable."""
+    counts = {"docs": 10}
+
+    async def entries():
+        if counts.get("docs") is None:
+            raise RuntimeError("catalog unavailable")
+        return [SimpleNamespace(name=name, points_count=count) for name, count in counts.items()]
+
+    monkeypatch.setattr(tool_cache_module.collection_catalog, "entries", entries)
+    return counts
+
+@pytest.fixture
+def search():
+    calls = []
+
+    async def run(query: str, collection: str) -> str:
+        calls.append(query)
+        return f"results for {query}"
+
+    tool = StructuredTool.from_function(coroutine=run, name="search", description="Search.", args_schema=SearchArgs)
+    return tool, calls
+
+def call_twice(cache, tool, between=lambda: None):
+    async def run():
+        with conversation_scope("c1"):
+            await cache.call(tool, POLICY, {"query": "Reset password?", "collection": "docs"})
+            between()
+            return await cache.call(tool, POLICY, {"query": "reset password", "collection": "docs"})
+    return asyncio.run(run())
+
+def test_repeated_call_is_served_from_cache(points, search):
+    tool, calls = search
+    cache = ToolResultCache(scope="conversation", ttl=60, max_entries=10)
+
+    result = call_twice(cache, tool)
+
+    assert result == "results for Reset password?"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+def test_changed_points_count_is_a_miss(points, search):
+    tool, calls = search
+    cache = ToolResultCache(scope="conversation", ttl=60, max_entries=10)
+
+    call_twice(cache, tool, between=lambda: points.update(docs=11))
+
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 0
+
+def test_results_are_not_cached_without_a_stamp(points, search):
+    tool, calls = search
+    cache = ToolResultCache(scope="conversation", ttl=60, max_entries=10)
+    points["docs"] = None
+
+    call_twice(cache, tool)
+
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from langchain_core.tools import StructuredTool
+from app.chat.tool_executor import ToolExecutor
+
+DEADLINE = 0.05
+RUNTIME = 0.2
+
+def slow_async_tool(name, events):
+    async def run(text: str) -> str:
+        try:
+            await asyncio.sleep(RUNTIME)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        events.append("finished")
+        return text
+
+    return StructuredTool.from_function(coroutine=run, name=name, description="Slow tool.")
+
+def sync_tool(name, runtime, events):
+    def run(text: str) -> str:
+        time.sleep(runtime)
+        events.append("finished")
+        return text.upper()
+
+    return StructuredTool.from_function(func=run, name=name, description="Sync tool.")
+
+def call_and_wait(tool, wait=RUNTIME * 2):
+    """Call a tool with a short deadline, then give calls left running time to finish."""
+    async def run():
+        executor = ToolExecutor(default_timeout=DEADLINE, timeouts={tool.name: DEADLINE})
+        result = await executor.call(tool, {"text": "done"})
+        await asyncio.sleep(wait)
+        return result
+    return asyncio.run(run())
+
+def test_write_tool_keeps_running_past_its_deadline():
+    events = []
+
+    result = call_and_wait(slow_async_tool("add_documents_tool", events))
+
+    assert result["timed_out"] and result["still_running"]
+    assert events == ["finished"]
+
+def test_read_tool_is_cancelled_at_its_deadline():
+    events = []
+
+    result = call_and_wait(slow_async_tool("rag_qdrant_search", events))
+
+    assert result["timed_out"] and not result["still_running"]
+    assert events == ["cancelled"]
+
+def test_sync_tool_result_is_returned():
+    events = []
+
+    assert call_and_wait(sync_tool("pdf_to_chunks", 0, events), wait=0) == "DONE"
+
+def test_late_sync_tool_is_reported_as_still_running():
+    events = []
+
+    result = call_and_wait(sync_tool("pdf_to_chunks", RUNTIME, events))
+
+    assert result["timed_out"] and result["still_running"]
+    assert events == ["finished"]
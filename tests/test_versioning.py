@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+import pytest
+from app.config import embeddings as embeddings_config
+from app.config.qdrant import async_qdrant_client
+from app.tools.rag.create_collection import create_collection_tool
+from app.tools.rag.versioning import sync_document
+from benchmarks.fakes import HashingEmbeddings
+
+DIMENSIONS = 64
+
+@pytest.fixture(autouse=True)
+def local_embeddings(monkeypatch):
+    """Deterministic local embeddings for every output size (no Azure calls)."""
+    model = HashingEmbeddings(dimensions=DIMENSIONS)
+    monkeypatch.setattr(embeddings_config, "embedding_model", model)
+    monkeypatch.setattr(embeddings_config, "_vector_size", DIMENSIONS)
+    monkeypatch.setattr(embeddings_config, "get_embedding_model", model.with_dimensions)
+
+def chunks(*numbers):
+    return [f"Section {number} explains how setting number {number} changes the indexing behaviour." for number in numbers]
+
+async def stored_payloads(collection_name):
+    points, _ = await async_qdrant_client.scroll(collection_name, limit=100, with_payload=True)
+    return sorted((point.payload for point in points), key=lambda payload: payload["chunk_index"])
+
+def run_versions(*versions):
+    """Sync each (chunks, version, metadata) in turn into a fresh collection; the reports and final payloads."""
+    async def run():
+        collection_name = f"test-{uuid.uuid4().hex[:8]}"
+        await create_collection_tool.ainvoke({"collection_name": collection_name})
+        try:
+            reports = [
+                await sync_document(collection_name, "manual.pdf", texts, version=version, metadatas=[metadata] * len(texts))
+                for texts, version, metadata in versions
+            ]
+            return reports, await stored_payloads(collection_name)
+        finally:
+            await async_qdrant_client.delete_collection(collection_name)
+    return asyncio.run(run())
+
+def test_new_version_embeds_only_changed_chunks():
+    v1 = chunks(1, 2, 3, 4, 5)
+    v2 = chunks(0, 1, 2, 4, 5, 6)
+
+    (first, second), payloads = run_versions((v1, "1", {}), (v2, "2", {}))
+
+    assert (first.added, first.unchanged, first.removed) == (5, 0, 0)
+    assert (second.added, second.unchanged, second.removed) == (2, 4, 1)
+    assert [payload["text"] for payload in payloads] == v2
+    assert {payload["doc_version"] for payload in payloads} == {"2"}
+
+def test_metadata_dropped_by_a_new_version_is_removed():
+    texts = chunks(1, 2)
+
+    (_, second), payloads = run_versions((texts, "1", {"section": "setup"}), (texts, "1", {}))
+
+    assert second.unchanged == 2
+    assert all("section" not in payload and payload["text"] for payload in payloads)